@@ -0,0 +1,4 @@
+"""Performance benchmarks for the chat service (not shipped in the wheel).
+
+Run from the repository root with ``PYTHONPATH=src python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,38 @@
+"""Small helpers shared by the benchmark scripts."""
+from __future__ import annotations
+
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Sequence
+
+
+def percentiles(samples: Sequence[float], points: Sequence[float] = (50, 90, 99)) -> dict[str, float]:
+    """Nearest-rank percentiles of ``samples`` (seconds) reported in milliseconds."""
+    if not samples:
+        return {f"p{p:g}": 0.0 for p in points} | {"max": 0.0, "mean": 0.0}
+    ordered = sorted(samples)
+    out: dict[str, float] = {}
+    for p in points:
+        idx = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        out[f"p{p:g}"] = round(ordered[idx] * 1000, 3)
+    out["max"] = round(ordered[-1] * 1000, 3)
+    out["mean"] = round(sum(ordered) / len(ordered) * 1000, 3)
+    return out
+
+
+def write_results(name: str, results: dict[str, Any], output: str | None) -> None:
+    """Print results as JSON and optionally write them to ``output`` for diffing."""
+    document = {
+        "benchmark": name,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    text = json.dumps(document, indent=2, sort_keys=True)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n")
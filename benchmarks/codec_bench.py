@@ -0,0 +1,122 @@
+"""Microbenchmark of the Pub/Sub event codecs on chat.message_created payloads.
+
+Every event is encoded once by the outbox worker and decoded on every API
+node, so both directions are timed. Two payload shapes are used:
+
+  wire     what the outbox stores today (ids and timestamps already strings)
+  typed    UUID and datetime objects, as the typed payloads would carry
+
+Codecs whose library is not installed are skipped. No services needed:
+
+    PYTHONPATH=src python -m benchmarks.codec_bench --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from benchmarks._stats import write_results
+from chat_service.infrastructure.bus import serializer
+from chat_service.infrastructure.bus.serializer import (
+    JsonCodec,
+    MsgpackCodec,
+    deserialize_event,
+    encode_event,
+)
+
+EVENT_TYPE = "chat.message_created"
+
+
+def _typed_payload(body_len: int) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    return {
+        "message_id": uuid.uuid4(),
+        "conversation_id": uuid.uuid4(),
+        "sender_kind": "user",
+        "sender_id": 4815162342,
+        "type": "text",
+        "body": "Здравствуйте! Когда приедет заказ? " * max(1, body_len // 36),
+        "client_msg_id": uuid.uuid4(),
+        "created_at": now,
+        "delivered_at": now,
+    }
+
+
+def _wire_payload(body_len: int) -> dict[str, Any]:
+    return json.loads(json.dumps(_typed_payload(body_len), default=str))
+
+
+def _stdlib_encode(event_type: str, payload: dict[str, Any]) -> bytes:
+    # The serializer as it was before codecs: json.dumps with a JSONEncoder subclass.
+    return json.dumps({"event": event_type, "data": payload}, cls=serializer._Encoder).encode()
+
+
+def _stdlib_decode(raw: bytes) -> tuple[str, dict[str, Any]]:
+    data = json.loads(raw)
+    return data["event"], data["data"]
+
+
+def _codecs() -> dict[str, tuple[Callable[[str, dict[str, Any]], bytes], Callable[[bytes], Any]]]:
+    codecs: dict[str, tuple[Callable[[str, dict[str, Any]], bytes], Callable[[bytes], Any]]] = {
+        "stdlib-json": (_stdlib_encode, _stdlib_decode),
+    }
+    if serializer.orjson is not None:
+        codecs["legacy"] = (encode_event, deserialize_event)
+        json_codec = JsonCodec()
+        codecs["json-v1"] = (lambda t, p: encode_event(t, p, json_codec), deserialize_event)
+    if serializer.msgpack is not None:
+        msgpack_codec = MsgpackCodec()
+        codecs["msgpack-v2"] = (lambda t, p: encode_event(t, p, msgpack_codec), deserialize_event)
+    return codecs
+
+
+def _time_per_op(fn: Callable[[], Any], iterations: int, repeats: int) -> float:
+    """Best-of-``repeats`` mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best / iterations * 1e6, 3)
+
+
+def run(iterations: int, repeats: int, body_len: int) -> dict[str, Any]:
+    payloads = {"wire": _wire_payload(body_len), "typed": _typed_payload(body_len)}
+    results: dict[str, Any] = {}
+    for codec_name, (encode, decode) in _codecs().items():
+        for shape, payload in payloads.items():
+            raw = encode(EVENT_TYPE, payload)
+            assert decode(raw)[0] == EVENT_TYPE
+            results[f"{codec_name}/{shape}"] = {
+                "bytes": len(raw),
+                "encode_us": _time_per_op(lambda: encode(EVENT_TYPE, payload), iterations, repeats),
+                "decode_us": _time_per_op(lambda: decode(raw), iterations, repeats),
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--body-len", type=int, default=120, help="approximate message body length")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    write_results(
+        "codec_bench",
+        {
+            "iterations": args.iterations,
+            "body_len": args.body_len,
+            "codecs": run(args.iterations, args.repeats, args.body_len),
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
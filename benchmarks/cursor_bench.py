@@ -0,0 +1,80 @@
+"""Microbenchmark of pagination cursor encoding and decoding.
+
+Every list request with a cursor decodes one, and every full page
+encodes the next. Compared formats:
+
+  v1           base64 of "<iso-timestamp>|<uuid>" (decoded for compatibility)
+  v2           packed epoch microseconds + raw UUID bytes + direction flag
+  v2-signed    v2 with a truncated HMAC-SHA256 tag (CURSOR_HMAC_SECRET)
+
+No services needed:
+
+    PYTHONPATH=src python -m benchmarks.cursor_bench --iterations 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from benchmarks._stats import write_results
+from chat_service.infrastructure.db.repositories._cursor import (
+    _encode_v1,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def _time_per_op(fn: Callable[[], Any], iterations: int, repeats: int) -> float:
+    """Best-of-``repeats`` mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best / iterations * 1e6, 3)
+
+
+def run(iterations: int, repeats: int) -> dict[str, Any]:
+    ts = datetime.now(timezone.utc)
+    uid = uuid.uuid4()
+    key = b"benchmark-cursor-secret"
+    formats: dict[str, tuple[Callable[[], str], bytes]] = {
+        "v1": (lambda: _encode_v1(ts, uid), b""),
+        "v2": (lambda: encode_cursor(ts, uid, key=b""), b""),
+        "v2-signed": (lambda: encode_cursor(ts, uid, key=key), key),
+    }
+    results: dict[str, Any] = {}
+    for name, (encode, decode_key) in formats.items():
+        cursor = encode()
+        assert decode_cursor(cursor, key=decode_key) == (ts, uid)
+        results[name] = {
+            "chars": len(cursor),
+            "encode_us": _time_per_op(encode, iterations, repeats),
+            "decode_us": _time_per_op(
+                lambda: decode_cursor(cursor, key=decode_key), iterations, repeats,
+            ),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--iterations", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    write_results(
+        "cursor_bench",
+        {"iterations": args.iterations, "formats": run(args.iterations, args.repeats)},
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Load generator for the WebSocket and REST APIs.
+
+Opens N WebSocket clients, each with its own support conversation: every
+client subscribes, sends a message every ``--send-interval`` seconds and
+marks each echoed message read. Alongside, ``--readers`` REST clients page
+through message history. Reported: connect latency, send-to-echo latency,
+throughput, REST latency and — when the server process is known (``--spawn``
+or ``--server-pid``) — its RSS per connection and CPU usage.
+
+Against the docker-compose services (Postgres, Redis and the outbox worker
+must be running; tokens are minted with the local JWT_SECRET):
+
+    docker compose up -d chat-db redis chat-outbox-worker
+    PYTHONPATH=src python -m benchmarks.load --spawn --ws-clients 2000 --duration 60
+
+Against an already running API:
+
+    PYTHONPATH=src python -m benchmarks.load --url http://localhost:8000 --server-pid 1234
+
+Results are JSON (``--output``) so runs can be diffed between releases.
+Thousands of sockets need a high open-files limit on both sides; the
+generator raises its own soft limit to the hard limit.
+"""
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import resource
+import time
+from typing import Any
+
+import httpx
+
+from benchmarks._stats import percentiles, write_results
+from benchmarks.load import __doc__ as DESCRIPTION
+from benchmarks.load.clients import LoadStats, WsUser, mint_token, open_conversation, rest_reader
+from benchmarks.load.server import CpuWindow, ProcessSampler, spawn_server, wait_ready
+from chat_service.config import settings
+
+
+def _raise_nofile_limit() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        return hard
+    return soft
+
+
+async def _setup_users(
+    client: httpx.AsyncClient, count: int, first_subject: int, concurrency: int,
+) -> list[tuple[str, str]]:
+    """Tokens and support conversations for ``count`` users."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(subject_id: int) -> tuple[str, str]:
+        token = mint_token(settings.JWT_SECRET, settings.JWT_ALGORITHM, subject_id)
+        async with limit:
+            return token, await open_conversation(client, token)
+
+    return list(await asyncio.gather(*(one(first_subject + i) for i in range(count))))
+
+
+async def _connect_all(users: list[WsUser], rate: float) -> float:
+    """Open all sockets at ``rate`` per second; returns the ramp duration."""
+    started = time.perf_counter()
+    tasks = []
+    for i, user in enumerate(users):
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(user.connect()))
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - started
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    nofile = _raise_nofile_limit()
+    base_url = args.url.rstrip("/")
+    ws_url = base_url.replace("http", "ws", 1)
+    server = None
+    pid = args.server_pid
+    if args.spawn:
+        env = dict(item.split("=", 1) for item in args.env)
+        server = spawn_server(args.port, env, args.server_log)
+        base_url, ws_url = f"http://127.0.0.1:{args.port}", f"ws://127.0.0.1:{args.port}"
+        pid = server.pid
+    sampler = ProcessSampler(pid) if pid else None
+
+    try:
+        await wait_ready(base_url)
+        limits = httpx.Limits(max_connections=max(args.readers, args.setup_concurrency) + 10)
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+            credentials = await _setup_users(
+                client, args.ws_clients, args.first_subject, args.setup_concurrency,
+            )
+            stats = LoadStats()
+            users = [
+                WsUser(
+                    ws_url, token, conversation_id, stats,
+                    send_interval=args.send_interval,
+                    ack_timeout=args.ack_timeout,
+                    body_size=args.body_size,
+                )
+                for token, conversation_id in credentials
+            ]
+
+            rss_before = sampler.rss_bytes() if sampler else None
+            ramp_seconds = await _connect_all(users, args.connect_rate)
+            await asyncio.sleep(1.0)  # let the server settle before sampling
+            rss_connected = sampler.rss_bytes() if sampler else None
+            connected = len(stats.connect_latencies)
+
+            stop = asyncio.Event()
+            cpu = CpuWindow(sampler) if sampler else None
+            if cpu:
+                cpu.start()
+            started = time.perf_counter()
+            tasks = [asyncio.create_task(user.run(stop)) for user in users]
+            tasks += [
+                asyncio.create_task(rest_reader(
+                    client, credentials, stats, stop,
+                    page_size=args.page_size, interval=args.read_interval,
+                ))
+                for _ in range(args.readers)
+            ]
+            await asyncio.sleep(args.duration)
+            stop.set()
+            elapsed = time.perf_counter() - started
+            cpu_usage = cpu.stop() if cpu else None
+            rss_peak = sampler.rss_bytes() if sampler else None
+            await asyncio.gather(*tasks)
+    finally:
+        if server is not None:
+            server.terminate()
+            with contextlib.suppress(Exception):
+                server.wait(timeout=10)
+
+    results: dict[str, Any] = {
+        "config": {
+            "ws_clients": args.ws_clients,
+            "send_interval": args.send_interval,
+            "readers": args.readers,
+            "duration": args.duration,
+            "body_size": args.body_size,
+            "spawned": bool(args.spawn),
+            "env": sorted(args.env),
+            "client_nofile_limit": nofile,
+        },
+        "connect": {
+            "connected": connected,
+            "failures": stats.connect_failures,
+            "ramp_seconds": round(ramp_seconds, 3),
+            "latency_ms": percentiles(stats.connect_latencies),
+        },
+        "ws": {
+            "sent": stats.sent,
+            "acked": stats.acked,
+            "timeouts": stats.timeouts,
+            "errors": stats.ws_errors,
+            "disconnects": stats.disconnects,
+            "marked_read": stats.marked_read,
+            "frames_received": stats.frames_received,
+            "sends_per_second": round(stats.sent / elapsed, 1),
+            "acks_per_second": round(stats.acked / elapsed, 1),
+            "send_to_echo_ms": percentiles(stats.send_latencies, (50, 90, 99, 99.9)),
+        },
+        "rest": {
+            "reads": stats.reads,
+            "errors": stats.read_errors,
+            "reads_per_second": round(stats.reads / elapsed, 1),
+            "latency_ms": percentiles(stats.read_latencies, (50, 90, 99, 99.9)),
+        },
+    }
+    if sampler is not None and rss_before is not None and rss_connected is not None:
+        results["server"] = {
+            "rss_idle_mb": round(rss_before / 2**20, 1),
+            "rss_connected_mb": round(rss_connected / 2**20, 1),
+            "rss_peak_mb": round((rss_peak or 0) / 2**20, 1),
+            "rss_per_connection_kb": round((rss_connected - rss_before) / max(connected, 1) / 1024, 2),
+            **(cpu_usage or {}),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--url", default="http://localhost:8000", help="API under test")
+    parser.add_argument("--spawn", action="store_true", help="start the API with uvicorn instead")
+    parser.add_argument("--port", type=int, default=8765, help="port for --spawn")
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="KEY=VALUE",
+        help="setting override for the spawned API (repeatable)",
+    )
+    parser.add_argument("--server-log", help="write the spawned API's output to this file")
+    parser.add_argument("--server-pid", type=int, help="sample RSS/CPU of this already running process")
+    parser.add_argument("--ws-clients", type=int, default=1000)
+    parser.add_argument("--connect-rate", type=float, default=500.0, help="new sockets per second")
+    parser.add_argument(
+        "--send-interval", type=float, default=5.0, help="seconds between sends per client (0: no sends)",
+    )
+    parser.add_argument("--ack-timeout", type=float, default=10.0)
+    parser.add_argument("--body-size", type=int, default=120)
+    parser.add_argument("--readers", type=int, default=20, help="concurrent REST history readers")
+    parser.add_argument("--read-interval", type=float, default=0.0, help="pause between reads per reader")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds after ramp-up")
+    parser.add_argument("--first-subject", type=int, default=10_000_000, help="user id of the first client")
+    parser.add_argument("--setup-concurrency", type=int, default=50)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    write_results("load", asyncio.run(_run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Simulated chat users: WebSocket senders and REST history readers."""
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Sequence
+
+import httpx
+import jwt
+from websockets.asyncio.client import ClientConnection, connect
+
+API_PREFIX = "/api/v1/chat/conversations"
+
+
+class LoadStats:
+    """Counters and latency samples (seconds) shared by all simulated clients."""
+
+    __slots__ = (
+        "connect_latencies",
+        "connect_failures",
+        "send_latencies",
+        "sent",
+        "acked",
+        "timeouts",
+        "marked_read",
+        "ws_errors",
+        "frames_received",
+        "disconnects",
+        "read_latencies",
+        "reads",
+        "read_errors",
+    )
+
+    def __init__(self) -> None:
+        self.connect_latencies: list[float] = []
+        self.connect_failures = 0
+        self.send_latencies: list[float] = []
+        self.sent = 0
+        self.acked = 0
+        self.timeouts = 0
+        self.marked_read = 0
+        self.ws_errors = 0
+        self.frames_received = 0
+        self.disconnects = 0
+        self.read_latencies: list[float] = []
+        self.reads = 0
+        self.read_errors = 0
+
+
+def mint_token(secret: str, algorithm: str, subject_id: int, kind: str = "user") -> str:
+    return jwt.encode({"sub": str(subject_id), "kind": kind}, secret, algorithm=algorithm)
+
+
+async def open_conversation(client: httpx.AsyncClient, token: str) -> str:
+    response = await client.post(f"{API_PREFIX}/support", headers={"Authorization": f"Bearer {token}"})
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def _message_ref(frame: dict[str, Any]) -> tuple[str | None, str | None]:
+    """(body, message id) of a message event in either the direct or the bus shape."""
+    data = frame.get("data") or {}
+    message = data.get("message")
+    if isinstance(message, dict):
+        return message.get("body"), message.get("id")
+    return data.get("body"), data.get("message_id")
+
+
+class WsUser:
+    """One WebSocket client: subscribes to its conversation, sends on a
+    schedule and marks every echoed message read.
+
+    Sends are open-loop (the schedule does not wait for echoes), so a slow
+    server shows up as latency rather than as fewer requests. A send counts
+    as acknowledged when its message comes back on the socket, whichever
+    path (direct broadcast or Pub/Sub) delivers it first.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        token: str,
+        conversation_id: str,
+        stats: LoadStats,
+        *,
+        send_interval: float,
+        ack_timeout: float,
+        body_size: int,
+    ) -> None:
+        self._url = f"{ws_url}/ws/chat?token={token}"
+        self._conversation_id = conversation_id
+        self._stats = stats
+        self._send_interval = send_interval
+        self._ack_timeout = ack_timeout
+        self._padding = "x" * max(0, body_size - 42)
+        self._pending: dict[str, float] = {}
+        self._ws: ClientConnection | None = None
+
+    async def connect(self) -> bool:
+        started = time.perf_counter()
+        try:
+            self._ws = await connect(self._url, open_timeout=30, max_queue=None)
+            await self._ws.send(json.dumps({
+                "type": "subscribe", "data": {"conversation_id": self._conversation_id},
+            }))
+        except Exception:
+            self._stats.connect_failures += 1
+            return False
+        self._stats.connect_latencies.append(time.perf_counter() - started)
+        return True
+
+    async def run(self, stop: asyncio.Event) -> None:
+        if self._ws is None:
+            return
+        receiver = asyncio.create_task(self._receive())
+        try:
+            if self._send_interval > 0:
+                await self._send_loop(stop)
+            else:
+                await stop.wait()
+            # Let in-flight sends come back before counting them as timed out.
+            deadline = time.perf_counter() + self._ack_timeout
+            while self._pending and time.perf_counter() < deadline and not receiver.done():
+                await asyncio.sleep(0.05)
+            self._expire(time.perf_counter() + self._ack_timeout)
+        finally:
+            receiver.cancel()
+            await self._ws.close()
+
+    async def _send_loop(self, stop: asyncio.Event) -> None:
+        assert self._ws is not None
+        # Spread the first sends so clients do not fire in lockstep.
+        next_at = time.perf_counter() + random.uniform(0, self._send_interval)
+        while not stop.is_set():
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(stop.wait(), delay)
+                    return
+                except TimeoutError:
+                    pass
+            next_at += self._send_interval
+            client_msg_id = str(uuid.uuid4())
+            body = f"bench {client_msg_id} {self._padding}".rstrip()
+            self._pending[body] = time.perf_counter()
+            try:
+                await self._ws.send(json.dumps({
+                    "type": "message.send",
+                    "data": {
+                        "conversation_id": self._conversation_id,
+                        "client_msg_id": client_msg_id,
+                        "type": "text",
+                        "body": body,
+                    },
+                }))
+            except Exception:
+                self._stats.disconnects += 1
+                return
+            self._stats.sent += 1
+            self._expire(time.perf_counter())
+
+    async def _receive(self) -> None:
+        assert self._ws is not None
+        try:
+            async for raw in self._ws:
+                self._stats.frames_received += 1
+                frame = json.loads(raw)
+                if frame.get("type") == "error":
+                    self._stats.ws_errors += 1
+                    continue
+                body, message_id = _message_ref(frame)
+                sent_at = self._pending.pop(body, None) if body else None
+                if sent_at is None:
+                    continue
+                self._stats.acked += 1
+                self._stats.send_latencies.append(time.perf_counter() - sent_at)
+                if message_id:
+                    await self._ws.send(json.dumps({
+                        "type": "mark_read",
+                        "data": {"conversation_id": self._conversation_id, "last_message_id": message_id},
+                    }))
+                    self._stats.marked_read += 1
+        except Exception:
+            self._stats.disconnects += 1
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self._ack_timeout
+        for body in [b for b, sent_at in self._pending.items() if sent_at < cutoff]:
+            del self._pending[body]
+            self._stats.timeouts += 1
+
+
+async def rest_reader(
+    client: httpx.AsyncClient,
+    users: Sequence[tuple[str, str]],
+    stats: LoadStats,
+    stop: asyncio.Event,
+    *,
+    page_size: int,
+    interval: float,
+) -> None:
+    """Read message history of random conversations until ``stop``.
+
+    ``users`` are ``(token, conversation_id)`` pairs; ``interval`` 0 reads
+    back to back.
+    """
+    while not stop.is_set():
+        token, conversation_id = random.choice(users)
+        started = time.perf_counter()
+        try:
+            response = await client.get(
+                f"{API_PREFIX}/{conversation_id}/messages",
+                params={"limit": page_size},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        stats.read_latencies.append(time.perf_counter() - started)
+        stats.reads += 1
+        if not ok:
+            stats.read_errors += 1
+        if interval > 0:
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except TimeoutError:
+                pass
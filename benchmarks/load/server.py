@@ -0,0 +1,92 @@
+"""Starting the service under test and sampling its process from /proc."""
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class ProcessSampler:
+    """RSS and CPU time of a process (Linux /proc; readings are None elsewhere)."""
+
+    def __init__(self, pid: int) -> None:
+        self.pid = pid
+        self._proc = Path(f"/proc/{pid}")
+
+    @property
+    def available(self) -> bool:
+        return self._proc.exists()
+
+    def rss_bytes(self) -> int | None:
+        try:
+            # statm: size resident shared ... (in pages)
+            return int((self._proc / "statm").read_text().split()[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def cpu_seconds(self) -> float | None:
+        try:
+            stat = (self._proc / "stat").read_text()
+        except OSError:
+            return None
+        # The command name may contain spaces; fields after it start at state (field 3).
+        fields = stat[stat.rindex(")") + 2:].split()
+        utime, stime = int(fields[11]), int(fields[12])
+        return (utime + stime) / _CLOCK_TICKS
+
+
+class CpuWindow:
+    """CPU utilisation of a process between ``start()`` and ``stop()``."""
+
+    def __init__(self, sampler: ProcessSampler) -> None:
+        self._sampler = sampler
+        self._cpu: float | None = None
+        self._wall = 0.0
+
+    def start(self) -> None:
+        self._cpu = self._sampler.cpu_seconds()
+        self._wall = time.monotonic()
+
+    def stop(self) -> dict[str, float] | None:
+        cpu = self._sampler.cpu_seconds()
+        if cpu is None or self._cpu is None:
+            return None
+        wall = time.monotonic() - self._wall
+        used = cpu - self._cpu
+        return {"cpu_seconds": round(used, 3), "cpu_percent": round(used / wall * 100, 1) if wall else 0.0}
+
+
+def spawn_server(port: int, env: dict[str, str], log_path: str | None) -> subprocess.Popen[bytes]:
+    """Run the API with uvicorn on ``port``; ``env`` overrides settings from the environment."""
+    log = open(log_path, "wb") if log_path else subprocess.DEVNULL  # noqa: SIM115
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "chat_service.app:create_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        env={**os.environ, **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+
+
+async def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2.0) as client:
+        while True:
+            try:
+                if (await client.get("/healthz")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{base_url} did not become healthy in {timeout:.0f}s")
+            await asyncio.sleep(0.2)
@@ -0,0 +1,124 @@
+"""Requests/second through the middleware stack, before and after the pure-ASGI rewrite.
+
+Drives a trivial JSON endpoint in-process through httpx's ASGITransport
+(no sockets, no services), so the numbers isolate middleware overhead:
+
+  none          no middleware
+  basehttp      CorrelationId + RequestTiming on BaseHTTPMiddleware (previous code)
+  asgi          the current pure-ASGI middleware
+
+    PYTHONPATH=src python -m benchmarks.middleware_bench --requests 5000 --concurrency 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from benchmarks._stats import percentiles, write_results
+from chat_service.api.middleware.correlation_id import (
+    HEADER,
+    CorrelationIdMiddleware,
+    correlation_id_ctx,
+)
+from chat_service.api.middleware.metrics import RequestTimingMiddleware
+
+VARIANTS = ("none", "basehttp", "asgi")
+
+
+class _BaseHTTPCorrelationId(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        cid = request.headers.get(HEADER) or uuid.uuid4().hex
+        token = correlation_id_ctx.set(cid)
+        try:
+            response = await call_next(request)
+            response.headers[HEADER] = cid
+            return response
+        finally:
+            correlation_id_ctx.reset(token)
+
+
+class _BaseHTTPTiming(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start = time.perf_counter()
+        response = await call_next(request)
+        logging.getLogger("chat_service.api.middleware.metrics").info(
+            "%s %s %s %.1fms",
+            request.method, request.url.path, response.status_code,
+            (time.perf_counter() - start) * 1000,
+        )
+        return response
+
+
+def _build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, Any]:
+        return {"ok": True, "rid": correlation_id_ctx.get()}
+
+    if variant == "basehttp":
+        app.add_middleware(_BaseHTTPTiming)
+        app.add_middleware(_BaseHTTPCorrelationId)
+    elif variant == "asgi":
+        app.add_middleware(RequestTimingMiddleware)
+        app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+async def _run_variant(variant: str, requests: int, concurrency: int) -> dict[str, Any]:
+    transport = httpx.ASGITransport(app=_build_app(variant))
+    latencies: list[float] = []
+    remaining = requests
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, requests)):  # warm-up
+            await client.get("/ping")
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.get("/ping")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"rps": round(requests / elapsed, 1), "latency_ms": percentiles(latencies)}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    # The timing middleware logs every request; keep the handler cost out of the numbers.
+    logging.getLogger("chat_service.api.middleware.metrics").setLevel(logging.WARNING)
+    results: dict[str, Any] = {"requests": args.requests, "concurrency": args.concurrency}
+    for variant in args.variants:
+        results[variant] = await _run_variant(variant, args.requests, args.concurrency)
+    if "basehttp" in results and "asgi" in results:
+        results["asgi_speedup"] = round(results["asgi"]["rps"] / results["basehttp"]["rps"], 2)
+    write_results("middleware_bench", results, args.output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
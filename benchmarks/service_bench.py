@@ -0,0 +1,164 @@
+"""CPU cost of the service layer over the in-memory storage backend.
+
+Seeds ``--conversations`` support conversations with ``--history`` messages
+each, then times the hot service calls one at a time:
+
+  send_message       new message (access check, insert, touch, outbox, commit)
+  send_duplicate     replay of an already stored client_msg_id
+  list_messages      one page of history from a random cursor
+  list_for_user      the user's conversation list
+  list_for_admin     the admin inbox, first page and a cursor page
+
+Storage costs next to nothing here, so what remains is services, DTOs,
+entities and the UoW plumbing. ``--profile`` writes a cProfile dump of a
+send_message run for ``python -m pstats`` / snakeviz. No services needed:
+
+    PYTHONPATH=src python -m benchmarks.service_bench --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from benchmarks._stats import write_results
+from chat_service.application.dto.conversation import ConversationFilterDTO
+from chat_service.application.dto.principal import Principal
+from chat_service.domain.value_objects.enums import MessageType, ParticipantKind
+from chat_service.infrastructure.db.repositories._cursor import encode_cursor
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.services import admin_service, conversation_service, message_service
+
+def _user(user_id: int) -> Principal:
+    return Principal(kind=ParticipantKind.USER, subject_id=user_id, roles=[])
+
+
+async def _seed(
+    store: MemoryStore, conversations: int, history: int,
+) -> list[tuple[int, uuid.UUID]]:
+    users = []
+    for user_id in range(1, conversations + 1):
+        async with MemoryUoW(store) as uow:
+            conversation = await conversation_service.get_or_create_support_conversation(
+                user_id, uow,
+            )
+        for i in range(history):
+            async with MemoryUoW(store) as uow:
+                await message_service.send_message(
+                    conversation.id, _user(user_id), uuid.uuid4(), MessageType.TEXT, f"m{i}", uow,
+                )
+        users.append((user_id, conversation.id))
+    # Keep the outbox from growing into the measurement.
+    store.outbox.clear()
+    store.outbox_pending.clear()
+    return users
+
+
+async def _time_per_op(op: Callable[[], Awaitable[Any]], iterations: int, repeats: int) -> float:
+    """Best-of-``repeats`` mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await op()
+        best = min(best, time.perf_counter() - started)
+    return round(best / iterations * 1e6, 3)
+
+
+async def _run(args: argparse.Namespace) -> dict[str, Any]:
+    store = MemoryStore()
+    users = await _seed(store, args.conversations, args.history)
+    replay = uuid.uuid4()
+    user_id, conversation_id = users[0]
+    async with MemoryUoW(store) as uow:
+        await message_service.send_message(
+            conversation_id, _user(user_id), replay, MessageType.TEXT, "replay", uow,
+        )
+
+    async def send_message() -> None:
+        user_id, conversation_id = random.choice(users)
+        async with MemoryUoW(store) as uow:
+            await message_service.send_message(
+                conversation_id, _user(user_id), uuid.uuid4(), MessageType.TEXT, "hello", uow,
+            )
+
+    async def send_duplicate() -> None:
+        async with MemoryUoW(store) as uow:
+            await message_service.send_message(
+                conversation_id, _user(user_id), replay, MessageType.TEXT, "replay", uow,
+            )
+
+    async def list_messages() -> None:
+        user_id, conversation_id = random.choice(users)
+        timeline = store.timelines[conversation_id]
+        ts, mid = random.choice(timeline)
+        async with MemoryUoW(store) as uow:
+            await message_service.list_messages(
+                conversation_id, _user(user_id), encode_cursor(ts, mid), args.page_size, uow,
+            )
+
+    async def list_for_user() -> None:
+        user_id, _ = random.choice(users)
+        async with MemoryUoW(store) as uow:
+            await conversation_service.list_user_conversations(
+                _user(user_id), None, args.page_size, uow,
+            )
+
+    admin_page = store.conversations[users[len(users) // 2][1]]
+    admin_cursor = encode_cursor(admin_page.last_message_at, admin_page.id)
+
+    async def list_for_admin() -> None:
+        async with MemoryUoW(store) as uow:
+            await admin_service.list_conversations(ConversationFilterDTO(limit=args.page_size), uow)
+            await admin_service.list_conversations(
+                ConversationFilterDTO(limit=args.page_size, cursor=admin_cursor), uow,
+            )
+
+    ops = {
+        "send_message": send_message,
+        "send_duplicate": send_duplicate,
+        "list_messages": list_messages,
+        "list_for_user": list_for_user,
+        "list_for_admin": list_for_admin,
+    }
+    timings = {
+        name: await _time_per_op(op, args.iterations, args.repeats) for name, op in ops.items()
+    }
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(args.iterations):
+            await send_message()
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+    return {
+        "conversations": args.conversations,
+        "history": args.history,
+        "iterations": args.iterations,
+        "page_size": args.page_size,
+        "us_per_op": timings,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=50, help="seeded messages per conversation")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--profile", help="write a cProfile dump of send_message to this file")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    write_results("service_bench", asyncio.run(_run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
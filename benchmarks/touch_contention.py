@@ -0,0 +1,210 @@
+"""Concurrent-sender benchmark for conversations.last_message_at maintenance.
+
+N senders post into ONE conversation, each send in its own transaction
+(message INSERT + last_message_at touch + COMMIT), in three modes:
+
+  direct     legacy unconditional UPDATE inside every send transaction
+  monotonic  guarded UPDATE (CONVERSATION_TOUCH_MODE=monotonic)
+  deferred   touches coalesced by LastActivityAggregator (CONVERSATION_TOUCH_MODE=deferred)
+
+Lock waits are sampled from pg_stat_activity while the senders run. Needs a
+migrated Postgres configured through the usual settings (.env):
+
+    PYTHONPATH=src python -m benchmarks.touch_contention --senders 32 --messages 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any
+
+from sqlalchemy import delete, text, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks._stats import percentiles, write_results
+from chat_service.config import settings
+from chat_service.domain.entities.conversation import Conversation
+from chat_service.domain.entities.message import Message
+from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+from chat_service.infrastructure.db.models.conversation import ConversationModel
+from chat_service.infrastructure.db.uow import SqlAlchemyUoW
+
+APP_NAME = "chat-touch-bench"
+MODES = ("direct", "monotonic", "deferred")
+
+
+async def _create_conversation(session_factory: async_sessionmaker[AsyncSession]) -> uuid.UUID:
+    now = datetime.now(timezone.utc)
+    conversation = Conversation(
+        id=uuid.uuid4(),
+        topic_type="support",
+        topic_id=None,
+        status="open",
+        assignee_admin_id=None,
+        last_message_at=None,
+        created_at=now,
+        updated_at=now,
+    )
+    async with SqlAlchemyUoW(session_factory=session_factory) as uow:
+        await uow.conversations_w.create(conversation)
+        await uow.commit()
+    return conversation.id
+
+
+async def _table_stats(engine: AsyncEngine) -> dict[str, int]:
+    async with engine.connect() as conn:
+        row = (
+            await conn.execute(
+                text(
+                    "SELECT n_tup_upd, n_tup_hot_upd, n_dead_tup "
+                    "FROM pg_stat_user_tables WHERE relname = 'conversations'"
+                )
+            )
+        ).one()
+    return {"n_tup_upd": row[0], "n_tup_hot_upd": row[1], "n_dead_tup": row[2]}
+
+
+async def _sample_lock_waits(engine: AsyncEngine, stop: asyncio.Event, samples: list[int]) -> None:
+    query = text(
+        "SELECT count(*) FROM pg_stat_activity "
+        "WHERE application_name = :app AND wait_event_type = 'Lock'"
+    )
+    async with engine.connect() as conn:
+        while not stop.is_set():
+            samples.append((await conn.execute(query, {"app": APP_NAME})).scalar_one())
+            await asyncio.sleep(0.005)
+
+
+async def _sender(
+    mode: str,
+    conversation_id: uuid.UUID,
+    messages: int,
+    session_factory: async_sessionmaker[AsyncSession],
+    last_activity: LastActivityAggregator | None,
+    touch_latencies: list[float],
+    tx_latencies: list[float],
+) -> None:
+    sender_id = id(asyncio.current_task()) % 1_000_000
+    for _ in range(messages):
+        tx_start = time.perf_counter()
+        async with SqlAlchemyUoW(session_factory=session_factory, last_activity=last_activity) as uow:
+            now = datetime.now(timezone.utc)
+            await uow.messages_w.create_if_not_exists(
+                Message(
+                    id=uuid.uuid4(),
+                    conversation_id=conversation_id,
+                    sender_kind="user",
+                    sender_id=sender_id,
+                    type="text",
+                    body="bench",
+                    payload=None,
+                    client_msg_id=uuid.uuid4(),
+                    created_at=now,
+                )
+            )
+            touch_start = time.perf_counter()
+            if mode == "direct":
+                await uow.session.execute(
+                    update(ConversationModel)
+                    .where(ConversationModel.id == conversation_id)
+                    .values(last_message_at=now)
+                )
+            else:
+                await uow.conversations_w.touch_last_message_at(conversation_id, now)
+            await uow.commit()
+            end = time.perf_counter()
+        touch_latencies.append(end - touch_start)
+        tx_latencies.append(end - tx_start)
+
+
+async def _run_mode(mode: str, senders: int, messages: int, flush_ms: int) -> dict[str, Any]:
+    engine = create_async_engine(
+        settings.database_url,
+        pool_size=senders + 2,
+        max_overflow=0,
+        connect_args={"server_settings": {"application_name": APP_NAME}},
+    )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    conversation_id = await _create_conversation(session_factory)
+
+    last_activity: LastActivityAggregator | None = None
+    if mode == "deferred":
+        last_activity = LastActivityAggregator(
+            partial(SqlAlchemyUoW, session_factory=session_factory),
+            flush_interval=flush_ms / 1000,
+        )
+        await last_activity.start()
+
+    before = await _table_stats(engine)
+    touch_latencies: list[float] = []
+    tx_latencies: list[float] = []
+    lock_samples: list[int] = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(_sample_lock_waits(engine, stop, lock_samples))
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _sender(
+                mode, conversation_id, messages, session_factory,
+                last_activity, touch_latencies, tx_latencies,
+            )
+            for _ in range(senders)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    if last_activity is not None:
+        await last_activity.stop()
+
+    # pg_stat counters are flushed asynchronously by the backends.
+    await asyncio.sleep(1.0)
+    after = await _table_stats(engine)
+
+    async with engine.begin() as conn:
+        await conn.execute(delete(ConversationModel).where(ConversationModel.id == conversation_id))
+    await engine.dispose()
+
+    total = senders * messages
+    return {
+        "messages": total,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_msg_s": round(total / elapsed, 1),
+        "touch_plus_commit_ms": percentiles(touch_latencies),
+        "transaction_ms": percentiles(tx_latencies),
+        "lock_waiters_avg": round(sum(lock_samples) / len(lock_samples), 3) if lock_samples else 0.0,
+        "lock_waiters_max": max(lock_samples, default=0),
+        "conversation_row_updates": after["n_tup_upd"] - before["n_tup_upd"],
+        "conversation_hot_updates": after["n_tup_hot_upd"] - before["n_tup_hot_upd"],
+        "conversation_dead_tuples_delta": after["n_dead_tup"] - before["n_dead_tup"],
+    }
+
+
+async def _main(args: argparse.Namespace) -> None:
+    results: dict[str, Any] = {
+        "senders": args.senders,
+        "messages_per_sender": args.messages,
+        "deferred_flush_ms": args.flush_ms,
+    }
+    for mode in args.modes:
+        results[mode] = await _run_mode(mode, args.senders, args.messages, args.flush_ms)
+    write_results("touch_contention", results, args.output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--senders", type=int, default=32)
+    parser.add_argument("--messages", type=int, default=100, help="messages per sender")
+    parser.add_argument("--flush-ms", type=int, default=settings.CONVERSATION_TOUCH_FLUSH_MS)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", help="write JSON results to this file")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
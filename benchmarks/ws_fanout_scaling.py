@@ -0,0 +1,189 @@
+"""WebSocket fan-out throughput against the number of API worker processes.
+
+Every node receives every Pub/Sub event and writes it to its own sockets,
+so a node's fan-out capacity is bounded by the one core its event loop runs
+on. This starts the API supervisor with 1, 2, 4, ... workers sharing one
+port via SO_REUSEPORT, each running the real ConnectionManager behind a
+minimal app. ``--clients`` WebSocket clients (spread over
+``--client-procs`` processes) connect and subscribe to one conversation.
+Then every worker broadcasts ``--events`` frames, as it would for events
+arriving from Redis, and the clients count deliveries.
+
+Reported per worker count: delivered frames per second, the time until
+the last frame arrived, and how the kernel spread the connections.
+
+No services needed, but clients compete with workers for CPU. Give the
+run at least workers + client processes cores (or run on a bigger box)
+for the numbers to show scaling rather than contention:
+
+    PYTHONPATH=src python -m benchmarks.ws_fanout_scaling --workers 1,2,4 --clients 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager
+from functools import partial
+from multiprocessing.queues import Queue
+from multiprocessing.synchronize import Event
+from typing import Any, AsyncIterator
+
+import uvicorn
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+
+from benchmarks._stats import write_results
+from chat_service.infrastructure.ws.manager import ConnectionManager
+from chat_service.supervisor import Supervisor, serve_reuseport
+
+CONVERSATION = uuid.UUID(int=1)
+
+
+def _fanout_worker(
+    port: int, go: Event, events: int, payload_bytes: int, index: int, ready: Event,
+) -> None:
+    manager = ConnectionManager()
+    data = {"conversation_id": str(CONVERSATION), "worker": index, "body": "x" * payload_bytes}
+
+    async def broadcast() -> None:
+        await asyncio.to_thread(go.wait)
+        for _ in range(events):
+            await manager.broadcast_to_conversation(CONVERSATION, "message.created", data)
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+        task = asyncio.create_task(broadcast())
+        yield
+        task.cancel()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket) -> None:
+        key = f"client:{id(websocket)}"
+        await manager.connect(websocket, key)
+        manager.subscribe(key, CONVERSATION)
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            manager.disconnect(websocket, key)
+
+    config = uvicorn.Config(app, log_level="warning", ws_max_queue=1024)
+    serve_reuseport(config, "127.0.0.1", port, ready)
+
+
+def _client_process(
+    port: int, clients: int, events: int, connected: Queue, results: Queue,
+) -> None:
+    from websockets.asyncio.client import connect
+
+    async def one(done: list[tuple[int, int, float]]) -> None:
+        async with connect(f"ws://127.0.0.1:{port}/ws", max_queue=None) as ws:
+            connected.put(1)
+            worker, received = -1, 0
+            async for frame in ws:
+                if worker < 0:
+                    worker = json.loads(frame)["data"]["worker"]
+                received += 1
+                if received == events:
+                    break
+            done.append((worker, received, time.time()))
+
+    async def run() -> None:
+        done: list[tuple[int, int, float]] = []
+        await asyncio.gather(*(one(done) for _ in range(clients)))
+        results.put(done)
+
+    asyncio.run(run())
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_once(
+    workers: int, clients: int, client_procs: int, events: int, payload: int,
+) -> dict[str, Any]:
+    ctx = multiprocessing.get_context("spawn")
+    port = _free_port()
+    go = ctx.Event()
+    supervisor = Supervisor(partial(_fanout_worker, port, go, events, payload), workers)
+    supervisor.start()
+    connected: Queue = ctx.Queue()
+    results: Queue = ctx.Queue()
+    shares = [clients // client_procs + (i < clients % client_procs) for i in range(client_procs)]
+    procs = [
+        ctx.Process(target=_client_process, args=(port, share, events, connected, results))
+        for share in shares if share
+    ]
+    try:
+        for proc in procs:
+            proc.start()
+        for _ in range(clients):
+            connected.get(timeout=60)
+        time.sleep(0.2)  # the last handshakes' subscribe() runs just after the 101
+        started = time.time()
+        go.set()
+        done = [item for _ in procs for item in results.get(timeout=600)]
+    finally:
+        supervisor.stop()
+        for proc in procs:
+            proc.join(5)
+            if proc.is_alive():
+                proc.kill()
+
+    elapsed = max(finished for _, _, finished in done) - started
+    delivered = sum(received for _, received, _ in done)
+    spread = Counter(worker for worker, _, _ in done)
+    return {
+        "workers": workers,
+        "delivered": delivered,
+        "elapsed_s": round(elapsed, 3),
+        "frames_per_s": round(delivered / elapsed) if elapsed > 0 else None,
+        "connections_per_worker": [spread.get(i, 0) for i in range(workers)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--client-procs", type=int, default=4)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--payload-bytes", type=int, default=200)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    runs = []
+    for workers in (int(n) for n in args.workers.split(",")):
+        run = run_once(workers, args.clients, args.client_procs, args.events, args.payload_bytes)
+        print(f"workers={workers}: {run['frames_per_s']} frames/s", flush=True)
+        runs.append(run)
+    baseline = runs[0]["frames_per_s"]
+    for run in runs:
+        run["speedup"] = round(run["frames_per_s"] / baseline, 2) if baseline else None
+    write_results(
+        "ws_fanout_scaling",
+        {
+            "clients": args.clients,
+            "client_procs": args.client_procs,
+            "events": args.events,
+            "payload_bytes": args.payload_bytes,
+            "runs": runs,
+        },
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
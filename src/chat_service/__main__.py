@@ -1,17 +1,41 @@
 """Entrypoint: python -m chat_service"""
 from __future__ import annotations
 
+import logging
+from functools import partial
+
 import uvicorn
 
+from chat_service.config import settings
+from chat_service.supervisor import Supervisor, default_worker_count, run_api_worker
+
 
 def main() -> None:
-    uvicorn.run(
-        "chat_service.app:create_app",
-        factory=True,
-        host="0.0.0.0",
-        port=8000,
-        log_level="info",
+    workers = settings.API_WORKERS or default_worker_count()
+    if workers == 1:
+        uvicorn.run(
+            "chat_service.app:create_app",
+            factory=True,
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            log_level="info",
+            timeout_graceful_shutdown=settings.API_GRACEFUL_SHUTDOWN_SECONDS,
+        )
+        return
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    target = partial(
+        run_api_worker,
+        settings.API_HOST,
+        settings.API_PORT,
+        settings.API_GRACEFUL_SHUTDOWN_SECONDS,
+        settings.API_WORKER_METRICS_PORT,
     )
+    Supervisor(
+        target, workers, stop_timeout=settings.API_GRACEFUL_SHUTDOWN_SECONDS + 5,
+    ).run()
 
 
 if __name__ == "__main__":
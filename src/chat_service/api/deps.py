@@ -1,16 +1,25 @@
 """FastAPI dependency injection helpers."""
 from __future__ import annotations
 
+from contextlib import AbstractAsyncContextManager
 from typing import Annotated, AsyncIterator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from starlette.applications import Starlette
 
 from chat_service.application.dto.principal import Principal
 from chat_service.application.ports.auth import TokenVerifier
+from chat_service.application.ports.block_list import BlockList
+from chat_service.application.ports.cache import IdempotencyCache
+from chat_service.application.ports.metrics import PhaseTimer
+from chat_service.application.ports.rate_limit import RateLimiter
+from chat_service.application.uow import UnitOfWork
 from chat_service.config import settings
 from chat_service.domain.value_objects.enums import ParticipantKind
+from chat_service.infrastructure.auth.caching_verifier import CachingTokenVerifier
 from chat_service.infrastructure.auth.hs256_verifier import HS256Verifier
+from chat_service.infrastructure.auth.jwks_store import AsyncJWKSKeyStore
 from chat_service.infrastructure.auth.jwks_verifier import JWKSVerifier
 from chat_service.infrastructure.db.session import AsyncSessionLocal
 from chat_service.infrastructure.db.uow import SqlAlchemyUoW
@@ -18,23 +27,85 @@ from chat_service.infrastructure.db.uow import SqlAlchemyUoW
 _bearer_scheme = HTTPBearer()
 
 
-async def get_uow() -> AsyncIterator[SqlAlchemyUoW]:
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
-        try:
-            yield uow
-        finally:
-            await session.close()
+def new_uow(app: Starlette) -> AbstractAsyncContextManager[UnitOfWork]:
+    """Build a UoW as configured by the app lifespan (plain lazy UoW otherwise).
 
+    The session (and its pooled connection) is only opened on first repository use.
+    """
+    factory = getattr(app.state, "uow_factory", None)
+    if factory is None:
+        return SqlAlchemyUoW(
+            session_factory=AsyncSessionLocal, outbox_frames=settings.OUTBOX_PRERENDER_FRAMES,
+        )
+    return factory()
 
-UoWDep = Annotated[SqlAlchemyUoW, Depends(get_uow)]
+
+async def get_uow(request: Request) -> AsyncIterator[UnitOfWork]:
+    async with new_uow(request.app) as uow:
+        yield uow
+
+
+UoWDep = Annotated[UnitOfWork, Depends(get_uow)]
+
+
+def get_idempotency_cache(request: Request) -> IdempotencyCache | None:
+    return getattr(request.app.state, "idempotency_cache", None)
+
+
+IdempotencyCacheDep = Annotated[IdempotencyCache | None, Depends(get_idempotency_cache)]
+
+
+def get_block_list(request: Request) -> BlockList | None:
+    return getattr(request.app.state, "block_list", None)
+
+
+BlockListDep = Annotated[BlockList | None, Depends(get_block_list)]
+
+
+def get_rate_limiter(request: Request) -> RateLimiter | None:
+    return getattr(request.app.state, "rate_limiter", None)
+
+
+RateLimiterDep = Annotated[RateLimiter | None, Depends(get_rate_limiter)]
+
+
+def get_send_phases(request: Request) -> PhaseTimer | None:
+    return getattr(request.app.state, "send_phases", None)
+
+
+SendPhasesDep = Annotated[PhaseTimer | None, Depends(get_send_phases)]
+
+
+_jwks_store: AsyncJWKSKeyStore | None = None
+
+
+def get_jwks_store() -> AsyncJWKSKeyStore:
+    global _jwks_store  # noqa: PLW0603
+    if _jwks_store is None:
+        assert settings.JWKS_URL, "JWKS_URL must be set when JWT_VERIFY_MODE=jwks"
+        _jwks_store = AsyncJWKSKeyStore(
+            settings.JWKS_URL,
+            refresh_interval=settings.JWKS_REFRESH_SECONDS,
+            min_refresh_interval=settings.JWKS_MIN_REFRESH_SECONDS,
+            timeout=settings.JWKS_HTTP_TIMEOUT_SECONDS,
+        )
+    return _jwks_store
 
 
 def _get_verifier() -> TokenVerifier:
+    verifier: TokenVerifier
     if settings.JWT_VERIFY_MODE == "jwks":
-        assert settings.JWKS_URL, "JWKS_URL must be set when JWT_VERIFY_MODE=jwks"
-        return JWKSVerifier(settings.JWKS_URL)
-    return HS256Verifier(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+        verifier = JWKSVerifier(get_jwks_store())
+    else:
+        verifier = HS256Verifier(settings.JWT_SECRET, settings.JWT_ALGORITHM)
+    if settings.JWT_CACHE_MAX_ENTRIES > 0:
+        verifier = CachingTokenVerifier(
+            verifier,
+            max_entries=settings.JWT_CACHE_MAX_ENTRIES,
+            expiry_margin=settings.JWT_CACHE_EXPIRY_MARGIN_SECONDS,
+            max_ttl=settings.JWT_CACHE_MAX_TTL_SECONDS,
+        )
+    return verifier
 
 
 _verifier: TokenVerifier | None = None
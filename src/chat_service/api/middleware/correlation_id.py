@@ -1,28 +1,57 @@
+"""Correlation id for HTTP requests and WebSocket sessions (pure ASGI)."""
 from __future__ import annotations
 
 import uuid
 from contextvars import ContextVar
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 correlation_id_ctx: ContextVar[str] = ContextVar("correlation_id", default="")
 
 HEADER = "X-Request-ID"
+_HEADER_KEY = HEADER.lower().encode()
+_MAX_LENGTH = 128
 
 
-class CorrelationIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response | None:
-        cid = request.headers.get(HEADER) or uuid.uuid4().hex
+def _incoming_id(scope: Scope) -> str | None:
+    for key, value in scope.get("headers", ()):
+        if key == _HEADER_KEY:
+            cid = value.decode("latin-1")
+            # Client-supplied ids end up in logs and response headers.
+            if 0 < len(cid) <= _MAX_LENGTH and cid.isprintable():
+                return cid
+            return None
+    return None
+
+
+class CorrelationIdMiddleware:
+    """Takes ``X-Request-ID`` from the request (or makes one up) for the
+    duration of an HTTP request or a whole WebSocket session.
+
+    The id is available through ``correlation_id_ctx`` and
+    ``request.state.correlation_id`` and is echoed in the response headers,
+    for WebSockets in the handshake response.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        cid = _incoming_id(scope) or uuid.uuid4().hex
+        scope.setdefault("state", {})["correlation_id"] = cid
+        header = (_HEADER_KEY, cid.encode("latin-1"))
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] in ("http.response.start", "websocket.accept"):
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
         token = correlation_id_ctx.set(cid)
         try:
-            response = await call_next(request)
-            response.headers[HEADER] = cid
-            return response
+            await self.app(scope, receive, send_with_id)
         finally:
             correlation_id_ctx.reset(token)
@@ -1,30 +1,89 @@
-"""Lightweight request timing middleware (placeholder for Prometheus / OTel)."""
+"""Request and WebSocket session timing (pure ASGI)."""
 from __future__ import annotations
 
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from chat_service.api.middleware.correlation_id import correlation_id_ctx
+from chat_service.infrastructure.metrics import http_request_seconds
 
 logger = logging.getLogger(__name__)
 
 
-class RequestTimingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: RequestResponseEndpoint,
-    ) -> Response:
+class RequestTimingMiddleware:
+    """Logs method, path, status and duration of every HTTP request and
+    records the duration in ``chat_http_request_seconds``.
+
+    WebSocket sessions are logged once they end, with the time from the
+    handshake to the close and the close code (403 when the handshake was
+    rejected, 1006 when the handler returned without closing). Exceptions are logged with status 500 and re-raised.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_request_seconds.labels(scope["method"], str(status_code)).observe(elapsed)
+            logger.info(
+                "%s %s %s %.1fms rid=%s",
+                scope["method"],
+                scope["path"],
+                status_code,
+                elapsed * 1000,
+                correlation_id_ctx.get(),
+            )
+
+    async def _websocket(self, scope: Scope, receive: Receive, send: Send) -> None:
         start = time.perf_counter()
-        response = await call_next(request)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        logger.info(
-            "%s %s %s %.1fms",
-            request.method,
-            request.url.path,
-            response.status_code,
-            elapsed_ms,
-        )
-        return response
+        accepted = False
+        close_code: int | None = None
+
+        async def receive_tracked() -> Message:
+            nonlocal close_code
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                close_code = message.get("code", 1000)
+            return message
+
+        async def send_tracked(message: Message) -> None:
+            nonlocal accepted, close_code
+            if message["type"] == "websocket.accept":
+                accepted = True
+            elif message["type"] == "websocket.close" and close_code is None:
+                close_code = message.get("code", 1000)
+            await send(message)
+
+        try:
+            await self.app(scope, receive_tracked, send_tracked)
+        finally:
+            logger.info(
+                "WS %s %s %.1fms code=%s rid=%s",
+                scope["path"],
+                "session" if accepted else "rejected",
+                (time.perf_counter() - start) * 1000,
+                close_code if close_code is not None else (1006 if accepted else 403),
+                correlation_id_ctx.get(),
+            )
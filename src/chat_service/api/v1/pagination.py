@@ -0,0 +1,44 @@
+"""Next-page cursors for list endpoints.
+
+List responses stay plain JSON arrays; a full page advertises the cursor
+of the following one in the ``X-Next-Cursor`` header.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Protocol, Sequence
+from uuid import UUID
+
+from fastapi import Response
+
+from chat_service.infrastructure.db.repositories._cursor import encode_cursor
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class _Message(Protocol):
+    id: UUID
+    created_at: datetime
+
+
+class _Conversation(Protocol):
+    id: UUID
+    last_message_at: datetime | None
+
+
+def set_messages_cursor(response: Response, page: Sequence[_Message], limit: int) -> None:
+    if page and len(page) >= limit:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+
+def set_conversations_cursor(
+    response: Response, page: Sequence[_Conversation], limit: int,
+) -> None:
+    # Conversations list newest activity first; a page ending on one without
+    # messages is the last one (cursors stop before them, as in SQL).
+    if page and len(page) >= limit and page[-1].last_message_at is not None:
+        last = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last.last_message_at, last.id, descending=True,
+        )
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
 
-from chat_service.api.deps import CurrentAdmin, UoWDep
+from chat_service.api.deps import CurrentAdmin, IdempotencyCacheDep, UoWDep
+from chat_service.api.v1.pagination import set_conversations_cursor, set_messages_cursor
 from chat_service.api.v1.schemas.admin import AdminConversationFilters, PatchConversationRequest
 from chat_service.api.v1.schemas.conversation import ConversationResponse
 from chat_service.api.v1.schemas.message import MessageResponse, SendMessageRequest
@@ -19,6 +20,7 @@ router = APIRouter(prefix="/api/v1/chat/admin/conversations", tags=["admin"])
 async def list_conversations(
     admin: CurrentAdmin,
     uow: UoWDep,
+    response: Response,
     status: ConversationStatus | None = Query(None),
     assignee_admin_id: int | None = Query(None),
     cursor: str | None = Query(None),
@@ -31,6 +33,7 @@ async def list_conversations(
         limit=limit,
     )
     convs = await admin_service.list_conversations(filters, uow)
+    set_conversations_cursor(response, convs, limit)
     return [ConversationResponse.model_validate(c, from_attributes=True) for c in convs]
 
 
@@ -67,12 +70,14 @@ async def list_messages(
     conversation_id: UUID,
     admin: CurrentAdmin,
     uow: UoWDep,
+    response: Response,
     cursor: str | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
 ) -> list[MessageResponse]:
     messages = await message_service.list_messages(
         conversation_id, admin, cursor, limit, uow,
     )
+    set_messages_cursor(response, messages, limit)
     return [MessageResponse.model_validate(m, from_attributes=True) for m in messages]
 
 
@@ -82,6 +87,7 @@ async def send_message(
     body: SendMessageRequest,
     admin: CurrentAdmin,
     uow: UoWDep,
+    idempotency: IdempotencyCacheDep,
 ) -> MessageResponse:
     msg, _created = await message_service.send_message(
         conversation_id,
@@ -90,5 +96,6 @@ async def send_message(
         body.type,
         body.body,
         uow,
+        idempotency=idempotency,
     )
     return MessageResponse.model_validate(msg, from_attributes=True)
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
 
 from chat_service.api.deps import CurrentPrincipal, UoWDep
+from chat_service.api.v1.pagination import set_conversations_cursor
 from chat_service.api.v1.schemas.conversation import ConversationResponse
 from chat_service.services import conversation_service
 
@@ -26,12 +27,14 @@ async def create_support_conversation(
 async def list_conversations(
     principal: CurrentPrincipal,
     uow: UoWDep,
+    response: Response,
     cursor: str | None = Query(None),
     limit: int = Query(20, ge=1, le=100),
 ) -> list[ConversationResponse]:
     convs = await conversation_service.list_user_conversations(
         principal, cursor, limit, uow,
     )
+    set_conversations_cursor(response, convs, limit)
     return [ConversationResponse.model_validate(c, from_attributes=True) for c in convs]
 
 
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
-from sqlalchemy import text
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from chat_service.infrastructure.db.session import AsyncSessionLocal
+from chat_service.infrastructure.metrics import render_latest
 
 router = APIRouter(tags=["health"])
 
@@ -16,23 +16,16 @@ async def healthz() -> dict[str, str]:
 
 @router.get("/readyz")
 async def readyz(request: Request) -> JSONResponse:
-    errors: list[str] = []
-
-    try:
-        async with AsyncSessionLocal() as session:
-            await session.execute(text("SELECT 1"))
-    except Exception as exc:  # noqa: BLE001
-        errors.append(f"postgres: {exc}")
-
-    try:
-        redis = request.app.state.redis
-        await redis.ping()
-    except Exception as exc:  # noqa: BLE001
-        errors.append(f"redis: {exc}")
-
-    if errors:
+    """Last result of the background ReadinessProber; never touches a dependency."""
+    prober = getattr(request.app.state, "readiness", None)
+    if prober is None:
         return JSONResponse(
             status_code=503,
-            content={"status": "unavailable", "errors": errors},
+            content={"status": "unavailable", "error": "readiness prober not running"},
         )
-    return JSONResponse(content={"status": "ready"})
+    return JSONResponse(status_code=200 if prober.ready else 503, content=prober.snapshot())
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -2,9 +2,17 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from fastapi import APIRouter, Query
-
-from chat_service.api.deps import CurrentPrincipal, UoWDep
+from fastapi import APIRouter, Query, Response
+
+from chat_service.api.deps import (
+    BlockListDep,
+    CurrentPrincipal,
+    IdempotencyCacheDep,
+    RateLimiterDep,
+    SendPhasesDep,
+    UoWDep,
+)
+from chat_service.api.v1.pagination import set_messages_cursor
 from chat_service.api.v1.schemas.message import MessageResponse, SendMessageRequest
 from chat_service.services import message_service
 
@@ -16,12 +24,14 @@ async def list_messages(
     conversation_id: UUID,
     principal: CurrentPrincipal,
     uow: UoWDep,
+    response: Response,
     cursor: str | None = Query(None),
     limit: int = Query(50, ge=1, le=200),
 ) -> list[MessageResponse]:
     messages = await message_service.list_messages(
         conversation_id, principal, cursor, limit, uow,
     )
+    set_messages_cursor(response, messages, limit)
     return [MessageResponse.model_validate(m, from_attributes=True) for m in messages]
 
 
@@ -31,6 +41,10 @@ async def send_message(
     body: SendMessageRequest,
     principal: CurrentPrincipal,
     uow: UoWDep,
+    idempotency: IdempotencyCacheDep,
+    block_list: BlockListDep,
+    rate_limiter: RateLimiterDep,
+    phases: SendPhasesDep,
 ) -> MessageResponse:
     msg, _created = await message_service.send_message(
         conversation_id,
@@ -39,5 +53,9 @@ async def send_message(
         body.type,
         body.body,
         uow,
+        idempotency=idempotency,
+        block_list=block_list,
+        rate_limiter=rate_limiter,
+        phases=phases,
     )
     return MessageResponse.model_validate(msg, from_attributes=True)
@@ -6,13 +6,12 @@ from uuid import UUID
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
-from chat_service.api.deps import get_verifier
+from chat_service.api.deps import get_verifier, new_uow
 from chat_service.application.dto.principal import Principal
+from chat_service.application.exceptions import RateLimitedError
 from chat_service.config import settings
-from chat_service.infrastructure.db.session import AsyncSessionLocal
-from chat_service.infrastructure.db.uow import SqlAlchemyUoW
 from chat_service.infrastructure.ws.manager import ConnectionManager
-from chat_service.infrastructure.ws.protocol import WsInbound, WsOutbound
+from chat_service.infrastructure.ws.protocol import WsInbound, WsOutbound, render_event_frame
 from chat_service.services import message_service, read_state_service
 from chat_service.domain.value_objects.enums import MessageType
 
@@ -98,7 +97,7 @@ async def _read_loop(ws: WebSocket, principal: Principal) -> None:
             await _handle_send(ws, principal, msg.data)
 
         elif msg.type == "mark_read":
-            await _handle_mark_read(principal, msg.data)
+            await _handle_mark_read(ws, principal, msg.data)
 
         else:
             await ws.send_text(
@@ -118,43 +117,54 @@ async def _handle_send(ws: WebSocket, principal: Principal, data: dict) -> None:
         )
         return
 
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
+    # No local broadcast: the sender's sockets get a new message like every
+    # other subscriber's, from the Pub/Sub fan-out of its outbox event.
+    async with new_uow(ws.app) as uow:
         try:
             msg, created = await message_service.send_message(
                 conversation_id, principal, client_msg_id, msg_type, body, uow,
+                idempotency=getattr(ws.app.state, "idempotency_cache", None),
+                block_list=getattr(ws.app.state, "block_list", None),
+                rate_limiter=getattr(ws.app.state, "rate_limiter", None),
+                phases=getattr(ws.app.state, "send_phases", None),
             )
+        except RateLimitedError as exc:
+            await ws.send_text(
+                WsOutbound(type="error", data={
+                    "code": "rate_limited",
+                    "detail": exc.detail,
+                    "retry_after": round(exc.retry_after, 3),
+                    "client_msg_id": str(client_msg_id),
+                }).model_dump_json()
+            )
+            return
         except Exception as exc:
             await ws.send_text(
                 WsOutbound(type="error", data={"code": "send_failed", "detail": str(exc)}).model_dump_json()
             )
             return
 
-    msg_data = {
-        "conversation_id": str(msg.conversation_id),
-        "message": {
-            "id": str(msg.id),
-            "conversation_id": str(msg.conversation_id),
-            "sender_kind": msg.sender_kind,
-            "sender_id": msg.sender_id,
-            "type": msg.type,
-            "body": msg.body,
-            "client_msg_id": str(msg.client_msg_id),
-            "created_at": msg.created_at.isoformat(),
-        },
-    }
-    await manager.broadcast_to_conversation(conversation_id, "message.created", msg_data)
-
-
-async def _handle_mark_read(principal: Principal, data: dict) -> None:
+    if not created:
+        # A retry of a stored message publishes nothing: echo it to this socket.
+        frame = render_event_frame(
+            message_service.MESSAGE_CREATED, message_service.message_created_payload(msg),
+        )
+        await ws.send_text(frame.decode())
+
+
+async def _handle_mark_read(ws: WebSocket, principal: Principal, data: dict) -> None:
     try:
         conversation_id = UUID(data["conversation_id"])
         last_message_id = UUID(data["last_message_id"])
     except (KeyError, ValueError):
         return
 
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
+    buffer = getattr(ws.app.state, "read_state_buffer", None)
+    if buffer is not None:
+        buffer.add(conversation_id, principal, last_message_id)
+        return
+
+    async with new_uow(ws.app) as uow:
         try:
             await read_state_service.mark_read(
                 conversation_id, principal, last_message_id, uow,
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import math
 from contextlib import asynccontextmanager
-from typing import Any, AsyncIterator
+from functools import partial
+from typing import AsyncIterator
 from uuid import UUID
 
 import redis.asyncio as aioredis
@@ -10,7 +13,10 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from chat_service.api.deps import get_jwks_store, get_verifier
 from chat_service.api.middleware.correlation_id import CorrelationIdMiddleware
+from chat_service.api.middleware.metrics import RequestTimingMiddleware
+from chat_service.api.v1.pagination import NEXT_CURSOR_HEADER
 from chat_service.api.v1.routers import (
     admin_conversations,
     conversations,
@@ -22,20 +28,81 @@ from chat_service.application.exceptions import (
     ConflictError,
     ForbiddenError,
     NotFoundError,
+    RateLimitedError,
     ValidationError,
 )
+from chat_service.application.policies.rate_limit import RateLimit
 from chat_service.config import settings
-from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubSubscriber
+from chat_service.infrastructure.auth.caching_verifier import CachingTokenVerifier
+from chat_service.infrastructure.auth.jwks_store import AsyncJWKSKeyStore
+from chat_service.infrastructure.bus.dedup import RecentIds
+from chat_service.infrastructure.bus.post_commit import PostCommitPublisher
+from chat_service.infrastructure.bus.redis_pubsub import (
+    RedisPubSubPublisher,
+    RedisPubSubSubscriber,
+    conversation_key,
+)
+from chat_service.infrastructure.bus.serializer import EventEnvelope, get_codec
+from chat_service.infrastructure.bus.trace import NODE_STAGES, emit_spans, spans_available
+from chat_service.infrastructure.cache.block_list import InMemoryBlockList
+from chat_service.infrastructure.cache.rate_limiter import RedisSlidingWindow, TieredRateLimiter
+from chat_service.infrastructure.cache.redis_idempotency import RedisIdempotencyCache
+from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+from chat_service.infrastructure.db.pool import PoolHealthChecker
+from chat_service.infrastructure.db.session import AsyncSessionLocal, engine
+from chat_service.infrastructure.db.uow import SqlAlchemyUoW
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.infrastructure.metrics import (
+    observe_delivery,
+    send_message_phases,
+    track_post_commit,
+    track_pubsub_dedup,
+    track_pubsub_subscriber,
+    track_rate_limiter,
+    track_readiness,
+    track_token_cache,
+    track_ws_manager,
+)
+from chat_service.infrastructure.readiness import (
+    Probe,
+    ReadinessProber,
+    postgres_probe,
+    pubsub_probe,
+    redis_probe,
+)
+from chat_service.services.block_service import USER_BLOCK_CHANGED
+from chat_service.services.read_state_service import ReadStateBuffer
+from chat_service.tasks import cancel_task
+from chat_service.workers.outbox_worker import relay_outbox
 
 logger = logging.getLogger(__name__)
 
 
-async def _on_pubsub_event(event_type: str, data: dict[str, Any]) -> None:
-    """Dispatch a Redis Pub/Sub event to local WS connections."""
+async def _on_pubsub_event(
+    envelope: EventEnvelope,
+    *,
+    block_list: InMemoryBlockList | None = None,
+    trace_spans: bool = False,
+    seen: RecentIds | None = None,
+) -> None:
+    """Dispatch a Redis Pub/Sub event to local state and WS connections.
+
+    With ``seen`` an event whose id was already delivered is dropped.
+    """
     from chat_service.api.v1.routers.ws import get_manager
 
+    if seen is not None and envelope.event_id is not None and not seen.add(envelope.event_id):
+        return
+
+    if envelope.event_type == USER_BLOCK_CHANGED:
+        if block_list is not None:
+            data = envelope.data
+            block_list.apply(int(data["user_id"]), bool(data["blocked"]))
+        return
+
     manager = get_manager()
-    conversation_id_raw = data.get("conversation_id")
+    conversation_id_raw = envelope.conversation_id
     if not conversation_id_raw:
         return
 
@@ -44,7 +111,21 @@ async def _on_pubsub_event(event_type: str, data: dict[str, Any]) -> None:
     except ValueError:
         return
 
-    await manager.broadcast_to_conversation(conversation_id, event_type, data)
+    if envelope.frame is not None:
+        # Rendered once by the outbox writer: forward without decoding.
+        sent = await manager.broadcast_raw(conversation_id, envelope.frame.decode())
+    else:
+        sent = await manager.broadcast_to_conversation(
+            conversation_id, envelope.event_type, envelope.data,
+        )
+
+    trace = envelope.trace
+    if trace is not None and sent:
+        # Only nodes that delivered report, so "total" is commit to socket.
+        trace.mark("written")
+        observe_delivery(trace, NODE_STAGES, total=True)
+        if trace_spans:
+            emit_spans(trace, envelope.event_type, conversation_id_raw)
 
 
 @asynccontextmanager
@@ -54,19 +135,170 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         settings.REDIS_URL,
         decode_responses=True,
     )
+    # Pub/Sub envelopes may be binary (msgpack), so the bus gets its own raw client.
+    app.state.bus_redis = aioredis.from_url(settings.REDIS_URL)
     logger.info("Redis connection pool created")
 
+    if settings.IDEMPOTENCY_CACHE_TTL_SECONDS > 0:
+        app.state.idempotency_cache = RedisIdempotencyCache(
+            app.state.redis, settings.IDEMPOTENCY_CACHE_TTL_SECONDS,
+        )
+
+    if settings.RATE_LIMIT_USER_MESSAGES > 0 or settings.RATE_LIMIT_CONVERSATION_MESSAGES > 0:
+        rate_limiter = TieredRateLimiter(
+            RedisSlidingWindow(app.state.redis),
+            per_principal=RateLimit(
+                settings.RATE_LIMIT_USER_MESSAGES, settings.RATE_LIMIT_WINDOW_SECONDS,
+            ),
+            per_conversation=RateLimit(
+                settings.RATE_LIMIT_CONVERSATION_MESSAGES, settings.RATE_LIMIT_WINDOW_SECONDS,
+            ),
+            burst=settings.RATE_LIMIT_BURST,
+            lease=settings.RATE_LIMIT_LEASE,
+        )
+        app.state.rate_limiter = rate_limiter
+        track_rate_limiter(rate_limiter.stats)
+
+    in_memory = settings.STORAGE_BACKEND == "memory"
+    pool_checker: PoolHealthChecker | None = None
+    if not in_memory:
+        pool_checker = PoolHealthChecker(engine, settings.DB_POOL_HEALTHCHECK_INTERVAL)
+        await pool_checker.start()
+    app.state.pool_checker = pool_checker
+
+    app.state.send_phases = send_message_phases
+    track_ws_manager(ws.get_manager())
+    verifier = get_verifier()
+    if isinstance(verifier, CachingTokenVerifier):
+        track_token_cache(verifier.stats)
+
+    jwks_store: AsyncJWKSKeyStore | None = None
+    if settings.JWT_VERIFY_MODE == "jwks":
+        jwks_store = get_jwks_store()
+        await jwks_store.start()
+
+    last_activity: LastActivityAggregator | None = None
+    outbox_relay: asyncio.Task[None] | None = None
+    post_commit: PostCommitPublisher | None = None
+    publisher = RedisPubSubPublisher(app.state.redis, get_codec(settings.EVENT_CODEC))
+    if in_memory:
+        # No separate outbox worker can see this store, so relay in-process.
+        logger.warning("STORAGE_BACKEND=memory: data is process-local and lost on restart")
+        store = MemoryStore()
+        if settings.OUTBOX_IMMEDIATE_PUBLISH:
+            post_commit = PostCommitPublisher(
+                publisher,
+                settings.REDIS_PUBSUB_CHANNEL,
+                partial(MemoryUoW, store),
+                flush_interval=settings.OUTBOX_ACK_FLUSH_MS / 1000,
+                tracing=settings.DELIVERY_TRACING,
+            )
+        app.state.uow_factory = partial(
+            MemoryUoW,
+            store,
+            outbox_frames=settings.OUTBOX_PRERENDER_FRAMES,
+            post_commit=post_commit,
+        )
+        outbox_relay = asyncio.create_task(relay_outbox(publisher, app.state.uow_factory))
+    else:
+        if settings.CONVERSATION_TOUCH_MODE == "deferred":
+            last_activity = LastActivityAggregator(
+                partial(SqlAlchemyUoW, session_factory=AsyncSessionLocal),
+                flush_interval=settings.CONVERSATION_TOUCH_FLUSH_MS / 1000,
+            )
+            await last_activity.start()
+        if settings.OUTBOX_IMMEDIATE_PUBLISH:
+            post_commit = PostCommitPublisher(
+                publisher,
+                settings.REDIS_PUBSUB_CHANNEL,
+                partial(SqlAlchemyUoW, session_factory=AsyncSessionLocal),
+                flush_interval=settings.OUTBOX_ACK_FLUSH_MS / 1000,
+                tracing=settings.DELIVERY_TRACING,
+            )
+        app.state.uow_factory = partial(
+            SqlAlchemyUoW,
+            session_factory=AsyncSessionLocal,
+            last_activity=last_activity,
+            outbox_frames=settings.OUTBOX_PRERENDER_FRAMES,
+            post_commit=post_commit,
+        )
+    if post_commit is not None:
+        await post_commit.start()
+        track_post_commit(post_commit)
+
+    read_state_buffer: ReadStateBuffer | None = None
+    if settings.READ_STATE_WRITE_BEHIND:
+        read_state_buffer = ReadStateBuffer(
+            app.state.uow_factory,
+            flush_interval=settings.READ_STATE_FLUSH_INTERVAL_MS / 1000,
+            max_pending=settings.READ_STATE_BUFFER_MAX_KEYS,
+        )
+        await read_state_buffer.start()
+    app.state.read_state_buffer = read_state_buffer
+
+    block_list = InMemoryBlockList(
+        app.state.uow_factory, resync_interval=settings.BLOCKLIST_RESYNC_SECONDS,
+    )
+    app.state.block_list = block_list
+
+    trace_spans = settings.DELIVERY_TRACE_SPANS
+    if trace_spans and not spans_available():
+        logger.warning("DELIVERY_TRACE_SPANS is set but opentelemetry-api is not installed")
+        trace_spans = False
+
+    seen: RecentIds | None = None
+    if settings.PUBSUB_DEDUP_WINDOW > 0:
+        seen = RecentIds(settings.PUBSUB_DEDUP_WINDOW)
+        track_pubsub_dedup(seen, settings.REDIS_PUBSUB_CHANNEL)
+    # Subscribe before the block list loads so no change falls between the two.
     subscriber = RedisPubSubSubscriber(
-        app.state.redis,
+        app.state.bus_redis,
         settings.REDIS_PUBSUB_CHANNEL,
-        _on_pubsub_event,
+        partial(_on_pubsub_event, block_list=block_list, trace_spans=trace_spans, seen=seen),
+        dispatchers=settings.PUBSUB_DISPATCHERS,
+        queue_size=settings.PUBSUB_QUEUE_SIZE,
+        partition_key=conversation_key,
+        reconnect_max_delay=settings.PUBSUB_RECONNECT_MAX_DELAY_SECONDS,
     )
     await subscriber.start()
     app.state.pubsub_subscriber = subscriber
+    track_pubsub_subscriber(subscriber, settings.REDIS_PUBSUB_CHANNEL)
+    await block_list.start()
+
+    probes: dict[str, Probe] = {
+        "redis": redis_probe(app.state.redis),
+        "pubsub": pubsub_probe(subscriber),
+    }
+    if not in_memory:
+        probes["postgres"] = postgres_probe(engine)
+    readiness = ReadinessProber(
+        probes,
+        interval=settings.READINESS_PROBE_INTERVAL,
+        timeout=settings.READINESS_PROBE_TIMEOUT,
+        max_loop_lag=settings.READINESS_MAX_LOOP_LAG_MS / 1000,
+    )
+    await readiness.start()
+    app.state.readiness = readiness
+    track_readiness(readiness)
 
     yield
 
+    await readiness.stop()
     await subscriber.stop()
+    await block_list.stop()
+    if read_state_buffer is not None:
+        await read_state_buffer.stop()
+    if post_commit is not None:
+        await post_commit.stop()
+    if last_activity is not None:
+        await last_activity.stop()
+    if outbox_relay is not None:
+        await cancel_task(outbox_relay)
+    if jwks_store is not None:
+        await jwks_store.stop()
+    if pool_checker is not None:
+        await pool_checker.stop()
+    await app.state.bus_redis.aclose()
     await app.state.redis.aclose()
     logger.info("Redis connection pool closed")
 
@@ -84,7 +316,10 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
+    # Added last = outermost: the timing log already sees the correlation id.
+    app.add_middleware(RequestTimingMiddleware)
     app.add_middleware(CorrelationIdMiddleware)
 
     _register_exception_handlers(app)
@@ -114,3 +349,11 @@ def _register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(ValidationError)
     async def _validation(_req: Request, exc: ValidationError) -> JSONResponse:
         return JSONResponse(status_code=422, content={"detail": exc.detail})
+
+    @app.exception_handler(RateLimitedError)
+    async def _rate_limited(_req: Request, exc: RateLimitedError) -> JSONResponse:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": exc.detail, "retry_after": round(exc.retry_after, 3)},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from uuid import UUID
+
+
+@dataclass(frozen=True, slots=True)
+class ReadMarkDTO:
+    """A pending read-state update for one (conversation, kind, subject)."""
+
+    conversation_id: UUID
+    kind: str
+    subject_id: int
+    last_message_id: UUID
+    is_admin: bool = False
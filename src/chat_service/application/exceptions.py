@@ -23,3 +23,11 @@ class ConflictError(AppError):
 
 class ValidationError(AppError):
     pass
+
+
+class RateLimitedError(AppError):
+    """Too many requests; ``retry_after`` is the wait in seconds."""
+
+    def __init__(self, detail: str = "", *, retry_after: float) -> None:
+        super().__init__(detail)
+        self.retry_after = retry_after
@@ -1,5 +1,70 @@
-"""Rate limiting policy — placeholder for MVP."""
+"""Rate limiting policy for message sends."""
 from __future__ import annotations
 
-# TODO: implement token-bucket or sliding-window rate limit
-# For MVP we skip rate limiting on chat messages.
+from collections import OrderedDict
+from dataclasses import dataclass
+from uuid import UUID
+
+from chat_service.application.dto.principal import Principal
+from chat_service.application.exceptions import RateLimitedError
+from chat_service.application.ports.rate_limit import RateLimiter
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """At most ``limit`` events per ``window`` seconds; a limit of 0 disables it."""
+
+    limit: int
+    window: float
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.window
+
+
+class TokenBuckets:
+    """Per-key token buckets in process memory.
+
+    Each key refills at ``rate`` tokens per second up to ``capacity``. Past
+    ``max_keys`` the least recently used key is dropped; it comes back full,
+    which only ever errs on the permissive side.
+    """
+
+    def __init__(self, rate: float, capacity: float, *, max_keys: int = 100_000) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._max_keys = max_keys
+        # key -> [tokens, refilled_at]
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _refill(self, key: str, now: float) -> list[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self._capacity, now]
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+            return bucket
+        self._buckets.move_to_end(key)
+        tokens, refilled_at = bucket
+        bucket[0] = min(self._capacity, tokens + (now - refilled_at) * self._rate)
+        bucket[1] = now
+        return bucket
+
+    def wait_time(self, key: str, now: float) -> float:
+        """Seconds until ``key`` has a whole token (0.0 when it has one now)."""
+        tokens = self._refill(key, now)[0]
+        return 0.0 if tokens >= 1 else (1 - tokens) / self._rate
+
+    def take(self, key: str, now: float) -> None:
+        self._refill(key, now)[0] -= 1
+
+
+async def assert_send_allowed(
+    limiter: RateLimiter, principal: Principal, conversation_id: UUID,
+) -> None:
+    retry_after = await limiter.acquire(principal.principal_key, conversation_id)
+    if retry_after is not None:
+        raise RateLimitedError("Too many messages, slow down", retry_after=retry_after)
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class BlockList(Protocol):
+    """Local view of blocked users, consulted on the send path without I/O."""
+
+    def is_blocked(self, user_id: int) -> bool: ...
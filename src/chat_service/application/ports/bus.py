@@ -1,7 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Protocol
+from typing import Any, Mapping, Protocol
 
 
 class EventPublisher(Protocol):
-    async def publish(self, channel: str, payload: dict[str, Any]) -> None: ...
+    async def publish(
+        self,
+        channel: str,
+        payload: dict[str, Any],
+        *,
+        trace: Mapping[str, float] | None = None,
+        event_id: int | None = None,
+    ) -> None:
+        """``trace``: delivery stage timestamps to carry along (epoch seconds by stage).
+        ``event_id``: identifies the event across repeated publishes."""
+        ...
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Protocol
+from uuid import UUID
+
+from chat_service.domain.entities.message import Message
+
+
+class IdempotencyCache(Protocol):
+    """Front-cache for idempotent sends keyed by (conversation, sender, client_msg_id).
+
+    The DB unique constraint stays the source of truth; the cache only lets
+    retries of an already stored message skip the database.
+    """
+
+    async def get(
+        self,
+        conversation_id: UUID,
+        sender_kind: str,
+        sender_id: int,
+        client_msg_id: UUID,
+    ) -> Message | None: ...
+
+    async def put(self, message: Message) -> None: ...
+
+
+class ConversationDirectory(Protocol):
+    """Local topic -> conversation_id lookup for internal event handlers.
+
+    Entries are hints: a miss falls back to the database, and closing a
+    conversation removes it.
+    """
+
+    def get(self, topic_type: str, topic_id: int) -> UUID | None: ...
+
+    def put(self, topic_type: str, topic_id: int, conversation_id: UUID) -> None: ...
+
+    def invalidate_conversation(self, conversation_id: UUID) -> None: ...
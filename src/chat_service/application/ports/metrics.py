@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class PhaseTimer(Protocol):
+    """Receives the duration of each phase of a use case, in seconds."""
+
+    def observe(self, phase: str, seconds: float) -> None: ...
+
+
+class NullPhaseTimer:
+    """Default implementation that drops every observation."""
+
+    def observe(self, phase: str, seconds: float) -> None:
+        pass
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from typing import Protocol
+from uuid import UUID
+
+
+class RateLimiter(Protocol):
+    """Admission control for message sends, per principal and per conversation.
+
+    ``acquire`` takes one send and returns None if it is allowed, otherwise
+    the seconds until a retry can pass.
+    """
+
+    async def acquire(self, principal_key: str, conversation_id: UUID) -> float | None: ...
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Protocol
+
+
+class BlockedUserReader(Protocol):
+    async def list_blocked_ids(self) -> list[int]: ...
+
+
+class BlockedUserWriter(Protocol):
+    async def block(self, user_id: int, reason: str | None = None) -> bool:
+        """Mark the user as blocked. Returns False if already blocked."""
+        ...
+
+    async def unblock(self, user_id: int) -> bool:
+        """Lift a block. Returns False if the user was not blocked."""
+        ...
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Protocol
+from typing import Mapping, Protocol, Sequence
 from uuid import UUID
 
 from chat_service.application.dto.conversation import ConversationFilterDTO
@@ -21,6 +21,12 @@ class ConversationReader(Protocol):
         """Find a conversation by topic_type + topic_id. Optionally filter by status."""
         ...
 
+    async def get_by_topics(
+        self, topic_type: str, topic_ids: Sequence[int],
+    ) -> dict[int, Conversation]:
+        """Latest conversation per topic_id, for the ids that have one."""
+        ...
+
     async def list_for_user(
         self, user_id: int, *, cursor: str | None = None, limit: int = 20
     ) -> list[Conversation]: ...
@@ -33,10 +39,30 @@ class ConversationReader(Protocol):
 class ConversationWriter(Protocol):
     async def create(self, conversation: Conversation) -> Conversation: ...
 
+    async def create_open_or_get(
+        self,
+        conversation: Conversation,
+        *,
+        owner_user_id: int,
+    ) -> tuple[Conversation, bool]:
+        """Atomically create an open conversation with its owner participant, or
+        return the open one already in its slot.
+
+        Support conversations (no topic_id) are unique per owner, topic
+        conversations per (topic_type, topic_id). Returns (conversation, created).
+        """
+        ...
+
     async def assign(self, conversation_id: UUID, admin_id: int | None) -> None: ...
 
     async def close(self, conversation_id: UUID) -> None: ...
 
     async def touch_last_message_at(
         self, conversation_id: UUID, ts: datetime
+    ) -> None:
+        """Move last_message_at forward to ``ts``; never moves it backwards."""
+        ...
+
+    async def touch_last_message_at_many(
+        self, touches: Mapping[UUID, datetime]
     ) -> None: ...
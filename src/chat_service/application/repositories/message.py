@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Protocol
+from typing import Protocol, Sequence
 from uuid import UUID
 
 from chat_service.domain.entities.message import Message
@@ -21,6 +21,13 @@ class MessageWriter(Protocol):
         """Insert message. Return (message, created). If conflict on client_msg_id → return existing."""
         ...
 
+    async def create_many(self, messages: Sequence[Message]) -> list[Message]:
+        """Insert messages in one statement, skipping client_msg_id conflicts.
+
+        Returns only the messages that were inserted.
+        """
+        ...
+
     async def get_by_client_msg_id(
         self,
         conversation_id: UUID,
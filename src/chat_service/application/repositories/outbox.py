@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Protocol
+from typing import Any, Protocol, Sequence
 
 
 class OutboxWriter(Protocol):
-    async def add(self, event_type: str, payload: dict[str, Any]) -> None: ...
+    async def add(self, event_type: str, payload: dict[str, Any]) -> int:
+        """Returns the record id, which also identifies the event on the bus."""
+        ...
 
-    async def fetch_pending(self, batch_size: int) -> list[OutboxRecord]: ...
+    async def add_many(self, event_type: str, payloads: Sequence[dict[str, Any]]) -> None: ...
+
+    async def fetch_pending(self, batch_size: int, *, min_age: float = 0.0) -> list[OutboxRecord]:
+        """Claims up to ``batch_size`` due records created at least ``min_age`` seconds ago."""
+        ...
+
+    async def count_pending(self) -> int:
+        """Records waiting to be published (pending or failed)."""
+        ...
 
     async def mark_sent(self, ids: list[int]) -> None: ...
 
@@ -17,7 +27,7 @@ class OutboxWriter(Protocol):
 class OutboxRecord:
     """Lightweight read-model for the outbox worker."""
 
-    __slots__ = ("id", "event_type", "payload", "attempts")
+    __slots__ = ("id", "event_type", "payload", "attempts", "frame", "created_at")
 
     def __init__(
         self,
@@ -25,8 +35,12 @@ class OutboxRecord:
         event_type: str,
         payload: dict[str, Any],
         attempts: int,
+        frame: bytes | None = None,
+        created_at: datetime | None = None,
     ) -> None:
         self.id = id
         self.event_type = event_type
         self.payload = payload
         self.attempts = attempts
+        self.frame = frame
+        self.created_at = created_at
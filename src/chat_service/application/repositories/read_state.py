@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Protocol
+from typing import Protocol, Sequence
 from uuid import UUID
 
+from chat_service.application.dto.read_state import ReadMarkDTO
+
 
 class ReadStateWriter(Protocol):
     async def upsert_last_read(
@@ -12,3 +14,13 @@ class ReadStateWriter(Protocol):
         subject_id: int,
         last_message_id: UUID,
     ) -> None: ...
+
+    async def upsert_last_read_many(self, marks: Sequence[ReadMarkDTO]) -> int:
+        """Apply many read marks in one statement. Returns the number of rows written.
+
+        Marks of non-participants (unless ``is_admin``), marks pointing at a
+        message outside the conversation and marks older than the stored
+        position are skipped. Of several marks for one member only the one
+        pointing at the newest message is applied.
+        """
+        ...
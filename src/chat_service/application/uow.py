@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import Protocol
+from contextlib import AbstractAsyncContextManager
+from typing import Awaitable, Callable, Protocol
 
+from chat_service.application.repositories.blocked_user import (
+    BlockedUserReader,
+    BlockedUserWriter,
+)
 from chat_service.application.repositories.conversation import (
     ConversationReader,
     ConversationWriter,
 )
 from chat_service.application.repositories.message import MessageReader, MessageWriter
-from chat_service.application.repositories.outbox import OutboxWriter
+from chat_service.application.repositories.outbox import OutboxRecord, OutboxWriter
 from chat_service.application.repositories.participant import (
     ParticipantReader,
     ParticipantWriter,
@@ -24,7 +29,17 @@ class UnitOfWork(Protocol):
     messages_w: MessageWriter
     read_state_w: ReadStateWriter
     outbox: OutboxWriter
+    blocked_users: BlockedUserReader
+    blocked_users_w: BlockedUserWriter
 
     async def commit(self) -> None: ...
     async def rollback(self) -> None: ...
     async def flush(self) -> None: ...
+
+
+# Opens a fresh UnitOfWork that is released when the context exits.
+UoWFactory = Callable[[], AbstractAsyncContextManager[UnitOfWork]]
+
+# Runs after a successful commit with the outbox records it made durable.
+# Must not raise: the transaction is already committed.
+PostCommitHook = Callable[[list[OutboxRecord]], Awaitable[None]]
@@ -16,6 +16,11 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_HEALTHCHECK_INTERVAL: float = 10.0
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0
+    # "memory": process-local store, single node only, nothing survives a restart.
+    STORAGE_BACKEND: Literal["postgres", "memory"] = "postgres"
 
     REDIS_URL: str = "redis://localhost:6379/0"
 
@@ -23,19 +28,84 @@ class Settings(BaseSettings):
     JWT_VERIFY_MODE: Literal["hs256", "jwks"] = "hs256"
     JWT_ALGORITHM: str = "HS256"
     JWKS_URL: str | None = None
+    JWKS_REFRESH_SECONDS: float = 300.0
+    JWKS_MIN_REFRESH_SECONDS: float = 10.0
+    JWKS_HTTP_TIMEOUT_SECONDS: float = 5.0
+    JWT_CACHE_MAX_ENTRIES: int = 10000
+    JWT_CACHE_EXPIRY_MARGIN_SECONDS: float = 5.0
+    JWT_CACHE_MAX_TTL_SECONDS: float = 300.0
+
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    # Worker processes sharing API_PORT via SO_REUSEPORT; 0 = one per available CPU.
+    API_WORKERS: int = 1
+    API_GRACEFUL_SHUTDOWN_SECONDS: float = 30.0
+    # With several workers, worker i also serves its metrics on this port + i (0: off).
+    API_WORKER_METRICS_PORT: int = 0
 
     CORS_ORIGINS: list[str] = ["*"]
 
+    # Signs issued pagination cursors; empty leaves them unsigned.
+    CURSOR_HMAC_SECRET: str = ""
+    CURSOR_ACCEPT_V1: bool = True
+
     OUTBOX_POLL_INTERVAL: float = 1.0
     OUTBOX_BATCH_SIZE: int = 50
     OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_PRERENDER_FRAMES: bool = False
+    OUTBOX_IMMEDIATE_PUBLISH: bool = True
+    OUTBOX_PUBLISH_GRACE_SECONDS: float = 5.0
+    OUTBOX_ACK_FLUSH_MS: int = 200
+    OUTBOX_WORKER_METRICS_PORT: int = 9101
 
     WS_HEARTBEAT_SECONDS: int = 30
 
+    READINESS_PROBE_INTERVAL: float = 5.0
+    READINESS_PROBE_TIMEOUT: float = 2.0
+    READINESS_MAX_LOOP_LAG_MS: float = 500.0
+
+    CONVERSATION_TOUCH_MODE: Literal["monotonic", "deferred"] = "monotonic"
+    CONVERSATION_TOUCH_FLUSH_MS: int = 500
+
+    READ_STATE_WRITE_BEHIND: bool = True
+    READ_STATE_FLUSH_INTERVAL_MS: int = 250
+    READ_STATE_BUFFER_MAX_KEYS: int = 10000
+
     REDIS_PUBSUB_CHANNEL: str = "chat.fanout"
+    PUBSUB_DISPATCHERS: int = 4
+    PUBSUB_QUEUE_SIZE: int = 10000
+    PUBSUB_RECONNECT_MAX_DELAY_SECONDS: float = 30.0
+    PUBSUB_DEDUP_WINDOW: int = 10000
+    EVENT_CODEC: Literal["legacy", "json", "msgpack"] = "legacy"
+    DELIVERY_TRACING: bool = True
+    DELIVERY_TRACE_SPANS: bool = False
+
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = 86400
+
+    BLOCKLIST_RESYNC_SECONDS: float = 300.0
+
+    # Message sends per window; 0 disables that limit. Admins are exempt.
+    RATE_LIMIT_USER_MESSAGES: int = 30
+    RATE_LIMIT_CONVERSATION_MESSAGES: int = 120
+    RATE_LIMIT_WINDOW_SECONDS: float = 10.0
+    RATE_LIMIT_BURST: int = 10
+    RATE_LIMIT_LEASE: int = 5
+
+    TOPIC_DIRECTORY_MAX_ENTRIES: int = 100000
 
     LEAF_EVENTS_STREAM: str = "leaf.events"
     LEAF_EVENTS_GROUP: str = "chat-service"
+    LEAF_EVENTS_CONCURRENCY: int = 8
+    LEAF_EVENTS_MAX_IN_FLIGHT: int = 100
+    LEAF_EVENTS_CLAIM_IDLE_MS: int = 60000
+    LEAF_EVENTS_MAX_DELIVERIES: int = 5
+    LEAF_EVENTS_DLQ_STREAM: str = "leaf.events.dlq"
+    LEAF_EVENTS_BATCH_MODE: bool = True
+    LEAF_EVENTS_BATCH_SIZE: int = 10
+    LEAF_EVENTS_MAX_BATCH_SIZE: int = 100
+    LEAF_EVENTS_BLOCK_MS: int = 5000
+    LEAF_EVENTS_ADAPTIVE_READS: bool = True
+    LEAF_CONSUMER_METRICS_PORT: int = 9102
 
     @property
     def database_url(self) -> str:
@@ -0,0 +1,89 @@
+"""Bounded in-process cache of verified tokens."""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import jwt
+
+from chat_service.application.dto.principal import Principal
+from chat_service.application.ports.auth import TokenVerifier
+
+
+class TokenCacheStats:
+    """Counters for a CachingTokenVerifier."""
+
+    __slots__ = ("hits", "misses", "evictions", "expired")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachingTokenVerifier:
+    """Implements application.ports.auth.TokenVerifier on top of another verifier.
+
+    A successfully verified token is remembered — keyed by its SHA-256, the
+    raw token is never stored — together with the resulting Principal until
+    ``expiry_margin`` seconds before its ``exp`` claim, and never longer than
+    ``max_ttl``. At most ``max_entries`` tokens are kept (LRU). Failures are
+    not cached, so a bad token pays the full check every time.
+    """
+
+    def __init__(
+        self,
+        inner: TokenVerifier,
+        *,
+        max_entries: int = 10_000,
+        expiry_margin: float = 5.0,
+        max_ttl: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._inner = inner
+        self._max_entries = max_entries
+        self._expiry_margin = expiry_margin
+        self._max_ttl = max_ttl
+        self._clock = clock
+        # sha256(token) -> (principal, cache-until unix time)
+        self._entries: OrderedDict[bytes, tuple[Principal, float]] = OrderedDict()
+        self.stats = TokenCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def verify(self, token: str) -> Principal:
+        key = hashlib.sha256(token.encode()).digest()
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            principal, until = entry
+            if now < until:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return principal
+            del self._entries[key]
+            self.stats.expired += 1
+        self.stats.misses += 1
+
+        principal = await self._inner.verify(token)
+        until = now + self._max_ttl
+        # The signature was just checked, reading the claims again is only parsing.
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        if exp is not None:
+            until = min(until, float(exp) - self._expiry_margin)
+        if until > now:
+            self._entries[key] = (principal, until)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+        return principal
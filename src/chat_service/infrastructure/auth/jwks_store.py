@@ -0,0 +1,176 @@
+"""Asynchronous JWKS key store with background refresh."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any
+
+import httpx
+from jwt import PyJWK, PyJWKClientError
+
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class JWKSStoreStats:
+    """Counters for an AsyncJWKSKeyStore."""
+
+    __slots__ = ("fetches", "fetch_failures", "unknown_kid_refreshes", "last_success_at")
+
+    def __init__(self) -> None:
+        self.fetches = 0
+        self.fetch_failures = 0
+        self.unknown_kid_refreshes = 0
+        self.last_success_at: float | None = None
+
+
+class AsyncJWKSKeyStore:
+    """Signing keys from a JWKS endpoint, fetched without blocking the event loop.
+
+    The key set is refreshed in the background at 80% of its lifetime — the
+    endpoint's ``Cache-Control: max-age`` or ``refresh_interval``. A token
+    with an unknown ``kid`` (key rotation) triggers an immediate refresh;
+    concurrent lookups share that one request, and such refreshes happen at
+    most once per ``min_refresh_interval``. When the endpoint is unreachable
+    the last good key set keeps being served.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        *,
+        client: httpx.AsyncClient | None = None,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 10.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self._jwks_url = jwks_url
+        self._client = client or httpx.AsyncClient(timeout=timeout)
+        self._owns_client = client is None
+        self._refresh_interval = refresh_interval
+        self._min_refresh_interval = min_refresh_interval
+        self._keys: dict[str | None, PyJWK] = {}
+        self._lifetime = refresh_interval
+        self._last_attempt = float("-inf")
+        self._inflight: asyncio.Future[None] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.stats = JWKSStoreStats()
+
+    @property
+    def kids(self) -> list[str | None]:
+        return list(self._keys)
+
+    async def start(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            logger.warning("Initial JWKS fetch from %s failed", self._jwks_url, exc_info=True)
+        self._task = asyncio.create_task(self._run(), name="jwks-refresh")
+        logger.info("JWKS key store started (%d keys)", len(self._keys))
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+        if self._owns_client:
+            await self._client.aclose()
+        logger.info("JWKS key store stopped")
+
+    async def get_key(self, kid: str | None) -> PyJWK:
+        key = self._lookup(kid)
+        if key is not None:
+            return key
+        if time.monotonic() - self._last_attempt >= self._min_refresh_interval or self._inflight:
+            self.stats.unknown_kid_refreshes += 1
+            try:
+                await self.refresh()
+            except Exception:
+                logger.warning("JWKS refresh for unknown kid %r failed", kid, exc_info=True)
+            key = self._lookup(kid)
+            if key is not None:
+                return key
+        raise PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+
+    def _lookup(self, kid: str | None) -> PyJWK | None:
+        key = self._keys.get(kid)
+        if key is None and kid is None and len(self._keys) == 1:
+            # Tokens without a kid are accepted when the set has a single key.
+            key = next(iter(self._keys.values()))
+        return key
+
+    async def refresh(self) -> None:
+        """Fetch the key set; concurrent callers wait for the same request."""
+        if self._inflight is not None:
+            await asyncio.shield(self._inflight)
+            return
+        inflight = self._inflight = asyncio.get_running_loop().create_future()
+        try:
+            await self._fetch()
+        except asyncio.CancelledError:
+            inflight.cancel()
+            raise
+        except Exception as exc:
+            inflight.set_exception(exc)
+            # Mark retrieved so an unawaited failure is not logged by asyncio.
+            inflight.exception()
+            raise
+        else:
+            inflight.set_result(None)
+        finally:
+            self._inflight = None
+
+    async def _fetch(self) -> None:
+        self._last_attempt = time.monotonic()
+        self.stats.fetches += 1
+        try:
+            response = await self._client.get(self._jwks_url)
+            response.raise_for_status()
+            keys = self._parse(response.json())
+        except Exception:
+            self.stats.fetch_failures += 1
+            raise
+        if not keys:
+            self.stats.fetch_failures += 1
+            raise PyJWKClientError("The JWKS endpoint did not contain any signing keys")
+        self._keys = keys
+        self._lifetime = self._max_age(response) or self._refresh_interval
+        self.stats.last_success_at = time.time()
+        logger.debug("Fetched %d JWKS keys from %s", len(keys), self._jwks_url)
+
+    @staticmethod
+    def _parse(document: dict[str, Any]) -> dict[str | None, PyJWK]:
+        keys: dict[str | None, PyJWK] = {}
+        for data in document.get("keys", []):
+            if data.get("use", "sig") != "sig":
+                continue
+            try:
+                keys[data.get("kid")] = PyJWK(data)
+            except Exception:
+                logger.warning("Skipping unusable JWKS key %r", data.get("kid"), exc_info=True)
+        return keys
+
+    @staticmethod
+    def _max_age(response: httpx.Response) -> float | None:
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        return float(match.group(1)) if match else None
+
+    async def _run(self) -> None:
+        delay = self._lifetime * 0.8
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.refresh()
+                delay = self._lifetime * 0.8
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Keep serving the previous keys; retry sooner than a full lifetime.
+                delay = max(self._min_refresh_interval, min(delay, self._lifetime * 0.8) / 2)
+                logger.warning(
+                    "JWKS refresh from %s failed, serving %d cached keys, retrying in %.0fs",
+                    self._jwks_url, len(self._keys), delay, exc_info=True,
+                )
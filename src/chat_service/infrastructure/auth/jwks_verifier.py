@@ -3,23 +3,23 @@ from __future__ import annotations
 import logging
 
 import jwt
-from jwt import PyJWKClient
 
 from chat_service.application.dto.principal import Principal
 from chat_service.domain.value_objects.enums import ParticipantKind
+from chat_service.infrastructure.auth.jwks_store import AsyncJWKSKeyStore
 
 logger = logging.getLogger(__name__)
 
 
 class JWKSVerifier:
-    """Verify JWTs using a remote JWKS endpoint."""
+    """Verify JWTs using keys from a remote JWKS endpoint."""
 
-    def __init__(self, jwks_url: str) -> None:
-        self._jwks_url = jwks_url
-        self._jwk_client = PyJWKClient(jwks_url)
+    def __init__(self, key_store: AsyncJWKSKeyStore) -> None:
+        self._key_store = key_store
 
     async def verify(self, token: str) -> Principal:
-        signing_key = self._jwk_client.get_signing_key_from_jwt(token)
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await self._key_store.get_key(kid)
         payload = jwt.decode(
             token,
             signing_key.key,
@@ -0,0 +1,38 @@
+"""Dropping events a node has already delivered.
+
+An outbox record can reach Redis twice: published by the API right after
+its commit and again by the outbox worker when the ack did not land within
+the grace period. Both copies carry the record id, so a node remembers the
+ids it has seen recently and forwards only the first copy.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+
+class RecentIds:
+    """The last ``capacity`` event ids seen, oldest evicted first.
+
+    A duplicate arrives at most a grace period plus a worker poll after the
+    original, so the window needs to cover that many events on the bus.
+    """
+
+    __slots__ = ("_capacity", "_ids", "duplicates")
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = max(1, capacity)
+        self._ids: OrderedDict[int, None] = OrderedDict()
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, event_id: int) -> bool:
+        """Remember ``event_id``; False if it was already seen."""
+        if event_id in self._ids:
+            self.duplicates += 1
+            return False
+        self._ids[event_id] = None
+        if len(self._ids) > self._capacity:
+            self._ids.popitem(last=False)
+        return True
@@ -0,0 +1,120 @@
+"""Publishing outbox events from the API right after their transaction commits.
+
+The outbox worker polls, so an event used to wait up to a poll interval
+(plus a batch) before reaching Redis. PostCommitPublisher is the units of
+work's post-commit hook: it publishes every record the commit made durable
+straight away, then acknowledges the published ones in bulk so the worker
+skips them. The worker stays the fallback — a record whose publish failed,
+or whose ack was lost with the process, is relayed by it once older than
+OUTBOX_PUBLISH_GRACE_SECONDS. Both paths publish under the record id and
+nodes drop the second copy (see ``bus.dedup``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from chat_service.application.repositories.outbox import OutboxRecord
+from chat_service.application.uow import UoWFactory
+from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubPublisher
+from chat_service.infrastructure.bus.trace import WORKER_STAGES, outbox_trace
+from chat_service.infrastructure.metrics import observe_delivery
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
+
+
+class PostCommitStats:
+    """Counters for a PostCommitPublisher."""
+
+    __slots__ = ("published", "failed", "acked", "ack_failures")
+
+    def __init__(self) -> None:
+        self.published = 0
+        self.failed = 0
+        self.acked = 0
+        self.ack_failures = 0
+
+
+class PostCommitPublisher:
+    """Implements application.uow.PostCommitHook.
+
+    Published ids are marked sent every ``flush_interval`` seconds in one
+    UPDATE through ``uow_factory`` (and once more on ``stop``); a failed
+    ack is retried with the next flush. A failed publish is only logged and
+    the record stays pending for the worker.
+    """
+
+    def __init__(
+        self,
+        publisher: RedisPubSubPublisher,
+        channel: str,
+        uow_factory: UoWFactory,
+        *,
+        flush_interval: float,
+        tracing: bool = False,
+    ) -> None:
+        self._publisher = publisher
+        self._channel = channel
+        self._uow_factory = uow_factory
+        self._flush_interval = flush_interval
+        self._tracing = tracing
+        self._acks: list[int] = []
+        self._task: asyncio.Task[None] | None = None
+        self.stats = PostCommitStats()
+
+    @property
+    def pending_acks(self) -> int:
+        return len(self._acks)
+
+    async def __call__(self, records: list[OutboxRecord]) -> None:
+        for record in records:
+            trace = outbox_trace(record) if self._tracing else None
+            try:
+                await self._publisher.publish_record(
+                    self._channel, record, trace=trace.stamps if trace is not None else None,
+                )
+            except Exception:
+                self.stats.failed += 1
+                logger.warning(
+                    "Publish of outbox record %d failed, leaving it to the worker",
+                    record.id,
+                    exc_info=True,
+                )
+                continue
+            self.stats.published += 1
+            self._acks.append(record.id)
+            if trace is not None:
+                observe_delivery(trace, WORKER_STAGES)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="outbox-post-commit-acks")
+        logger.info("Post-commit publisher started (acks every %.3fs)", self._flush_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+        await self.flush()
+        logger.info("Post-commit publisher stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Mark the published records sent; returns how many were acknowledged."""
+        if not self._acks:
+            return 0
+        ids, self._acks = self._acks, []
+        try:
+            async with self._uow_factory() as uow:
+                await uow.outbox.mark_sent(ids)
+                await uow.commit()
+        except Exception:
+            self.stats.ack_failures += 1
+            logger.exception("Ack of %d published outbox records failed", len(ids))
+            self._acks[:0] = ids
+            return 0
+        self.stats.acked += len(ids)
+        return len(ids)
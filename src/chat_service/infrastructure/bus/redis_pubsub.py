@@ -3,68 +3,298 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Callable, Coroutine
+import random
+import time
+import zlib
+from typing import Any, Callable, Coroutine, Mapping
 
 import redis.asyncio as aioredis
 
-from chat_service.infrastructure.bus.serializer import deserialize_event, serialize_event
+from chat_service.application.repositories.outbox import OutboxRecord
+from chat_service.infrastructure.bus.serializer import (
+    EventCodec,
+    EventEnvelope,
+    decode_envelope,
+    encode_event,
+    encode_frame_event,
+)
+from chat_service.tasks import cancel_task
 
 logger = logging.getLogger(__name__)
 
 
 class RedisPubSubPublisher:
-    """Implements application.ports.bus.EventPublisher."""
+    """Implements application.ports.bus.EventPublisher.
 
-    def __init__(self, redis: aioredis.Redis) -> None:
+    Without a ``codec`` events go out as legacy bare JSON, which every node
+    version understands.
+    """
+
+    def __init__(self, redis: aioredis.Redis, codec: EventCodec | None = None) -> None:
         self._redis = redis
+        self._codec = codec
+
+    async def publish(
+        self,
+        channel: str,
+        payload: dict[str, Any],
+        *,
+        trace: Mapping[str, float] | None = None,
+        event_id: int | None = None,
+    ) -> None:
+        raw = encode_event(
+            payload.get("event_type", "unknown"), payload, self._codec, trace, event_id,
+        )
+        await self._redis.publish(channel, raw)
 
-    async def publish(self, channel: str, payload: dict[str, Any]) -> None:
-        raw = serialize_event(payload.get("event_type", "unknown"), payload)
+    async def publish_frame(
+        self,
+        channel: str,
+        event_type: str,
+        conversation_id: str | None,
+        frame: bytes,
+        *,
+        trace: Mapping[str, float] | None = None,
+        event_id: int | None = None,
+    ) -> None:
+        """Publish a pre-rendered WS frame that nodes forward without re-encoding."""
+        raw = encode_frame_event(event_type, conversation_id, frame, trace, event_id)
         await self._redis.publish(channel, raw)
 
+    async def publish_record(
+        self, channel: str, record: OutboxRecord, *, trace: Mapping[str, float] | None = None,
+    ) -> None:
+        """Publish an outbox record (its frame if it has one) under its id."""
+        if record.frame is not None:
+            await self.publish_frame(
+                channel,
+                record.event_type,
+                record.payload.get("conversation_id"),
+                record.frame,
+                trace=trace,
+                event_id=record.id,
+            )
+        else:
+            payload = {"event_type": record.event_type, **record.payload}
+            await self.publish(channel, payload, trace=trace, event_id=record.id)
+
+
+OnEventCallback = Callable[[EventEnvelope], Coroutine[Any, Any, None]]
+PartitionKeyFn = Callable[[EventEnvelope], str | None]
+
+
+def conversation_key(envelope: EventEnvelope) -> str | None:
+    """Partition key that keeps events of one conversation in order."""
+    return envelope.conversation_id
+
+
+class PubSubSubscriberStats:
+    """Counters and queue-lag gauges for a RedisPubSubSubscriber."""
+
+    __slots__ = (
+        "received",
+        "dispatched",
+        "failed",
+        "dropped",
+        "resubscribes",
+        "last_queue_lag_seconds",
+        "max_queue_lag_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.dropped = 0
+        self.resubscribes = 0
+        self.last_queue_lag_seconds = 0.0
+        self.max_queue_lag_seconds = 0.0
+
+    def observe_queue_lag(self, seconds: float) -> None:
+        self.last_queue_lag_seconds = seconds
+        if seconds > self.max_queue_lag_seconds:
+            self.max_queue_lag_seconds = seconds
 
-OnEventCallback = Callable[[str, dict[str, Any]], Coroutine[Any, Any, None]]
+    def reset_max(self) -> float:
+        peak, self.max_queue_lag_seconds = self.max_queue_lag_seconds, 0.0
+        return peak
 
 
 class RedisPubSubSubscriber:
-    """Background task that listens to a Redis channel and dispatches events."""
+    """Background task that listens to a Redis channel and dispatches events.
+
+    ``redis`` should be a client without ``decode_responses`` so binary
+    (msgpack) envelopes reach the decoder intact.
+
+    The listener only decodes messages and puts them on one of ``dispatchers``
+    bounded queues (crc32 of ``partition_key`` modulo the queue count); the
+    callback runs in the dispatcher tasks. A slow callback therefore never
+    stalls reading from the socket, which is what gets a subscriber cut off
+    by Redis' ``client-output-buffer-limit``. Events with the same key are
+    dispatched in publish order; events without a key go to queue 0.
+
+    When a queue is full the event is dropped and counted in
+    ``stats.dropped`` — Pub/Sub is at-most-once already, clients catch up
+    through the REST API. If the connection drops the listener resubscribes
+    with exponential backoff (with jitter) between ``reconnect_min_delay``
+    and ``reconnect_max_delay``; messages published meanwhile are lost.
+    """
 
     def __init__(
         self,
         redis: aioredis.Redis,
         channel: str,
         callback: OnEventCallback,
+        *,
+        dispatchers: int = 1,
+        queue_size: int = 1000,
+        partition_key: PartitionKeyFn | None = None,
+        reconnect_min_delay: float = 0.5,
+        reconnect_max_delay: float = 30.0,
+        stats_interval: float = 30.0,
     ) -> None:
+        if dispatchers < 1 or queue_size < 1:
+            raise ValueError("dispatchers and queue_size must be positive")
         self._redis = redis
         self._channel = channel
         self._callback = callback
+        self._partition_key = partition_key
+        self._reconnect_min_delay = reconnect_min_delay
+        self._reconnect_max_delay = reconnect_max_delay
+        self._stats_interval = stats_interval
+        # Items are (enqueued_at monotonic, envelope)
+        self._queues: list[asyncio.Queue[tuple[float, EventEnvelope]]] = [
+            asyncio.Queue(maxsize=queue_size) for _ in range(dispatchers)
+        ]
         self._task: asyncio.Task[None] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._stats_task: asyncio.Task[None] | None = None
+        self.stats = PubSubSubscriberStats()
+        self.subscribed = False
+
+    @property
+    def queue_depths(self) -> list[int]:
+        return [q.qsize() for q in self._queues]
+
+    @property
+    def running(self) -> bool:
+        """The listener and every dispatcher are still alive."""
+        return self._task is not None and not any(
+            task.done() for task in (self._task, *self._workers)
+        )
 
     async def start(self) -> None:
+        self._workers = [
+            asyncio.create_task(self._dispatch(queue), name=f"redis-pubsub-dispatcher-{i}")
+            for i, queue in enumerate(self._queues)
+        ]
+        self._stats_task = asyncio.create_task(self._report_stats(), name="redis-pubsub-stats")
         self._task = asyncio.create_task(self._listen(), name="redis-pubsub-subscriber")
-        logger.info("Redis Pub/Sub subscriber started on channel=%s", self._channel)
+        logger.info(
+            "Redis Pub/Sub subscriber started on channel=%s dispatchers=%d",
+            self._channel, len(self._queues),
+        )
 
     async def stop(self) -> None:
         if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+            for task in (self._task, *self._workers, self._stats_task):
+                if task is not None:
+                    await cancel_task(task)
             logger.info("Redis Pub/Sub subscriber stopped")
 
     async def _listen(self) -> None:
-        pubsub = self._redis.pubsub()
-        await pubsub.subscribe(self._channel)
+        delay = self._reconnect_min_delay
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                self.subscribed = True
+                delay = self._reconnect_min_delay
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._enqueue(message["data"])
+                # listen() only returns once nothing is subscribed any more.
+                logger.warning("Pub/Sub channel %s unsubscribed, resubscribing", self._channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Pub/Sub connection on %s lost, resubscribing in %.1fs",
+                    self._channel, delay, exc_info=True,
+                )
+            finally:
+                self.subscribed = False
+                await _close_quietly(pubsub)
+            self.stats.resubscribes += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self._reconnect_max_delay)
+
+    def _enqueue(self, raw: str | bytes) -> None:
+        self.stats.received += 1
+        try:
+            envelope = decode_envelope(raw)
+        except Exception:
+            self.stats.failed += 1
+            logger.exception("Undecodable pubsub message on %s", self._channel)
+            return
+        if envelope.trace is not None:
+            envelope.trace.mark("received")
+        queue = self._queues[self._queue_for(envelope)]
         try:
-            async for message in pubsub.listen():
-                if message["type"] != "message":
-                    continue
-                try:
-                    event_type, data = deserialize_event(message["data"])
-                    await self._callback(event_type, data)
-                except Exception:
-                    logger.exception("Error processing pubsub message")
-        finally:
-            await pubsub.unsubscribe(self._channel)
-            await pubsub.aclose()
+            queue.put_nowait((time.monotonic(), envelope))
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            # Power-of-two counts keep a sustained overflow from flooding the log.
+            if self.stats.dropped & (self.stats.dropped - 1) == 0:
+                logger.warning(
+                    "Pub/Sub dispatch queue full on %s, dropped %d events so far",
+                    self._channel, self.stats.dropped,
+                )
+
+    def _queue_for(self, envelope: EventEnvelope) -> int:
+        if len(self._queues) == 1 or self._partition_key is None:
+            return 0
+        key = self._partition_key(envelope)
+        if key is None:
+            return 0
+        return zlib.crc32(key.encode()) % len(self._queues)
+
+    async def _dispatch(self, queue: asyncio.Queue[tuple[float, EventEnvelope]]) -> None:
+        while True:
+            enqueued_at, envelope = await queue.get()
+            try:
+                self.stats.observe_queue_lag(time.monotonic() - enqueued_at)
+                if envelope.trace is not None:
+                    envelope.trace.mark("dispatched")
+                await self._callback(envelope)
+                self.stats.dispatched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.stats.failed += 1
+                logger.exception("Error processing pubsub message")
+            finally:
+                queue.task_done()
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self._stats_interval)
+            logger.debug(
+                "Pub/Sub %s: received=%d dispatched=%d failed=%d dropped=%d "
+                "resubscribes=%d queue_depths=%s max_queue_lag=%.3fs",
+                self._channel,
+                self.stats.received,
+                self.stats.dispatched,
+                self.stats.failed,
+                self.stats.dropped,
+                self.stats.resubscribes,
+                self.queue_depths,
+                self.stats.reset_max(),
+            )
+
+
+async def _close_quietly(pubsub: Any) -> None:
+    try:
+        await pubsub.aclose()
+    except Exception:
+        logger.debug("Error closing pubsub connection", exc_info=True)
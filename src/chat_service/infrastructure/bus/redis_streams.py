@@ -3,17 +3,131 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Callable, Coroutine
+import time
+import zlib
+from typing import Any, Callable, Collection, Coroutine
 
 import redis.asyncio as aioredis
 
+from chat_service.tasks import cancel_task
+
 logger = logging.getLogger(__name__)
 
-OnStreamEventCallback = Callable[[str, dict[str, Any]], Coroutine[Any, Any, None]]
+# Receives the entry id, its event type and its fields.
+OnStreamEventCallback = Callable[[str, str, dict[str, Any]], Coroutine[Any, Any, None]]
+StreamEntry = tuple[str, dict[str, Any]]
+# Receives entries in stream order, returns the ids that were applied.
+OnStreamBatchCallback = Callable[[list[StreamEntry]], Coroutine[Any, Any, Collection[str]]]
+PartitionKeyFn = Callable[[dict[str, Any]], str | None]
+
+# Fields added to an entry when it is moved to the dead-letter stream.
+DLQ_FIELD_PREFIX = "dlq_"
+
+
+def entry_age_seconds(msg_id: str, now: float | None = None) -> float:
+    """Seconds since the entry was appended, from the ms timestamp in its id."""
+    ms = int(msg_id.split("-", 1)[0])
+    return max(0.0, (now if now is not None else time.time()) - ms / 1000)
+
+
+class StreamConsumerStats:
+    """Counters and lag gauges for a RedisStreamConsumer."""
+
+    __slots__ = (
+        "processed",
+        "failed",
+        "reclaimed",
+        "dead_lettered",
+        "in_flight",
+        "last_entry_age_seconds",
+        "max_entry_age_seconds",
+        "group_lag",
+        "group_pending",
+    )
+
+    def __init__(self) -> None:
+        self.processed = 0
+        self.failed = 0
+        self.reclaimed = 0
+        self.dead_lettered = 0
+        self.in_flight = 0
+        self.last_entry_age_seconds = 0.0
+        self.max_entry_age_seconds = 0.0
+        self.group_lag: int | None = None
+        self.group_pending: int | None = None
+
+    def observe_entry_age(self, seconds: float) -> None:
+        self.last_entry_age_seconds = seconds
+        if seconds > self.max_entry_age_seconds:
+            self.max_entry_age_seconds = seconds
+
+    def reset_max(self) -> float:
+        peak, self.max_entry_age_seconds = self.max_entry_age_seconds, 0.0
+        return peak
+
+
+class AdaptiveReadTuner:
+    """Adjusts XREADGROUP COUNT and BLOCK from what the reads return.
+
+    A full read (or a group lag above the current COUNT) means a backlog, so
+    COUNT doubles up to ``max_batch``; reads that come back less than a
+    quarter full halve it down to ``min_batch``. BLOCK only matters when the
+    stream is idle: it doubles up to ``max_block_ms`` on empty reads and
+    drops back to ``min_block_ms`` as soon as entries flow.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_batch: int,
+        max_batch: int,
+        min_block_ms: int = 100,
+        max_block_ms: int = 5000,
+    ) -> None:
+        if not 0 < min_batch <= max_batch:
+            raise ValueError("need 0 < min_batch <= max_batch")
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.min_block_ms = min_block_ms
+        self.max_block_ms = max_block_ms
+        self.batch_size = min_batch
+        self.block_ms = min_block_ms
+
+    def observe(self, read_count: int, lag: int | None = None) -> None:
+        if read_count == 0:
+            self.block_ms = min(self.block_ms * 2, self.max_block_ms)
+            self.batch_size = self.min_batch
+            return
+        self.block_ms = self.min_block_ms
+        if read_count >= self.batch_size or (lag is not None and lag > self.batch_size):
+            self.batch_size = min(self.batch_size * 2, self.max_batch)
+        elif read_count * 4 < self.batch_size:
+            self.batch_size = max(self.batch_size // 2, self.min_batch)
 
 
 class RedisStreamConsumer:
-    """XREADGROUP-based consumer for a single stream + consumer group."""
+    """XREADGROUP-based consumer for a single stream + consumer group.
+
+    Entries are spread over ``concurrency`` lanes by ``partition_key`` (crc32
+    of the key modulo the lane count). Each lane processes its entries in
+    stream order, so events for one key stay ordered while different keys run
+    in parallel; entries without a key go to lane 0. At most ``max_in_flight``
+    entries are read but not yet acknowledged — the reader stops pulling from
+    Redis until lanes catch up.
+
+    Each read is split by lane and every lane handles its share as one
+    sub-batch: with ``batch_callback`` the whole sub-batch goes to it in one
+    call (so a handler can apply it in a single transaction), otherwise
+    ``callback`` runs per entry. Applied ids are acknowledged with one
+    multi-id XACK. With a ``tuner`` COUNT and BLOCK follow observed load.
+
+    A failed entry stays pending. Entries pending for longer than
+    ``claim_idle_ms`` on any consumer of the group — including ones stranded
+    by a crashed process — are taken over with XAUTOCLAIM and retried. An entry
+    delivered ``max_deliveries`` times is moved to ``dead_letter_stream`` and
+    acknowledged instead. Retries are not ordered against newer entries of the
+    same key.
+    """
 
     def __init__(
         self,
@@ -25,15 +139,53 @@ class RedisStreamConsumer:
         *,
         batch_size: int = 10,
         block_ms: int = 5000,
+        concurrency: int = 1,
+        max_in_flight: int = 100,
+        partition_key: PartitionKeyFn | None = None,
+        stats_interval: float = 30.0,
+        drain_timeout: float = 10.0,
+        claim_idle_ms: int = 60_000,
+        claim_interval: float = 15.0,
+        max_deliveries: int = 5,
+        dead_letter_stream: str | None = None,
+        dead_letter_maxlen: int = 100_000,
+        batch_callback: OnStreamBatchCallback | None = None,
+        tuner: AdaptiveReadTuner | None = None,
     ) -> None:
+        if concurrency < 1 or max_in_flight < 1:
+            raise ValueError("concurrency and max_in_flight must be positive")
         self._redis = redis
         self._stream = stream
         self._group = group
         self._consumer = consumer
         self._callback = callback
+        self._batch_callback = batch_callback
+        self._tuner = tuner
         self._batch_size = batch_size
         self._block_ms = block_ms
+        self._partition_key = partition_key
+        self._stats_interval = stats_interval
+        self._drain_timeout = drain_timeout
+        self._claim_idle_ms = claim_idle_ms
+        self._claim_interval = claim_interval
+        self._max_deliveries = max_deliveries
+        self._dead_letter_stream = dead_letter_stream
+        self._dead_letter_maxlen = dead_letter_maxlen
+        # Sub-batches of (msg_id, fields, deliveries)
+        self._lanes: list[asyncio.Queue[list[tuple[str, dict[str, Any], int]]]] = [
+            asyncio.Queue() for _ in range(concurrency)
+        ]
+        self._max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        # The reader and the reclaimer both dispatch: one batch takes its permits at a time.
+        self._dispatch_lock = asyncio.Lock()
         self._task: asyncio.Task[None] | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._stats_task: asyncio.Task[None] | None = None
+        self._reclaim_task: asyncio.Task[None] | None = None
+        self._claim_cursor = "0-0"
+        self._pending_ids: set[str] = set()
+        self.stats = StreamConsumerStats()
 
     async def ensure_group(self) -> None:
         try:
@@ -49,42 +201,268 @@ class RedisStreamConsumer:
 
     async def start(self) -> None:
         await self.ensure_group()
+        self._workers = [
+            asyncio.create_task(self._run_lane(queue), name=f"redis-stream-lane-{i}")
+            for i, queue in enumerate(self._lanes)
+        ]
+        self._stats_task = asyncio.create_task(self._report_stats(), name="redis-stream-stats")
+        self._reclaim_task = asyncio.create_task(self._run_reclaim(), name="redis-stream-reclaim")
         self._task = asyncio.create_task(self._consume(), name="redis-stream-consumer")
-        logger.info("Stream consumer started: stream=%s group=%s", self._stream, self._group)
+        logger.info(
+            "Stream consumer started: stream=%s group=%s lanes=%d",
+            self._stream, self._group, len(self._lanes),
+        )
 
     async def stop(self) -> None:
         if self._task:
-            self._task.cancel()
+            await cancel_task(self._task)
+            if self._reclaim_task is not None:
+                await cancel_task(self._reclaim_task)
+            # Let lanes finish what was already read so it gets acknowledged.
             try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+                await asyncio.wait_for(
+                    asyncio.gather(*(q.join() for q in self._lanes)),
+                    timeout=self._drain_timeout,
+                )
+            except TimeoutError:
+                logger.warning(
+                    "Stream consumer stopped with %d entries in flight; they stay pending",
+                    self.stats.in_flight,
+                )
+            for task in (*self._workers, self._stats_task):
+                if task is not None:
+                    await cancel_task(task)
             logger.info("Stream consumer stopped")
 
+    def _lane_for(self, fields: dict[str, Any]) -> int:
+        if len(self._lanes) == 1 or self._partition_key is None:
+            return 0
+        key = self._partition_key(fields)
+        if key is None:
+            return 0
+        return zlib.crc32(key.encode()) % len(self._lanes)
+
     async def _consume(self) -> None:
         while True:
             try:
+                count = self._tuner.batch_size if self._tuner else self._batch_size
+                # Never read more than fits in flight, or dispatch could wait forever.
+                count = min(count, self._max_in_flight)
                 entries = await self._redis.xreadgroup(
                     groupname=self._group,
                     consumername=self._consumer,
                     streams={self._stream: ">"},
-                    count=self._batch_size,
-                    block=self._block_ms,
+                    count=count,
+                    block=self._tuner.block_ms if self._tuner else self._block_ms,
                 )
-                if not entries:
-                    continue
-                for _stream_name, messages in entries:
-                    for msg_id, fields in messages:
-                        event_type = fields.get("event_type", "unknown")
-                        try:
-                            await self._callback(event_type, fields)
-                            await self._redis.xack(self._stream, self._group, msg_id)
-                        except Exception:
-                            logger.exception(
-                                "Error processing stream message %s", msg_id
-                            )
+                batch = [
+                    (msg_id, fields, 1)
+                    for _stream_name, messages in entries or ()
+                    for msg_id, fields in messages
+                ]
+                if self._tuner is not None:
+                    self._tuner.observe(len(batch), self.stats.group_lag)
+                if batch:
+                    await self._dispatch(batch)
             except asyncio.CancelledError:
                 raise
             except Exception:
                 logger.exception("Stream consumer error, retrying in 5s")
                 await asyncio.sleep(5)
+
+    async def _dispatch(self, batch: list[tuple[str, dict[str, Any], int]]) -> None:
+        by_lane: dict[int, list[tuple[str, dict[str, Any], int]]] = {}
+        for item in batch:
+            by_lane.setdefault(self._lane_for(item[1]), []).append(item)
+        # Permits held for a sub-batch are only released once it is queued, so
+        # two dispatchers acquiring interleaved could each wait on the other.
+        async with self._dispatch_lock:
+            for lane, items in by_lane.items():
+                for msg_id, _, _ in items:
+                    await self._in_flight.acquire()
+                    self.stats.in_flight += 1
+                    self._pending_ids.add(msg_id)
+                self._lanes[lane].put_nowait(items)
+
+    async def _run_lane(self, queue: asyncio.Queue[list[tuple[str, dict[str, Any], int]]]) -> None:
+        while True:
+            items = await queue.get()
+            try:
+                await self._process(items)
+            except Exception:
+                logger.exception("Stream lane failed on %d entries", len(items))
+            finally:
+                for msg_id, _, _ in items:
+                    self._pending_ids.discard(msg_id)
+                    self.stats.in_flight -= 1
+                    self._in_flight.release()
+                queue.task_done()
+
+    async def _process(self, items: list[tuple[str, dict[str, Any], int]]) -> None:
+        self.stats.observe_entry_age(entry_age_seconds(items[0][0]))
+        errors: dict[str, str] = {}
+        if self._batch_callback is not None:
+            try:
+                applied = set(await self._batch_callback([(i, f) for i, f, _ in items]))
+            except Exception as exc:
+                logger.exception("Error processing batch of %d stream messages", len(items))
+                applied = set()
+                errors = {msg_id: repr(exc) for msg_id, _, _ in items}
+        else:
+            applied = set()
+            for msg_id, fields, deliveries in items:
+                try:
+                    await self._callback(msg_id, fields.get("event_type", "unknown"), fields)
+                    applied.add(msg_id)
+                except Exception as exc:
+                    errors[msg_id] = repr(exc)
+                    logger.exception(
+                        "Error processing stream message %s (delivery %d)", msg_id, deliveries,
+                    )
+
+        if applied:
+            await self._redis.xack(self._stream, self._group, *applied)
+            self.stats.processed += len(applied)
+        for msg_id, fields, deliveries in items:
+            if msg_id in applied:
+                continue
+            self.stats.failed += 1
+            if deliveries >= self._max_deliveries:
+                reason = errors.get(msg_id, "not applied by batch handler")
+                await self._dead_letter(msg_id, fields, deliveries, reason)
+
+    async def _run_reclaim(self) -> None:
+        while True:
+            await asyncio.sleep(self._claim_interval)
+            try:
+                # Keep paging while a backlog is being drained; lanes apply backpressure.
+                while await self.reclaim() and self._claim_cursor != "0-0":
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Pending-entry reclaim failed for %s", self._stream, exc_info=True)
+
+    async def reclaim(self) -> int:
+        """Take over entries idle in the group's PEL; returns how many were claimed.
+
+        One XAUTOCLAIM page per call; the cursor wraps to ``0-0`` when the
+        PEL has been scanned.
+        """
+        response = await self._redis.xautoclaim(
+            self._stream,
+            self._group,
+            self._consumer,
+            min_idle_time=self._claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=min(self._batch_size, self._max_in_flight),
+        )
+        self._claim_cursor = response[0]
+        claimed = [
+            (msg_id, fields)
+            for msg_id, fields in response[1]
+            # Still running here: XAUTOCLAIM reset its idle time, nothing to retry.
+            if fields is not None and msg_id not in self._pending_ids
+        ]
+        if not claimed:
+            return 0
+
+        deliveries = await self._delivery_counts([msg_id for msg_id, _ in claimed])
+        retry: list[tuple[str, dict[str, Any], int]] = []
+        for msg_id, fields in claimed:
+            count = deliveries.get(msg_id)
+            if count is None:
+                # No count (acked or claimed away meanwhile): the next cycle sees it again.
+                continue
+            if count > self._max_deliveries:
+                await self._dead_letter(msg_id, fields, count, "max deliveries exceeded")
+            else:
+                retry.append((msg_id, fields, count))
+        if retry:
+            self.stats.reclaimed += len(retry)
+            await self._dispatch(retry)
+        logger.info("Reclaimed %d pending entries from %s", len(claimed), self._stream)
+        return len(claimed)
+
+    async def _delivery_counts(self, ids: list[str]) -> dict[str, int]:
+        """Delivery count of each of ``ids`` pending on this consumer, one pipelined
+        XPENDING per id (a range query could be filled by other pending entries)."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for msg_id in ids:
+                pipe.xpending_range(
+                    self._stream,
+                    self._group,
+                    min=msg_id,
+                    max=msg_id,
+                    count=1,
+                    consumername=self._consumer,
+                )
+            replies = await pipe.execute()
+        return {
+            row["message_id"]: row["times_delivered"] for rows in replies for row in rows
+        }
+
+    async def _dead_letter(
+        self,
+        msg_id: str,
+        fields: dict[str, Any],
+        deliveries: int,
+        reason: str,
+    ) -> None:
+        if self._dead_letter_stream is None:
+            # No DLQ configured: leave it pending so it is not lost.
+            return
+        record = {k: v for k, v in fields.items() if not k.startswith(DLQ_FIELD_PREFIX)}
+        record.update(
+            {
+                f"{DLQ_FIELD_PREFIX}source_stream": self._stream,
+                f"{DLQ_FIELD_PREFIX}source_id": msg_id,
+                f"{DLQ_FIELD_PREFIX}group": self._group,
+                f"{DLQ_FIELD_PREFIX}deliveries": str(deliveries),
+                f"{DLQ_FIELD_PREFIX}reason": reason[:500],
+            }
+        )
+        await self._redis.xadd(
+            self._dead_letter_stream,
+            record,
+            maxlen=self._dead_letter_maxlen,
+            approximate=True,
+        )
+        await self._redis.xack(self._stream, self._group, msg_id)
+        self.stats.dead_lettered += 1
+        logger.error(
+            "Moved stream message %s to %s after %d deliveries: %s",
+            msg_id, self._dead_letter_stream, deliveries, reason,
+        )
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self._stats_interval)
+            try:
+                await self.refresh_group_info()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("XINFO GROUPS failed for %s", self._stream, exc_info=True)
+            logger.debug(
+                "Stream %s: processed=%d failed=%d reclaimed=%d dead_lettered=%d "
+                "in_flight=%d lane_depths=%s lag=%s pending=%s max_entry_age=%.2fs",
+                self._stream,
+                self.stats.processed,
+                self.stats.failed,
+                self.stats.reclaimed,
+                self.stats.dead_lettered,
+                self.stats.in_flight,
+                [q.qsize() for q in self._lanes],
+                self.stats.group_lag,
+                self.stats.group_pending,
+                self.stats.reset_max(),
+            )
+
+    async def refresh_group_info(self) -> None:
+        """Pull group ``lag`` (Redis >= 7) and ``pending`` into ``stats``."""
+        for info in await self._redis.xinfo_groups(self._stream):
+            if info.get("name") == self._group:
+                self.stats.group_lag = info.get("lag")
+                self.stats.group_pending = info.get("pending")
+                return
@@ -1,25 +1,264 @@
+"""Event envelope encoding for the Pub/Sub bus.
+
+Wire formats, told apart by the first byte:
+
+  ``{``   legacy: bare JSON ``{"event": ..., "data": ...}``
+  0x01    versioned JSON envelope
+  0x02    versioned msgpack envelope
+  0x03    pre-rendered WS frame: u16 header length, JSON header with
+          ``event`` and ``conversation_id``, then the frame bytes
+
+Decoding accepts all of them, so nodes can be upgraded before the publisher
+switches ``EVENT_CODEC`` away from ``legacy`` (or starts sending frames). JSON uses ``orjson`` and
+msgpack uses ``msgpack`` when installed (the ``fast`` extra); JSON falls back
+to the stdlib.
+
+Every form may carry a ``trace`` object next to ``event`` (in the JSON header
+for frames) with delivery stage timestamps, see ``bus.trace``, and an ``id``:
+the outbox record id, the same for every publish of one event, so nodes can
+drop the copy when an event is published twice.
+"""
 from __future__ import annotations
 
 import json
-from typing import Any
-from uuid import UUID
+import struct
 from datetime import datetime
+from typing import Any, Callable, Mapping, Protocol
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the installed extras
+    msgpack = None  # type: ignore[assignment]
+
+from chat_service.infrastructure.bus.trace import DeliveryTrace
+
+LEGACY_JSON_PREFIX = ord("{")
+ENVELOPE_JSON = 1
+ENVELOPE_MSGPACK = 2
+ENVELOPE_FRAME = 3
+
+_FRAME_HEADER = struct.Struct(">BH")
+
+
+def _default(o: object) -> Any:
+    if isinstance(o, UUID):
+        return str(o)
+    if isinstance(o, datetime):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not serializable")
 
 
 class _Encoder(json.JSONEncoder):
     def default(self, o: object) -> Any:
-        if isinstance(o, UUID):
-            return str(o)
-        if isinstance(o, datetime):
-            return o.isoformat()
+        if isinstance(o, (UUID, datetime)):
+            return _default(o)
         return super().default(o)
 
 
+def _json_dumps(envelope: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        # orjson renders UUID and aware datetimes like str()/isoformat() natively.
+        return orjson.dumps(envelope, default=_default)
+    return json.dumps(envelope, cls=_Encoder, separators=(",", ":")).encode()
+
+
+def _json_loads(body: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+class EventCodec(Protocol):
+    """Encodes an envelope body; the version byte is added by ``encode_event``."""
+
+    name: str
+    version: int
+
+    def encode(self, envelope: dict[str, Any]) -> bytes: ...
+
+    def decode(self, body: bytes) -> dict[str, Any]: ...
+
+
+class JsonCodec:
+    name = "json"
+    version = ENVELOPE_JSON
+
+    def encode(self, envelope: dict[str, Any]) -> bytes:
+        return _json_dumps(envelope)
+
+    def decode(self, body: bytes) -> dict[str, Any]:
+        return _json_loads(body)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    version = ENVELOPE_MSGPACK
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise RuntimeError("msgpack is not installed; install the 'fast' extra")
+
+    def encode(self, envelope: dict[str, Any]) -> bytes:
+        return msgpack.packb(envelope, default=_default, use_bin_type=True)
+
+    def decode(self, body: bytes) -> dict[str, Any]:
+        return msgpack.unpackb(body, raw=False)
+
+
+_CODECS: dict[str, Callable[[], EventCodec]] = {
+    JsonCodec.name: JsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+}
+_VERSIONS: dict[int, Callable[[], EventCodec]] = {
+    JsonCodec.version: JsonCodec,
+    MsgpackCodec.version: MsgpackCodec,
+}
+_decoders: dict[int, EventCodec] = {}
+
+
+def get_codec(name: str) -> EventCodec | None:
+    """Codec for an ``EVENT_CODEC`` setting; ``legacy`` means unversioned JSON (None)."""
+    if name == "legacy":
+        return None
+    try:
+        factory = _CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown event codec: {name!r}") from None
+    return factory()
+
+
+def _decoder(version: int) -> EventCodec:
+    codec = _decoders.get(version)
+    if codec is None:
+        try:
+            factory = _VERSIONS[version]
+        except KeyError:
+            raise ValueError(f"Unknown event envelope version: {version}") from None
+        codec = _decoders[version] = factory()
+    return codec
+
+
+class EventEnvelope:
+    """A decoded bus message.
+
+    For frame envelopes ``frame`` holds the WS frame to forward as is and
+    ``data`` is only parsed out of it when someone asks for it. ``trace``
+    holds the delivery stamps when the publisher sent them.
+    """
+
+    __slots__ = ("event_type", "conversation_id", "frame", "trace", "event_id", "_data")
+
+    def __init__(
+        self,
+        event_type: str,
+        data: dict[str, Any] | None = None,
+        *,
+        conversation_id: str | None = None,
+        frame: bytes | None = None,
+        trace: DeliveryTrace | None = None,
+        event_id: int | None = None,
+    ) -> None:
+        if data is None and frame is None:
+            raise ValueError("EventEnvelope needs data or a frame")
+        self.event_type = event_type
+        self.frame = frame
+        self.trace = trace
+        self.event_id = event_id
+        self._data = data
+        if conversation_id is None and data is not None:
+            raw_id = data.get("conversation_id")
+            conversation_id = str(raw_id) if raw_id else None
+        self.conversation_id = conversation_id
+
+    @property
+    def data(self) -> dict[str, Any]:
+        if self._data is None:
+            assert self.frame is not None
+            self._data = _json_loads(self.frame)["data"]
+        return self._data
+
+
+def encode_event(
+    event_type: str,
+    payload: dict[str, Any],
+    codec: EventCodec | None = None,
+    trace: Mapping[str, float] | None = None,
+    event_id: int | None = None,
+) -> bytes:
+    """Render a wire envelope; without a codec the legacy bare-JSON form."""
+    envelope: dict[str, Any] = {"event": event_type, "data": payload}
+    if trace:
+        envelope["trace"] = dict(trace)
+    if event_id is not None:
+        envelope["id"] = event_id
+    if codec is None:
+        return _json_dumps(envelope)
+    return bytes((codec.version,)) + codec.encode(envelope)
+
+
+def encode_frame_event(
+    event_type: str,
+    conversation_id: str | None,
+    frame: bytes,
+    trace: Mapping[str, float] | None = None,
+    event_id: int | None = None,
+) -> bytes:
+    """Wrap a pre-rendered WS frame so nodes can route it without parsing it."""
+    fields: dict[str, Any] = {"event": event_type, "conversation_id": conversation_id}
+    if trace:
+        fields["trace"] = dict(trace)
+    if event_id is not None:
+        fields["id"] = event_id
+    header = _json_dumps(fields)
+    return _FRAME_HEADER.pack(ENVELOPE_FRAME, len(header)) + header + frame
+
+
 def serialize_event(event_type: str, payload: dict[str, Any]) -> str:
-    envelope = {"event": event_type, "data": payload}
-    return json.dumps(envelope, cls=_Encoder)
+    return encode_event(event_type, payload).decode()
+
+
+def decode_envelope(raw: str | bytes) -> EventEnvelope:
+    if isinstance(raw, str):
+        if raw[:1] == "{":
+            return _envelope(_json_loads(raw))
+        raw = raw.encode()
+    if not raw:
+        raise ValueError("Empty event envelope")
+    version = raw[0]
+    if version == ENVELOPE_FRAME:
+        _, header_len = _FRAME_HEADER.unpack_from(raw)
+        start = _FRAME_HEADER.size
+        header = _json_loads(raw[start:start + header_len])
+        return EventEnvelope(
+            header["event"],
+            conversation_id=header.get("conversation_id"),
+            frame=raw[start + header_len:],
+            trace=DeliveryTrace.from_wire(header.get("trace")),
+            event_id=_event_id(header),
+        )
+    if version == LEGACY_JSON_PREFIX:
+        data = _json_loads(raw)
+    else:
+        data = _decoder(version).decode(raw[1:])
+    return _envelope(data)
+
+
+def _envelope(data: dict[str, Any]) -> EventEnvelope:
+    trace = DeliveryTrace.from_wire(data.get("trace"))
+    return EventEnvelope(data["event"], data["data"], trace=trace, event_id=_event_id(data))
+
+
+def _event_id(fields: dict[str, Any]) -> int | None:
+    event_id = fields.get("id")
+    return event_id if isinstance(event_id, int) else None
 
 
 def deserialize_event(raw: str | bytes) -> tuple[str, dict[str, Any]]:
-    data = json.loads(raw)
-    return data["event"], data["data"]
+    envelope = decode_envelope(raw)
+    return envelope.event_type, envelope.data
@@ -0,0 +1,146 @@
+"""Delivery timestamps carried by bus events from commit to WebSocket write.
+
+Stages, in pipeline order:
+
+  created      the message row was built (``created_at`` in the payload)
+  enqueued     the outbox row was written
+  fetched      the outbox worker picked the row up (absent when the API
+               published the event itself right after its commit)
+  published    the event was handed to Redis
+  received     a node's Pub/Sub listener read it off the socket
+  dispatched   a dispatcher task took it off the node's queue
+  written      the frame was written to every subscribed socket
+
+Stamps are wall-clock epoch seconds, since the stages span processes and
+hosts; they travel in the envelope's ``trace`` field, which older nodes
+ignore. Stages marked live in the same process also keep a monotonic
+reading, and the interval between two such stages uses it. Cross-process
+intervals are clamped at zero, so clock skew between hosts shows up as
+zero-length stages rather than negative ones.
+
+With ``opentelemetry-api`` installed (the ``tracing`` extra) a delivery can
+also be recorded as a span tree with the stamped start and end times; the
+spans go wherever the process' OpenTelemetry SDK is configured to send them.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Iterator, Mapping
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - depends on the installed extras
+    otel_trace = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from chat_service.application.repositories.outbox import OutboxRecord
+
+STAGES = ("created", "enqueued", "fetched", "published", "received", "dispatched", "written")
+WORKER_STAGES = frozenset(("enqueued", "fetched", "published"))
+NODE_STAGES = frozenset(("received", "dispatched", "written"))
+
+
+class DeliveryTrace:
+    """Per-stage timestamps of one event."""
+
+    __slots__ = ("stamps", "_mono")
+
+    def __init__(self, stamps: dict[str, float] | None = None) -> None:
+        self.stamps: dict[str, float] = stamps if stamps is not None else {}
+        self._mono: dict[str, float] = {}
+
+    @classmethod
+    def from_wire(cls, raw: Any) -> DeliveryTrace | None:
+        """The trace of a decoded envelope; unknown stages and junk are ignored."""
+        if not isinstance(raw, Mapping):
+            return None
+        stamps: dict[str, float] = {}
+        for stage, value in raw.items():
+            if stage in STAGES and isinstance(value, (int, float)):
+                stamps[stage] = float(value)
+        return cls(stamps)
+
+    def mark(self, stage: str, at: datetime | float | None = None) -> None:
+        """Stamp ``stage`` now, or at a time recorded elsewhere (``at``)."""
+        if at is None:
+            self.stamps[stage] = time.time()
+            self._mono[stage] = time.monotonic()
+        else:
+            self.stamps[stage] = at.timestamp() if isinstance(at, datetime) else float(at)
+            self._mono.pop(stage, None)
+
+    def copy(self) -> DeliveryTrace:
+        clone = DeliveryTrace(dict(self.stamps))
+        clone._mono = dict(self._mono)
+        return clone
+
+    def lag(self, start: str, end: str) -> float | None:
+        if start in self._mono and end in self._mono:
+            return self._mono[end] - self._mono[start]
+        started, ended = self.stamps.get(start), self.stamps.get(end)
+        if started is None or ended is None:
+            return None
+        return max(0.0, ended - started)
+
+    def lags(self) -> Iterator[tuple[str, float]]:
+        """``(stage, seconds since the previous stamped stage)`` in pipeline order."""
+        previous: str | None = None
+        for stage in STAGES:
+            if stage not in self.stamps:
+                continue
+            if previous is not None:
+                seconds = self.lag(previous, stage)
+                if seconds is not None:
+                    yield stage, seconds
+            previous = stage
+
+    def total(self) -> float | None:
+        """Created (or the earliest stamp) to written."""
+        first = next((stage for stage in STAGES if stage in self.stamps), None)
+        if first is None or first == "written":
+            return None
+        return self.lag(first, "written")
+
+
+def outbox_trace(record: OutboxRecord, base: DeliveryTrace | None = None) -> DeliveryTrace:
+    """Stamps of ``record`` up to "published" (taken now, just before the publish).
+
+    ``base`` carries stages already stamped for the whole batch ("fetched").
+    """
+    trace = base.copy() if base is not None else DeliveryTrace()
+    created_at = record.payload.get("created_at")
+    if isinstance(created_at, str):
+        try:
+            trace.mark("created", datetime.fromisoformat(created_at))
+        except ValueError:
+            pass
+    if record.created_at is not None:
+        trace.mark("enqueued", record.created_at)
+    trace.mark("published")
+    return trace
+
+
+def spans_available() -> bool:
+    return otel_trace is not None
+
+
+def emit_spans(trace: DeliveryTrace, event_type: str, conversation_id: str | None) -> None:
+    """Record a delivery as a ``chat.delivery`` span with one child per stage."""
+    if otel_trace is None:
+        return
+    stamped = [stage for stage in STAGES if stage in trace.stamps]
+    if len(stamped) < 2:
+        return
+    tracer = otel_trace.get_tracer(__name__)
+    ns = {stage: int(trace.stamps[stage] * 1e9) for stage in stamped}
+    root = tracer.start_span(
+        "chat.delivery",
+        start_time=ns[stamped[0]],
+        attributes={"chat.event_type": event_type, "chat.conversation_id": conversation_id or ""},
+    )
+    context = otel_trace.set_span_in_context(root)
+    for previous, stage in zip(stamped, stamped[1:]):
+        span = tracer.start_span(f"chat.delivery.{stage}", context=context, start_time=ns[previous])
+        span.end(end_time=max(ns[previous], ns[stage]))
+    root.end(end_time=max(ns[stamped[0]], ns[stamped[-1]]))
@@ -0,0 +1,78 @@
+"""Per-node in-memory copy of the blocked_users table."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from chat_service.application.uow import UoWFactory
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBlockList:
+    """Implements application.ports.block_list.BlockList with a set of user ids.
+
+    Loaded from ``blocked_users`` on start, updated incrementally from
+    ``chat.user_block_changed`` fan-out events, and fully reloaded every
+    ``resync_interval`` to heal Pub/Sub messages this node missed.
+    """
+
+    def __init__(self, uow_factory: UoWFactory, *, resync_interval: float) -> None:
+        self._uow_factory = uow_factory
+        self._resync_interval = resync_interval
+        self._ids: set[int] = set()
+        # Changes seen while a reload is in progress, replayed over its snapshot.
+        self._during_reload: dict[int, bool] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def is_blocked(self, user_id: int) -> bool:
+        return user_id in self._ids
+
+    def apply(self, user_id: int, blocked: bool) -> None:
+        if blocked:
+            self._ids.add(user_id)
+        else:
+            self._ids.discard(user_id)
+        if self._during_reload is not None:
+            self._during_reload[user_id] = blocked
+
+    async def reload(self) -> None:
+        self._during_reload = {}
+        try:
+            async with self._uow_factory() as uow:
+                ids = set(await uow.blocked_users.list_blocked_ids())
+            for user_id, blocked in self._during_reload.items():
+                if blocked:
+                    ids.add(user_id)
+                else:
+                    ids.discard(user_id)
+            self._ids = ids
+        finally:
+            self._during_reload = None
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception:
+            logger.exception("Initial block list load failed, retrying in background")
+        self._task = asyncio.create_task(self._run(), name="block-list-resync")
+        logger.info("Block list loaded (%d users)", len(self._ids))
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+            logger.info("Block list resync stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._resync_interval)
+            try:
+                await self.reload()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Block list resync failed")
@@ -0,0 +1,196 @@
+"""Two-tier send rate limiter: local token buckets over a Redis sliding window."""
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Protocol, Sequence
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from chat_service.application.policies.rate_limit import RateLimit, TokenBuckets
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "chat:rl"
+
+# Sliding-window counter: the previous fixed window, weighted by how much of
+# it still overlaps the sliding one, plus the current window. For each key
+# ARGV holds (limit, window_ms, wanted); the reply holds (granted, retry_ms).
+# Time comes from Redis so node clocks do not matter.
+_SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local out = {}
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 3 - 2])
+  local window = tonumber(ARGV[i * 3 - 1])
+  local wanted = tonumber(ARGV[i * 3])
+  local index = math.floor(now / window)
+  local elapsed = now - index * window
+  local current_key = key .. ':' .. index
+  local current = tonumber(redis.call('GET', current_key) or '0')
+  local previous = tonumber(redis.call('GET', key .. ':' .. (index - 1)) or '0')
+  local used = previous * (window - elapsed) / window + current
+  local granted = math.min(wanted, math.floor(limit - used))
+  local retry = 0
+  if granted > 0 then
+    redis.call('INCRBY', current_key, granted)
+    redis.call('PEXPIRE', current_key, window * 2)
+  else
+    granted = 0
+    if current >= limit then
+      -- Not before the next window, then until enough of this one slides out.
+      retry = window - elapsed + math.ceil(window * (1 - (limit - 1) / current))
+    else
+      retry = math.ceil(window - elapsed - (limit - 1 - current) * window / previous)
+    end
+    retry = math.max(retry, 1)
+  end
+  out[#out + 1] = granted
+  out[#out + 1] = retry
+end
+return out
+"""
+
+
+class SlidingWindow(Protocol):
+    async def acquire(
+        self, requests: Sequence[tuple[str, RateLimit, int]],
+    ) -> list[tuple[int, float]]: ...
+
+
+class RedisSlidingWindow:
+    """Cluster-wide sliding-window counters, any number of keys per round trip.
+
+    ``acquire`` asks for up to ``wanted`` permits per ``(key, limit, wanted)``
+    and returns ``(granted, retry_after_seconds)`` for each. The keys of one
+    call must live on one Redis node (REDIS_URL is a single instance).
+    """
+
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self._script = redis.register_script(_SLIDING_WINDOW_LUA)
+
+    async def acquire(
+        self, requests: Sequence[tuple[str, RateLimit, int]],
+    ) -> list[tuple[int, float]]:
+        keys: list[str] = []
+        args: list[int] = []
+        for key, limit, wanted in requests:
+            keys.append(f"{KEY_PREFIX}:{key}")
+            args += (limit.limit, max(1, round(limit.window * 1000)), wanted)
+        reply = await self._script(keys=keys, args=args)
+        return [(int(reply[i]), int(reply[i + 1]) / 1000) for i in range(0, len(reply), 2)]
+
+
+class RateLimiterStats:
+    """Counters for a TieredRateLimiter."""
+
+    __slots__ = (
+        "allowed", "local_rejections", "cluster_rejections", "window_calls", "window_errors",
+    )
+
+    def __init__(self) -> None:
+        self.allowed = 0
+        self.local_rejections = 0
+        self.cluster_rejections = 0
+        self.window_calls = 0
+        self.window_errors = 0
+
+
+class TieredRateLimiter:
+    """Implements application.ports.rate_limit.RateLimiter.
+
+    Local tier: a token bucket per principal and per conversation refilling
+    at the limit's average rate, with room for ``burst`` sends — floods are
+    rejected without I/O. Cluster tier: permits are leased from ``window``
+    up to ``lease`` at a time and spent locally, so about one send in
+    ``lease`` costs a Redis round trip. Unspent permits lapse after one
+    window, and while Redis is unreachable only the local tier applies.
+    """
+
+    def __init__(
+        self,
+        window: SlidingWindow | None,
+        *,
+        per_principal: RateLimit,
+        per_conversation: RateLimit,
+        burst: int,
+        lease: int,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = window
+        self._lease_size = max(1, lease)
+        self._max_keys = max_keys
+        self._clock = clock
+        self._principal = self._tier(per_principal, burst)
+        self._conversation = self._tier(per_conversation, burst)
+        # key -> [permits, expires_at]
+        self._leases: OrderedDict[str, list[float]] = OrderedDict()
+        self.stats = RateLimiterStats()
+
+    def _tier(self, limit: RateLimit, burst: int) -> tuple[RateLimit, TokenBuckets] | None:
+        if limit.limit <= 0:
+            return None
+        capacity = min(burst, limit.limit) if burst > 0 else limit.limit
+        return limit, TokenBuckets(limit.rate, capacity, max_keys=self._max_keys)
+
+    async def acquire(self, principal_key: str, conversation_id: UUID) -> float | None:
+        now = self._clock()
+        checks: list[tuple[str, RateLimit, TokenBuckets]] = []
+        if self._principal is not None:
+            checks.append((f"p:{principal_key}", *self._principal))
+        if self._conversation is not None:
+            checks.append((f"c:{conversation_id}", *self._conversation))
+
+        wait = max((buckets.wait_time(key, now) for key, _, buckets in checks), default=0.0)
+        if wait > 0:
+            self.stats.local_rejections += 1
+            return wait
+
+        if self._window is not None:
+            missing = [(key, limit) for key, limit, _ in checks if not self._has_lease(key, now)]
+            if missing:
+                wait = await self._renew(missing, now)
+                if wait > 0:
+                    self.stats.cluster_rejections += 1
+                    return wait
+
+        for key, _, buckets in checks:
+            buckets.take(key, now)
+            lease = self._leases.get(key)
+            if lease is not None:
+                lease[0] -= 1
+        self.stats.allowed += 1
+        return None
+
+    def _has_lease(self, key: str, now: float) -> bool:
+        lease = self._leases.get(key)
+        return lease is not None and lease[0] >= 1 and lease[1] > now
+
+    async def _renew(self, missing: list[tuple[str, RateLimit]], now: float) -> float:
+        """Lease permits for ``missing``; the longest retry-after if any key got none."""
+        assert self._window is not None
+        self.stats.window_calls += 1
+        try:
+            grants = await self._window.acquire(
+                [(key, limit, min(self._lease_size, limit.limit)) for key, limit in missing]
+            )
+        except Exception:
+            self.stats.window_errors += 1
+            logger.warning(
+                "Rate limit window unavailable, applying local limits only", exc_info=True,
+            )
+            return 0.0
+        wait = 0.0
+        for (key, limit), (granted, retry_after) in zip(missing, grants):
+            if granted:
+                self._leases[key] = [granted, now + limit.window]
+                self._leases.move_to_end(key)
+                if len(self._leases) > self._max_keys:
+                    self._leases.popitem(last=False)
+            else:
+                wait = max(wait, retry_after)
+        return wait
@@ -0,0 +1,97 @@
+"""Redis-backed idempotency front-cache for send_message."""
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import redis.asyncio as aioredis
+
+from chat_service.domain.entities.message import Message
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "chat:idem"
+
+
+def _key(conversation_id: UUID, sender_kind: str, sender_id: int, client_msg_id: UUID) -> str:
+    return f"{KEY_PREFIX}:{conversation_id}:{sender_kind}:{sender_id}:{client_msg_id}"
+
+
+def _dump(message: Message) -> str:
+    return json.dumps(
+        {
+            "id": str(message.id),
+            "conversation_id": str(message.conversation_id),
+            "sender_kind": message.sender_kind,
+            "sender_id": message.sender_id,
+            "type": message.type,
+            "body": message.body,
+            "payload": message.payload,
+            "client_msg_id": str(message.client_msg_id),
+            "created_at": message.created_at.isoformat(),
+        }
+    )
+
+
+def _load(raw: str | bytes) -> Message:
+    data: dict[str, Any] = json.loads(raw)
+    return Message(
+        id=UUID(data["id"]),
+        conversation_id=UUID(data["conversation_id"]),
+        sender_kind=data["sender_kind"],
+        sender_id=int(data["sender_id"]),
+        type=data["type"],
+        body=data["body"],
+        payload=data["payload"],
+        client_msg_id=UUID(data["client_msg_id"]),
+        created_at=datetime.fromisoformat(data["created_at"]),
+    )
+
+
+class RedisIdempotencyCache:
+    """Implements application.ports.cache.IdempotencyCache.
+
+    Redis failures are logged and treated as a cache miss so the send path
+    falls back to the database.
+    """
+
+    def __init__(self, redis: aioredis.Redis, ttl_seconds: int) -> None:
+        self._redis = redis
+        self._ttl = ttl_seconds
+
+    async def get(
+        self,
+        conversation_id: UUID,
+        sender_kind: str,
+        sender_id: int,
+        client_msg_id: UUID,
+    ) -> Message | None:
+        try:
+            raw = await self._redis.get(
+                _key(conversation_id, sender_kind, sender_id, client_msg_id)
+            )
+        except Exception:
+            logger.warning("Idempotency cache lookup failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        try:
+            return _load(raw)
+        except (KeyError, ValueError):
+            logger.warning("Discarding malformed idempotency cache entry")
+            return None
+
+    async def put(self, message: Message) -> None:
+        key = _key(
+            message.conversation_id,
+            message.sender_kind,
+            message.sender_id,
+            message.client_msg_id,
+        )
+        try:
+            await self._redis.set(key, _dump(message), ex=self._ttl)
+        except Exception:
+            logger.warning("Idempotency cache store failed", exc_info=True)
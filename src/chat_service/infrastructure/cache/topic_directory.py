@@ -0,0 +1,50 @@
+"""Bounded in-process topic -> conversation_id cache."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from uuid import UUID
+
+
+class TopicDirectory:
+    """Implements application.ports.cache.ConversationDirectory as an LRU.
+
+    Holds at most ``max_entries`` topics; a reverse index lets a
+    ``conversation_updated`` (closed) event drop the entry by conversation id.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], UUID] = OrderedDict()
+        self._by_conversation: dict[UUID, tuple[str, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, topic_type: str, topic_id: int) -> UUID | None:
+        key = (topic_type, topic_id)
+        conversation_id = self._entries.get(key)
+        if conversation_id is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return conversation_id
+
+    def put(self, topic_type: str, topic_id: int, conversation_id: UUID) -> None:
+        key = (topic_type, topic_id)
+        previous = self._entries.get(key)
+        if previous is not None and previous != conversation_id:
+            self._by_conversation.pop(previous, None)
+        self._entries[key] = conversation_id
+        self._entries.move_to_end(key)
+        self._by_conversation[conversation_id] = key
+        while len(self._entries) > self._max_entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._by_conversation.pop(evicted, None)
+
+    def invalidate_conversation(self, conversation_id: UUID) -> None:
+        key = self._by_conversation.pop(conversation_id, None)
+        if key is not None and self._entries.get(key) == conversation_id:
+            del self._entries[key]
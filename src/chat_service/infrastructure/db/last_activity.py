@@ -0,0 +1,66 @@
+"""Deferred, coalesced maintenance of conversations.last_message_at."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from chat_service.application.uow import UoWFactory
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
+
+
+class LastActivityAggregator:
+    """Keeps the newest activity timestamp per conversation and flushes them in bulk.
+
+    Send transactions no longer update the hot conversation row; instead every
+    ``flush_interval`` seconds one UPDATE ... FROM (VALUES ...) applies the max
+    timestamp seen per conversation with the same monotonic guard.
+    """
+
+    def __init__(self, uow_factory: UoWFactory, *, flush_interval: float) -> None:
+        self._uow_factory = uow_factory
+        self._flush_interval = flush_interval
+        self._pending: dict[UUID, datetime] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, conversation_id: UUID, ts: datetime) -> None:
+        prev = self._pending.get(conversation_id)
+        if prev is None or ts > prev:
+            self._pending[conversation_id] = ts
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="last-activity-aggregator")
+        logger.info("Last-activity aggregator started (flush every %.3fs)", self._flush_interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+        await self.flush()
+        logger.info("Last-activity aggregator stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self._uow_factory() as uow:
+                await uow.conversations_w.touch_last_message_at_many(batch)
+                await uow.commit()
+        except Exception:
+            logger.exception("last_message_at flush of %d conversations failed", len(batch))
+            for conversation_id, ts in batch.items():
+                self.touch(conversation_id, ts)
+            return 0
+        return len(batch)
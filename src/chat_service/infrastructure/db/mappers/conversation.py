@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from sqlalchemy import Row
+
 from chat_service.domain.entities.conversation import Conversation
 from chat_service.infrastructure.db.models.conversation import ConversationModel
 
@@ -17,6 +19,20 @@ def model_to_entity(model: ConversationModel) -> Conversation:
     )
 
 
+def row_to_entity(row: Row) -> Conversation:
+    """Map a Core result row carrying the conversations columns."""
+    return Conversation(
+        id=row.id,
+        topic_type=row.topic_type,
+        topic_id=row.topic_id,
+        status=row.status,
+        assignee_admin_id=row.assignee_admin_id,
+        last_message_at=row.last_message_at,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
 def entity_to_model(entity: Conversation) -> ConversationModel:
     return ConversationModel(
         id=entity.id,
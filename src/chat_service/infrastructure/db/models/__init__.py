@@ -1,4 +1,5 @@
 """Import all models so Alembic can discover them via Base.metadata."""
+from chat_service.infrastructure.db.models.blocked_user import BlockedUserModel
 from chat_service.infrastructure.db.models.conversation import ConversationModel
 from chat_service.infrastructure.db.models.message import MessageModel
 from chat_service.infrastructure.db.models.outbox import OutboxMessageModel
@@ -6,6 +7,7 @@ from chat_service.infrastructure.db.models.participant import ParticipantModel
 from chat_service.infrastructure.db.models.read_state import ReadStateModel
 
 __all__ = [
+    "BlockedUserModel",
     "ConversationModel",
     "MessageModel",
     "OutboxMessageModel",
@@ -23,6 +23,7 @@ class ConversationModel(Base):
     topic_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="open")
     assignee_admin_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    owner_user_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     last_message_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
@@ -43,4 +44,19 @@ class ConversationModel(Base):
     __table_args__ = (
         Index("ix_conversations_status_last_message", "status", last_message_at.desc()),
         Index("ix_conversations_topic", "topic_type", "topic_id"),
+        # At most one open support conversation per user and one open
+        # conversation per topic; get-or-create relies on these as ON CONFLICT arbiters.
+        Index(
+            "uq_conversations_open_support_owner",
+            "owner_user_id",
+            unique=True,
+            postgresql_where=text("topic_type = 'support' AND status = 'open'"),
+        ),
+        Index(
+            "uq_conversations_open_topic",
+            "topic_type",
+            "topic_id",
+            unique=True,
+            postgresql_where=text("status = 'open' AND topic_id IS NOT NULL"),
+        ),
     )
@@ -0,0 +1,114 @@
+"""Connection pool instrumentation and background health checking."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+from chat_service.infrastructure.metrics import db_pool_checkout_seconds
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
+
+
+class CheckoutWaitStats:
+    """Running totals of how long callers waited for a pooled connection."""
+
+    __slots__ = ("count", "total_seconds", "max_seconds", "slow_threshold")
+
+    def __init__(self, slow_threshold: float = 0.1) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.slow_threshold = slow_threshold
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        if seconds >= self.slow_threshold:
+            logger.warning("Slow DB pool checkout: %.1fms", seconds * 1000)
+
+    def reset_max(self) -> float:
+        peak, self.max_seconds = self.max_seconds, 0.0
+        return peak
+
+
+checkout_stats = CheckoutWaitStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait into ``checkout_stats``.
+
+    The measured span covers waiting for a free slot plus opening a new
+    connection when the pool grows.
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = time.perf_counter() - start
+            checkout_stats.observe(elapsed)
+            db_pool_checkout_seconds.observe(elapsed)
+
+
+class PoolHealthChecker:
+    """Pings the database on an interval instead of on every checkout.
+
+    A failed ping disposes the pool so idle connections that died with the
+    server are replaced on the next checkout rather than handed to requests.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval: float) -> None:
+        self._engine = engine
+        self._interval = interval
+        self._task: asyncio.Task[None] | None = None
+        self.healthy = True
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="db-pool-health-checker")
+        logger.info("DB pool health checker started (interval=%.1fs)", self._interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+            logger.info("DB pool health checker stopped")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            await self.check()
+
+    async def check(self) -> bool:
+        try:
+            async with self._engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if self.healthy:
+                logger.exception("DB pool health check failed, disposing pool")
+            self.healthy = False
+            await self._engine.dispose()
+            return False
+
+        if not self.healthy:
+            logger.info("DB pool health check recovered")
+        self.healthy = True
+        logger.debug(
+            "DB pool %s; checkouts=%d avg_wait=%.2fms max_wait=%.2fms",
+            self._engine.pool.status(),
+            checkout_stats.count,
+            (checkout_stats.total_seconds / checkout_stats.count * 1000)
+            if checkout_stats.count
+            else 0.0,
+            checkout_stats.reset_max() * 1000,
+        )
+        return True
@@ -1,24 +1,124 @@
 """Cursor-based pagination helpers.
 
-Cursor format: base64("<iso-timestamp>|<uuid>")
+Issued cursors (v2): urlsafe base64 of a packed record: version byte,
+flags (bit 0: descending listing), epoch microseconds as int64 and the 16
+raw UUID bytes, followed by a truncated HMAC-SHA256 tag when
+CURSOR_HMAC_SECRET is set.
+
+Still accepted (v1): base64("<iso-timestamp>|<uuid>"), the format clients
+used to build by hand.
 """
 from __future__ import annotations
 
 import base64
-from datetime import datetime, timezone
+import binascii
+import hashlib
+import hmac
+import struct
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
+from chat_service.application.exceptions import ValidationError
+from chat_service.config import settings
+
+_V2 = 2
+_V2_PREFIX = bytes((_V2,))
+_DESCENDING = 0x01
+_RECORD = struct.Struct(">BBq16s")
+_TAG_BYTES = 12
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+# Positions without a timestamp (conversations without messages) sort as the minimum.
+_NO_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+# binascii plus one translate is about twice as fast as base64.urlsafe_b64decode.
+_FROM_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+
+def _settings_key() -> bytes:
+    return settings.CURSOR_HMAC_SECRET.encode()
+
+
+def _tag(key: bytes, record: bytes) -> bytes:
+    return hmac.new(key, record, hashlib.sha256).digest()[:_TAG_BYTES]
+
+
+def encode_cursor(
+    ts: datetime | None,
+    uid: UUID,
+    *,
+    descending: bool = False,
+    key: bytes | None = None,
+) -> str:
+    """v2 cursor for the position ``(ts, uid)``.
+
+    ``key`` defaults to CURSOR_HMAC_SECRET; empty means unsigned.
+    """
+    ts = ts or _NO_TIMESTAMP
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    record = _RECORD.pack(
+        _V2, _DESCENDING if descending else 0, (ts - _EPOCH) // _MICROSECOND, uid.bytes,
+    )
+    key = _settings_key() if key is None else key
+    if key:
+        record += _tag(key, record)
+    return base64.urlsafe_b64encode(record).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str,
+    *,
+    descending: bool | None = None,
+    key: bytes | None = None,
+) -> tuple[datetime, UUID]:
+    """Position of a v2 or v1 cursor; ValidationError for anything else.
+
+    With ``descending`` set, a v2 cursor issued for the other direction is
+    rejected (v1 cursors carry no direction).
+    """
+    try:
+        # Restore base64 padding if it was stripped
+        padded = (cursor + "=" * (-len(cursor) % 4)).encode("ascii")
+        raw = binascii.a2b_base64(padded.translate(_FROM_URLSAFE))
+    except (binascii.Error, ValueError):
+        raise ValidationError("Invalid cursor") from None
+    key = _settings_key() if key is None else key
+    if raw[:1] == _V2_PREFIX:
+        return _decode_v2(raw, descending, key)
+    if key and not settings.CURSOR_ACCEPT_V1:
+        raise ValidationError("Invalid cursor")
+    return _decode_v1(raw)
+
+
+def _decode_v2(raw: bytes, descending: bool | None, key: bytes) -> tuple[datetime, UUID]:
+    record = raw[:_RECORD.size]
+    if key:
+        if len(raw) != _RECORD.size + _TAG_BYTES or not hmac.compare_digest(
+            raw[_RECORD.size:], _tag(key, record),
+        ):
+            raise ValidationError("Invalid cursor")
+    elif len(raw) not in (_RECORD.size, _RECORD.size + _TAG_BYTES):
+        # Without a secret, tags of previously signed cursors are ignored.
+        raise ValidationError("Invalid cursor")
+    _, flags, micros, uid = _RECORD.unpack(record)
+    if descending is not None and bool(flags & _DESCENDING) != descending:
+        raise ValidationError("Cursor belongs to a listing in the other direction")
+    try:
+        ts = _EPOCH + micros * _MICROSECOND
+    except OverflowError:
+        raise ValidationError("Invalid cursor") from None
+    return ts, UUID(bytes=uid)
+
 
-def encode_cursor(ts: datetime | None, uid: UUID) -> str:
-    ts_str = (ts or datetime.min.replace(tzinfo=timezone.utc)).isoformat()
-    raw = f"{ts_str}|{uid}"
-    cursor = base64.urlsafe_b64encode(raw.encode()).decode()
-    return cursor.rstrip("=")
+def _decode_v1(raw: bytes) -> tuple[datetime, UUID]:
+    try:
+        ts_str, uid_str = raw.decode().split("|", 1)
+        return datetime.fromisoformat(ts_str), UUID(uid_str)
+    except ValueError:
+        raise ValidationError("Invalid cursor") from None
 
 
-def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
-    # Restore base64 padding if it was stripped
-    cursor += "=" * ((4 - len(cursor) % 4) % 4)
-    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
-    ts_str, uid_str = raw.split("|", 1)
-    return datetime.fromisoformat(ts_str), UUID(uid_str)
+def _encode_v1(ts: datetime | None, uid: UUID) -> str:
+    """The v1 encoder, kept for compatibility tests and benchmarks."""
+    raw = f"{(ts or _NO_TIMESTAMP).isoformat()}|{uid}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chat_service.infrastructure.db.models.blocked_user import BlockedUserModel
+
+
+class BlockedUserReaderRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def list_blocked_ids(self) -> list[int]:
+        result = await self._session.execute(select(BlockedUserModel.user_id))
+        return list(result.scalars().all())
+
+
+class BlockedUserWriterRepo:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def block(self, user_id: int, reason: str | None = None) -> bool:
+        stmt = (
+            pg_insert(BlockedUserModel)
+            .values(user_id=user_id, reason=reason)
+            .on_conflict_do_nothing(index_elements=[BlockedUserModel.user_id])
+            .returning(BlockedUserModel.user_id)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none() is not None
+
+    async def unblock(self, user_id: int) -> bool:
+        stmt = (
+            delete(BlockedUserModel)
+            .where(BlockedUserModel.user_id == user_id)
+            .returning(BlockedUserModel.user_id)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none() is not None
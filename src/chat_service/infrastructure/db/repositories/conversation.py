@@ -1,19 +1,42 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING, Any, Mapping, Sequence
 from uuid import UUID
 
-from sqlalchemy import select, update
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    String,
+    column,
+    exists,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from chat_service.application.dto.conversation import ConversationFilterDTO
+from chat_service.application.exceptions import ConflictError
 from chat_service.domain.entities.conversation import Conversation
-from chat_service.domain.value_objects.enums import ConversationStatus
+from chat_service.domain.value_objects.enums import ConversationStatus, ParticipantKind
 from chat_service.infrastructure.db.mappers import conversation as mapper
 from chat_service.infrastructure.db.models.conversation import ConversationModel
 from chat_service.infrastructure.db.models.participant import ParticipantModel
 from chat_service.infrastructure.db.repositories._cursor import decode_cursor, encode_cursor
 
+if TYPE_CHECKING:
+    from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+
 
 class ConversationReaderRepo:
     def __init__(self, session: AsyncSession) -> None:
@@ -61,6 +84,25 @@ class ConversationReaderRepo:
         model = result.scalar_one_or_none()
         return mapper.model_to_entity(model) if model else None
 
+    async def get_by_topics(
+        self,
+        topic_type: str,
+        topic_ids: Sequence[int],
+    ) -> dict[int, Conversation]:
+        if not topic_ids:
+            return {}
+        stmt = (
+            select(ConversationModel)
+            .where(
+                ConversationModel.topic_type == topic_type,
+                ConversationModel.topic_id.in_(set(topic_ids)),
+            )
+            .order_by(ConversationModel.topic_id, ConversationModel.created_at.desc())
+            .distinct(ConversationModel.topic_id)
+        )
+        result = await self._session.execute(stmt)
+        return {m.topic_id: mapper.model_to_entity(m) for m in result.scalars().all()}
+
     async def list_for_user(
         self,
         user_id: int,
@@ -82,7 +124,7 @@ class ConversationReaderRepo:
             .limit(limit)
         )
         if cursor:
-            ts, cid = decode_cursor(cursor)
+            ts, cid = decode_cursor(cursor, descending=True)
             stmt = stmt.where(
                 (ConversationModel.last_message_at < ts)
                 | (
@@ -107,7 +149,7 @@ class ConversationReaderRepo:
             ConversationModel.id,
         ).limit(filters.limit)
         if filters.cursor:
-            ts, cid = decode_cursor(filters.cursor)
+            ts, cid = decode_cursor(filters.cursor, descending=True)
             stmt = stmt.where(
                 (ConversationModel.last_message_at < ts)
                 | (
@@ -120,8 +162,15 @@ class ConversationReaderRepo:
 
 
 class ConversationWriterRepo:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        last_activity: LastActivityAggregator | None = None,
+    ) -> None:
         self._session = session
+        self._last_activity = last_activity
+        self._deferred: dict[UUID, datetime] = {}
 
     async def create(self, conversation: Conversation) -> Conversation:
         model = mapper.entity_to_model(conversation)
@@ -129,6 +178,109 @@ class ConversationWriterRepo:
         await self._session.flush()
         return mapper.model_to_entity(model)
 
+    async def create_open_or_get(
+        self,
+        conversation: Conversation,
+        *,
+        owner_user_id: int,
+    ) -> tuple[Conversation, bool]:
+        """Insert an open conversation or return the one already holding its slot.
+
+        One statement: ``INSERT ... ON CONFLICT DO NOTHING`` against the partial
+        unique index, the owner participant chained off the inserted row, and
+        the existing open conversation when nothing was
+        inserted. A conflicting row committed after the statement snapshot is
+        invisible to that last branch, so an empty result is retried once.
+        Support rows without owner_user_id (created before the column) are
+        matched through their user participant instead.
+        """
+        stmt = self._create_open_or_get_stmt(conversation, owner_user_id)
+        for _ in range(2):
+            row = (await self._session.execute(stmt)).one_or_none()
+            if row is not None:
+                return mapper.row_to_entity(row), row.created
+        raise ConflictError("Open conversation changed concurrently, retry")
+
+    @staticmethod
+    def _create_open_or_get_stmt(conversation: Conversation, owner_user_id: int) -> Any:
+        table = ConversationModel.__table__
+        vacant = None
+        if conversation.topic_id is None:
+            # Support conversations: one open per owner. Rows created before
+            # owner_user_id existed have it NULL; their user participant is the owner.
+            index_elements = [table.c.owner_user_id]
+            index_where = text("topic_type = 'support' AND status = 'open'")
+            legacy = (
+                table.c.owner_user_id.is_(None)
+                & (table.c.topic_type == conversation.topic_type)
+                & exists().where(
+                    ParticipantModel.conversation_id == table.c.id,
+                    ParticipantModel.kind == ParticipantKind.USER.value,
+                    ParticipantModel.subject_id == owner_user_id,
+                )
+            )
+            slot = (
+                (table.c.owner_user_id == owner_user_id)
+                & (table.c.topic_type == conversation.topic_type)
+            ) | legacy
+            # The unique index cannot see a legacy row, so it has to be checked.
+            vacant = ~exists().where(legacy, table.c.status == ConversationStatus.OPEN)
+        else:
+            index_elements = [table.c.topic_type, table.c.topic_id]
+            index_where = text("status = 'open' AND topic_id IS NOT NULL")
+            slot = (
+                (table.c.topic_type == conversation.topic_type)
+                & (table.c.topic_id == conversation.topic_id)
+            )
+
+        row = {
+            "id": conversation.id,
+            "topic_type": conversation.topic_type,
+            "topic_id": conversation.topic_id,
+            "status": conversation.status,
+            "assignee_admin_id": conversation.assignee_admin_id,
+            "owner_user_id": owner_user_id,
+            "last_message_at": conversation.last_message_at,
+            "created_at": conversation.created_at,
+            "updated_at": conversation.updated_at,
+        }
+        if vacant is None:
+            ins = pg_insert(table).values(**row)
+        else:
+            ins = pg_insert(table).from_select(
+                list(row),
+                select(*(literal(value, table.c[name].type) for name, value in row.items()))
+                .where(vacant),
+            )
+        ins = (
+            ins.on_conflict_do_nothing(index_elements=index_elements, index_where=index_where)
+            .returning(*table.c)
+            .cte("ins")
+        )
+        participant = insert(ParticipantModel).from_select(
+            ["id", "conversation_id", "kind", "subject_id", "joined_at"],
+            select(
+                func.gen_random_uuid(),
+                ins.c.id,
+                literal(ParticipantKind.USER.value, String),
+                literal(owner_user_id, BigInteger),
+                ins.c.created_at,
+            ),
+        ).cte("ins_participant")
+        existing = (
+            select(*table.c, literal(False, Boolean).label("created"))
+            .where(
+                slot,
+                table.c.status == ConversationStatus.OPEN,
+                ~exists(select(ins.c.id)),
+            )
+            .limit(1)
+        )
+        return union_all(
+            select(*ins.c, literal(True, Boolean).label("created")),
+            existing,
+        ).add_cte(participant)
+
     async def assign(self, conversation_id: UUID, admin_id: int | None) -> None:
         stmt = (
             update(ConversationModel)
@@ -150,9 +302,67 @@ class ConversationWriterRepo:
         conversation_id: UUID,
         ts: datetime,
     ) -> None:
+        """Monotonic ``last_message_at = GREATEST(last_message_at, ts)``.
+
+        The guard lives in WHERE so an update that would not change the value
+        matches no row: no row lock, no new tuple version. With a
+        LastActivityAggregator the touch is staged and handed over after commit.
+        """
+        if self._last_activity is not None:
+            prev = self._deferred.get(conversation_id)
+            if prev is None or ts > prev:
+                self._deferred[conversation_id] = ts
+            return
         stmt = (
             update(ConversationModel)
-            .where(ConversationModel.id == conversation_id)
+            .where(
+                ConversationModel.id == conversation_id,
+                or_(
+                    ConversationModel.last_message_at.is_(None),
+                    ConversationModel.last_message_at < ts,
+                ),
+            )
             .values(last_message_at=ts)
         )
         await self._session.execute(stmt)
+
+    async def touch_last_message_at_many(
+        self,
+        touches: Mapping[UUID, datetime],
+    ) -> None:
+        if not touches:
+            return
+        if self._last_activity is not None:
+            for conversation_id, ts in touches.items():
+                prev = self._deferred.get(conversation_id)
+                if prev is None or ts > prev:
+                    self._deferred[conversation_id] = ts
+            return
+        # Sorted by id so concurrent flushes lock rows in the same order.
+        v = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("ts", TIMESTAMP(timezone=True)),
+            name="v",
+        ).data(sorted(touches.items()))
+        stmt = (
+            update(ConversationModel)
+            .where(
+                ConversationModel.id == v.c.id,
+                or_(
+                    ConversationModel.last_message_at.is_(None),
+                    ConversationModel.last_message_at < v.c.ts,
+                ),
+            )
+            .values(last_message_at=v.c.ts)
+        )
+        await self._session.execute(stmt)
+
+    def release_deferred(self) -> None:
+        """Hand staged touches to the aggregator once the transaction committed."""
+        if self._last_activity is not None:
+            for conversation_id, ts in self._deferred.items():
+                self._last_activity.touch(conversation_id, ts)
+        self._deferred.clear()
+
+    def discard_deferred(self) -> None:
+        self._deferred.clear()
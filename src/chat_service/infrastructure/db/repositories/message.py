@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from typing import Sequence
 from uuid import UUID
 
 from sqlalchemy import select
@@ -30,7 +31,7 @@ class MessageReaderRepo:
             .limit(limit)
         )
         if cursor:
-            ts, mid = decode_cursor(cursor)
+            ts, mid = decode_cursor(cursor, descending=False)
             stmt = stmt.where(
                 (MessageModel.created_at > ts)
                 | ((MessageModel.created_at == ts) & (MessageModel.id > mid))
@@ -80,6 +81,34 @@ class MessageWriterRepo:
         assert existing is not None
         return existing, False
 
+    async def create_many(self, messages: Sequence[Message]) -> list[Message]:
+        if not messages:
+            return []
+        rows = [
+            {
+                "id": m.id,
+                "conversation_id": m.conversation_id,
+                "sender_kind": m.sender_kind,
+                "sender_id": m.sender_id,
+                "type": m.type,
+                "body": m.body,
+                "payload": m.payload,
+                "client_msg_id": m.client_msg_id,
+                "created_at": m.created_at,
+            }
+            for m in messages
+        ]
+        stmt = (
+            pg_insert(MessageModel)
+            .values(rows)
+            .on_conflict_do_nothing(constraint="uq_message_idempotency")
+            .returning(MessageModel)
+        )
+        result = await self._session.execute(stmt)
+        created = [mapper.model_to_entity(m) for m in result.scalars().all()]
+        created.sort(key=lambda m: (m.created_at, m.id))
+        return created
+
     async def get_by_client_msg_id(
         self,
         conversation_id: UUID,
@@ -1,25 +1,73 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Sequence
 
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from chat_service.application.repositories.outbox import OutboxRecord
 from chat_service.infrastructure.db.models.outbox import OutboxMessageModel
 
 
+FrameRenderer = Callable[[str, dict[str, Any]], bytes]
+
+
+def _record(model: OutboxMessageModel) -> OutboxRecord:
+    return OutboxRecord(
+        id=model.id,
+        event_type=model.event_type,
+        payload=model.payload,
+        attempts=model.attempts or 0,
+        frame=model.frame,
+        created_at=model.created_at,
+    )
+
+
 class OutboxWriterRepo:
-    def __init__(self, session: AsyncSession) -> None:
+    """With ``render_frame`` each row also stores its final WS frame, so the
+    worker and the nodes pass it along without decoding and re-encoding.
+
+    Rows added through this repository are collected in ``added`` for the
+    unit of work's post-commit hook.
+    """
+
+    def __init__(self, session: AsyncSession, render_frame: FrameRenderer | None = None) -> None:
         self._session = session
+        self._render_frame = render_frame
+        self.added: list[OutboxRecord] = []
+
+    def _model(self, event_type: str, payload: dict[str, Any]) -> OutboxMessageModel:
+        frame = self._render_frame(event_type, payload) if self._render_frame else None
+        # Stamped here rather than by now(), which is the transaction start:
+        # created_at is the "enqueued" stage of the delivery trace.
+        return OutboxMessageModel(
+            event_type=event_type,
+            payload=payload,
+            frame=frame,
+            created_at=datetime.now(timezone.utc),
+        )
 
-    async def add(self, event_type: str, payload: dict[str, Any]) -> None:
-        model = OutboxMessageModel(event_type=event_type, payload=payload)
+    async def add(self, event_type: str, payload: dict[str, Any]) -> int:
+        model = self._model(event_type, payload)
         self._session.add(model)
         await self._session.flush()
+        self.added.append(_record(model))
+        return model.id
 
-    async def fetch_pending(self, batch_size: int) -> list[OutboxRecord]:
+    async def add_many(self, event_type: str, payloads: Sequence[dict[str, Any]]) -> None:
+        if not payloads:
+            return
+        models = [self._model(event_type, p) for p in payloads]
+        self._session.add_all(models)
+        await self._session.flush()
+        self.added.extend(_record(m) for m in models)
+
+    def take_added(self) -> list[OutboxRecord]:
+        added, self.added = self.added, []
+        return added
+
+    async def fetch_pending(self, batch_size: int, *, min_age: float = 0.0) -> list[OutboxRecord]:
         stmt = (
             select(OutboxMessageModel)
             .where(
@@ -29,7 +77,12 @@ class OutboxWriterRepo:
                     | (OutboxMessageModel.next_retry_at <= datetime.utcnow())
                 ),
             )
-            .order_by(OutboxMessageModel.created_at.asc())
+        )
+        if min_age > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=min_age)
+            stmt = stmt.where(OutboxMessageModel.created_at <= cutoff)
+        stmt = (
+            stmt.order_by(OutboxMessageModel.created_at.asc())
             .limit(batch_size)
             .with_for_update(skip_locked=True)
         )
@@ -46,15 +99,13 @@ class OutboxWriterRepo:
             )
             await self._session.flush()
 
-        return [
-            OutboxRecord(
-                id=r.id,
-                event_type=r.event_type,
-                payload=r.payload,
-                attempts=r.attempts,
-            )
-            for r in rows
-        ]
+        return [_record(r) for r in rows]
+
+    async def count_pending(self) -> int:
+        stmt = select(func.count()).select_from(OutboxMessageModel).where(
+            OutboxMessageModel.status.in_(["pending", "failed"]),
+        )
+        return (await self._session.execute(stmt)).scalar_one()
 
     async def mark_sent(self, ids: list[int]) -> None:
         if not ids:
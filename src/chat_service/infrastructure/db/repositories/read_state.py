@@ -1,13 +1,55 @@
 from __future__ import annotations
 
+from typing import Sequence
 from uuid import UUID
 
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    ColumnElement,
+    String,
+    and_,
+    column,
+    exists,
+    func,
+    literal_column,
+    or_,
+    select,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from chat_service.application.dto.read_state import ReadMarkDTO
+from chat_service.infrastructure.db.models.message import MessageModel
+from chat_service.infrastructure.db.models.participant import ParticipantModel
 from chat_service.infrastructure.db.models.read_state import ReadStateModel
 
 
+def _monotonic_guard() -> ColumnElement[bool]:
+    """ON CONFLICT ... WHERE clause: only move the read position forward in time.
+
+    Message ids are random UUIDs, so "newer" is decided by the referenced
+    messages' ``created_at``. The conflict row and ``excluded`` are addressed
+    literally because SQLAlchemy does not correlate into ON CONFLICT clauses.
+    """
+    new_msg = aliased(MessageModel)
+    cur_msg = aliased(MessageModel)
+    new_ts = (
+        select(new_msg.created_at)
+        .where(new_msg.id == literal_column("excluded.last_read_message_id"))
+        .scalar_subquery()
+    )
+    cur_ts = (
+        select(cur_msg.created_at)
+        .where(cur_msg.id == literal_column("read_state.last_read_message_id"))
+        .scalar_subquery()
+    )
+    return or_(ReadStateModel.last_read_message_id.is_(None), new_ts >= cur_ts)
+
+
 class ReadStateWriterRepo:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
@@ -19,17 +61,78 @@ class ReadStateWriterRepo:
         subject_id: int,
         last_message_id: UUID,
     ) -> None:
-        stmt = (
-            pg_insert(ReadStateModel)
-            .values(
-                conversation_id=conversation_id,
-                kind=kind,
-                subject_id=subject_id,
-                last_read_message_id=last_message_id,
+        stmt = pg_insert(ReadStateModel).values(
+            conversation_id=conversation_id,
+            kind=kind,
+            subject_id=subject_id,
+            last_read_message_id=last_message_id,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_read_state_member",
+            set_={"last_read_message_id": last_message_id, "updated_at": func.now()},
+            where=_monotonic_guard(),
+        )
+        await self._session.execute(stmt)
+
+    async def upsert_last_read_many(self, marks: Sequence[ReadMarkDTO]) -> int:
+        if not marks:
+            return 0
+        # Stable row order keeps concurrent flushes from deadlocking on each other.
+        ordered = sorted(marks, key=lambda m: (m.conversation_id, m.kind, m.subject_id))
+        v = values(
+            column("conversation_id", PG_UUID(as_uuid=True)),
+            column("kind", String),
+            column("subject_id", BigInteger),
+            column("last_message_id", PG_UUID(as_uuid=True)),
+            column("is_admin", Boolean),
+            name="v",
+        ).data(
+            [
+                (m.conversation_id, m.kind, m.subject_id, m.last_message_id, m.is_admin)
+                for m in ordered
+            ]
+        )
+        is_member = exists().where(
+            ParticipantModel.conversation_id == v.c.conversation_id,
+            ParticipantModel.kind == v.c.kind,
+            ParticipantModel.subject_id == v.c.subject_id,
+        )
+        source = (
+            select(
+                func.gen_random_uuid(),
+                v.c.conversation_id,
+                v.c.kind,
+                v.c.subject_id,
+                v.c.last_message_id,
+            )
+            .join(
+                MessageModel,
+                and_(
+                    MessageModel.id == v.c.last_message_id,
+                    MessageModel.conversation_id == v.c.conversation_id,
+                ),
             )
-            .on_conflict_do_update(
-                constraint="uq_read_state_member",
-                set_={"last_read_message_id": last_message_id},
+            .where(or_(v.c.is_admin, is_member))
+            # One row per member (ON CONFLICT cannot touch a row twice): the newest mark.
+            .distinct(v.c.conversation_id, v.c.kind, v.c.subject_id)
+            .order_by(
+                v.c.conversation_id,
+                v.c.kind,
+                v.c.subject_id,
+                MessageModel.created_at.desc(),
             )
         )
-        await self._session.execute(stmt)
+        stmt = pg_insert(ReadStateModel).from_select(
+            ["id", "conversation_id", "kind", "subject_id", "last_read_message_id"],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_read_state_member",
+            set_={
+                "last_read_message_id": stmt.excluded.last_read_message_id,
+                "updated_at": func.now(),
+            },
+            where=_monotonic_guard(),
+        )
+        result = await self._session.execute(stmt)
+        return result.rowcount or 0  # type: ignore[attr-defined]
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from chat_service.config import settings
+from chat_service.infrastructure.db.pool import TimedQueuePool, checkout_stats
 
+checkout_stats.slow_threshold = settings.DB_POOL_SLOW_CHECKOUT_MS / 1000
+
+# Liveness is checked by PoolHealthChecker in the background; per-checkout
+# pre-ping stays available via DB_POOL_PRE_PING for environments that need it.
 engine = create_async_engine(
     settings.database_url,
-    poolclass=AsyncAdaptedQueuePool,
+    poolclass=TimedQueuePool,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     pool_recycle=settings.DB_POOL_RECYCLE,
     echo=False,
 )
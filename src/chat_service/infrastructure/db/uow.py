@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+from functools import cached_property
 from types import TracebackType
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from chat_service.application.uow import PostCommitHook
+from chat_service.infrastructure.db.repositories.blocked_user import (
+    BlockedUserReaderRepo,
+    BlockedUserWriterRepo,
+)
 from chat_service.infrastructure.db.repositories.conversation import (
     ConversationReaderRepo,
     ConversationWriterRepo,
@@ -19,30 +25,141 @@ from chat_service.infrastructure.db.repositories.participant import (
     ParticipantWriterRepo,
 )
 from chat_service.infrastructure.db.repositories.read_state import ReadStateWriterRepo
+from chat_service.infrastructure.ws.protocol import render_event_frame
+
+if TYPE_CHECKING:
+    from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+
+_REPOSITORIES = (
+    "conversations",
+    "conversations_w",
+    "participants",
+    "participants_w",
+    "messages",
+    "messages_w",
+    "read_state_w",
+    "outbox",
+    "blocked_users",
+    "blocked_users_w",
+)
 
 
 class SqlAlchemyUoW:
-    """Concrete Unit-of-Work backed by a single AsyncSession."""
+    """Concrete Unit-of-Work backed by a single AsyncSession.
+
+    Either wraps a caller-owned ``session`` or opens one from
+    ``session_factory`` on first repository access. In the latter case the
+    UoW owns the session and closes it on ``close()`` / ``__aexit__``, so a
+    request that is fully served from caches never builds a session at all.
+
+    With ``last_activity`` set, last_message_at touches are deferred to the
+    aggregator after a successful commit instead of updating the row inline.
+    With ``outbox_frames`` outbox rows carry their pre-rendered WS frame.
+    With ``post_commit`` the outbox records written in a transaction are
+    handed to the hook once it has committed.
+    """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession | None = None,
+        *,
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+        last_activity: LastActivityAggregator | None = None,
+        outbox_frames: bool = False,
+        post_commit: PostCommitHook | None = None,
+    ) -> None:
+        if session is None and session_factory is None:
+            raise ValueError("SqlAlchemyUoW needs a session or a session_factory")
         self._session = session
-        self.conversations = ConversationReaderRepo(session)
-        self.conversations_w = ConversationWriterRepo(session)
-        self.participants = ParticipantReaderRepo(session)
-        self.participants_w = ParticipantWriterRepo(session)
-        self.messages = MessageReaderRepo(session)
-        self.messages_w = MessageWriterRepo(session)
-        self.read_state_w = ReadStateWriterRepo(session)
-        self.outbox = OutboxWriterRepo(session)
+        self._session_factory = session_factory
+        self._owns_session = session is None
+        self._last_activity = last_activity
+        self._outbox_frames = outbox_frames
+        self._post_commit = post_commit
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            assert self._session_factory is not None
+            self._session = self._session_factory()
+        return self._session
+
+    @property
+    def has_session(self) -> bool:
+        return self._session is not None
+
+    @cached_property
+    def conversations(self) -> ConversationReaderRepo:
+        return ConversationReaderRepo(self.session)
+
+    @cached_property
+    def conversations_w(self) -> ConversationWriterRepo:
+        return ConversationWriterRepo(self.session, last_activity=self._last_activity)
+
+    @cached_property
+    def participants(self) -> ParticipantReaderRepo:
+        return ParticipantReaderRepo(self.session)
+
+    @cached_property
+    def participants_w(self) -> ParticipantWriterRepo:
+        return ParticipantWriterRepo(self.session)
+
+    @cached_property
+    def messages(self) -> MessageReaderRepo:
+        return MessageReaderRepo(self.session)
+
+    @cached_property
+    def messages_w(self) -> MessageWriterRepo:
+        return MessageWriterRepo(self.session)
+
+    @cached_property
+    def read_state_w(self) -> ReadStateWriterRepo:
+        return ReadStateWriterRepo(self.session)
+
+    @cached_property
+    def outbox(self) -> OutboxWriterRepo:
+        return OutboxWriterRepo(
+            self.session, render_frame=render_event_frame if self._outbox_frames else None,
+        )
+
+    @cached_property
+    def blocked_users(self) -> BlockedUserReaderRepo:
+        return BlockedUserReaderRepo(self.session)
+
+    @cached_property
+    def blocked_users_w(self) -> BlockedUserWriterRepo:
+        return BlockedUserWriterRepo(self.session)
 
     async def flush(self) -> None:
-        await self._session.flush()
+        if self._session is not None:
+            await self._session.flush()
 
     async def commit(self) -> None:
-        await self._session.commit()
+        if self._session is not None:
+            await self._session.commit()
+            if "conversations_w" in self.__dict__:
+                self.conversations_w.release_deferred()
+            if "outbox" in self.__dict__:
+                added = self.outbox.take_added()
+                if added and self._post_commit is not None:
+                    await self._post_commit(added)
 
     async def rollback(self) -> None:
-        await self._session.rollback()
+        if self._session is not None:
+            await self._session.rollback()
+            if "conversations_w" in self.__dict__:
+                self.conversations_w.discard_deferred()
+            if "outbox" in self.__dict__:
+                self.outbox.take_added()
+
+    async def close(self) -> None:
+        """Close the session if this UoW opened it. Safe to call repeatedly."""
+        if not self._owns_session or self._session is None:
+            return
+        session, self._session = self._session, None
+        for name in _REPOSITORIES:
+            self.__dict__.pop(name, None)
+        await session.close()
 
     async def __aenter__(self) -> Self:
         return self
@@ -53,5 +170,8 @@ class SqlAlchemyUoW:
         exc_val: BaseException | None,
         exc_tb: TracebackType | None,
     ) -> None:
-        if exc_type is not None:
-            await self.rollback()
+        try:
+            if exc_type is not None:
+                await self.rollback()
+        finally:
+            await self.close()
@@ -0,0 +1,397 @@
+"""Repository implementations over a MemoryStore.
+
+Each mirrors its SQLAlchemy counterpart in ``infrastructure.db.repositories``,
+including ordering, keyset cursors (``_cursor`` format) and conflict
+handling, so services behave the same on either backend.
+"""
+from __future__ import annotations
+
+import bisect
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Mapping, Sequence
+from uuid import UUID
+
+from chat_service.application.dto.conversation import ConversationFilterDTO
+from chat_service.application.dto.read_state import ReadMarkDTO
+from chat_service.application.repositories.outbox import OutboxRecord
+from chat_service.domain.entities.conversation import Conversation
+from chat_service.domain.entities.message import Message
+from chat_service.domain.entities.participant import Participant
+from chat_service.domain.entities.read_state import ReadState
+from chat_service.domain.value_objects.enums import ConversationStatus, ParticipantKind
+from chat_service.infrastructure.db.repositories._cursor import decode_cursor
+from chat_service.infrastructure.memory.store import (
+    ActivityKey,
+    Journal,
+    MemoryStore,
+    OutboxRow,
+    activity_key,
+    aware,
+    idempotency_key,
+    micros,
+    open_slot,
+)
+
+FrameRenderer = Callable[[str, dict[str, Any]], bytes]
+
+
+def _activity_after(cursor: str | None) -> ActivityKey | None:
+    """Position after a conversation cursor; None without one.
+
+    As in SQL, ``last_message_at < ts`` never matches conversations without
+    activity, so paging past the first page stops before them.
+    """
+    if not cursor:
+        return None
+    ts, cid = decode_cursor(cursor, descending=True)
+    return (False, -micros(ts), cid.int)
+
+
+class ConversationReaderRepo:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+
+    async def get_by_id(self, conversation_id: UUID) -> Conversation | None:
+        return self._store.conversations.get(conversation_id)
+
+    async def get_support_for_user(self, user_id: int) -> Conversation | None:
+        candidates = [
+            c
+            for cid in self._store.member_of.get((ParticipantKind.USER.value, user_id), ())
+            if (c := self._store.conversations[cid]).topic_type == "support"
+            and c.status == ConversationStatus.OPEN
+        ]
+        return max(candidates, key=lambda c: aware(c.created_at), default=None)
+
+    async def get_by_topic(
+        self,
+        topic_type: str,
+        topic_id: int,
+        *,
+        status: str | None = None,
+    ) -> Conversation | None:
+        matches = [
+            c
+            for cid in self._store.topics.get((topic_type, topic_id), ())
+            if (c := self._store.conversations[cid]) and (not status or c.status == status)
+        ]
+        return max(matches, key=lambda c: aware(c.created_at), default=None)
+
+    async def get_by_topics(
+        self,
+        topic_type: str,
+        topic_ids: Sequence[int],
+    ) -> dict[int, Conversation]:
+        found: dict[int, Conversation] = {}
+        for topic_id in set(topic_ids):
+            conversation = await self.get_by_topic(topic_type, topic_id)
+            if conversation is not None:
+                found[topic_id] = conversation
+        return found
+
+    async def list_for_user(
+        self,
+        user_id: int,
+        *,
+        cursor: str | None = None,
+        limit: int = 20,
+    ) -> list[Conversation]:
+        keys = sorted(
+            activity_key(self._store.conversations[cid])
+            for cid in self._store.member_of.get((ParticipantKind.USER.value, user_id), ())
+        )
+        after = _activity_after(cursor)
+        if after is not None:
+            keys = [k for k in keys[bisect.bisect_right(keys, after):] if not k[0]]
+        return [self._store.conversations[UUID(int=k[2])] for k in keys[:limit]]
+
+    async def list_for_admin(
+        self,
+        filters: ConversationFilterDTO,
+    ) -> list[Conversation]:
+        index = self._store.activity
+        after = _activity_after(filters.cursor)
+        start = 0 if after is None else bisect.bisect_right(index, after)
+        found: list[Conversation] = []
+        for key in index[start:]:
+            if len(found) >= filters.limit or (after is not None and key[0]):
+                break
+            conversation = self._store.conversations[UUID(int=key[2])]
+            if filters.status and conversation.status != filters.status.value:
+                continue
+            if (
+                filters.assignee_admin_id is not None
+                and conversation.assignee_admin_id != filters.assignee_admin_id
+            ):
+                continue
+            found.append(conversation)
+        return found
+
+
+class ConversationWriterRepo:
+    def __init__(self, store: MemoryStore, journal: Journal) -> None:
+        self._store = store
+        self._journal = journal
+
+    async def create(self, conversation: Conversation) -> Conversation:
+        self._store.insert_conversation(conversation, None, self._journal)
+        return conversation
+
+    async def create_open_or_get(
+        self,
+        conversation: Conversation,
+        *,
+        owner_user_id: int,
+    ) -> tuple[Conversation, bool]:
+        slot = open_slot(conversation.topic_type, conversation.topic_id, owner_user_id)
+        existing = self._store.open_slots.get(slot) if slot is not None else None
+        if existing is not None:
+            return self._store.conversations[existing], False
+        self._store.insert_conversation(conversation, owner_user_id, self._journal)
+        self._store.insert_participant(
+            Participant(
+                conversation_id=conversation.id,
+                kind=ParticipantKind.USER,
+                subject_id=owner_user_id,
+                joined_at=conversation.created_at,
+            ),
+            self._journal,
+        )
+        return conversation, True
+
+    async def assign(self, conversation_id: UUID, admin_id: int | None) -> None:
+        conversation = self._store.conversations.get(conversation_id)
+        if conversation is not None:
+            self._store.update_conversation(
+                replace(conversation, assignee_admin_id=admin_id), self._journal,
+            )
+
+    async def close(self, conversation_id: UUID) -> None:
+        conversation = self._store.conversations.get(conversation_id)
+        if conversation is not None:
+            self._store.update_conversation(
+                replace(conversation, status=ConversationStatus.CLOSED), self._journal,
+            )
+
+    async def touch_last_message_at(self, conversation_id: UUID, ts: datetime) -> None:
+        self._store.touch(conversation_id, ts, self._journal)
+
+    async def touch_last_message_at_many(self, touches: Mapping[UUID, datetime]) -> None:
+        for conversation_id, ts in touches.items():
+            self._store.touch(conversation_id, ts, self._journal)
+
+
+class ParticipantReaderRepo:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+
+    async def is_participant(self, conversation_id: UUID, kind: str, subject_id: int) -> bool:
+        return self._store.is_member(conversation_id, kind, subject_id)
+
+    async def list_participants(self, conversation_id: UUID) -> list[Participant]:
+        return list(self._store.participants.get(conversation_id, {}).values())
+
+
+class ParticipantWriterRepo:
+    def __init__(self, store: MemoryStore, journal: Journal) -> None:
+        self._store = store
+        self._journal = journal
+
+    async def add(self, participant: Participant) -> None:
+        self._store.insert_participant(participant, self._journal)
+
+
+class MessageReaderRepo:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+
+    async def list_messages(
+        self,
+        conversation_id: UUID,
+        *,
+        cursor: str | None = None,
+        limit: int = 50,
+    ) -> list[Message]:
+        timeline = self._store.timelines.get(conversation_id, [])
+        start = 0
+        if cursor:
+            ts, mid = decode_cursor(cursor, descending=False)
+            start = bisect.bisect_right(timeline, (aware(ts), mid))
+        return [self._store.messages[mid] for _, mid in timeline[start:start + limit]]
+
+
+class MessageWriterRepo:
+    def __init__(self, store: MemoryStore, journal: Journal) -> None:
+        self._store = store
+        self._journal = journal
+
+    async def create_if_not_exists(self, message: Message) -> tuple[Message, bool]:
+        if self._store.insert_message(message, self._journal):
+            return message, True
+        existing = self._store.idempotency[idempotency_key(message)]
+        return self._store.messages[existing], False
+
+    async def create_many(self, messages: Sequence[Message]) -> list[Message]:
+        created = [m for m in messages if self._store.insert_message(m, self._journal)]
+        created.sort(key=lambda m: (aware(m.created_at), m.id))
+        return created
+
+    async def get_by_client_msg_id(
+        self,
+        conversation_id: UUID,
+        sender_kind: str,
+        sender_id: int,
+        client_msg_id: UUID,
+    ) -> Message | None:
+        key = (conversation_id, str(sender_kind), sender_id, client_msg_id)
+        mid = self._store.idempotency.get(key)
+        return self._store.messages[mid] if mid is not None else None
+
+
+class ReadStateWriterRepo:
+    def __init__(self, store: MemoryStore, journal: Journal) -> None:
+        self._store = store
+        self._journal = journal
+
+    def _advance(self, conversation_id: UUID, kind: str, subject_id: int, message_id: UUID) -> bool:
+        """Move the read position forward in message time, like ``_monotonic_guard``."""
+        message = self._store.messages.get(message_id)
+        if message is None:
+            return False
+        current = self._store.read_state.get((conversation_id, kind, subject_id))
+        if current is not None and current.last_read_message_id is not None:
+            read = self._store.messages.get(current.last_read_message_id)
+            if read is None or aware(message.created_at) < aware(read.created_at):
+                return False
+        self._store.put_read_state(
+            ReadState(
+                conversation_id=conversation_id,
+                kind=kind,
+                subject_id=subject_id,
+                last_read_message_id=message_id,
+                updated_at=datetime.now(timezone.utc),
+            ),
+            self._journal,
+        )
+        return True
+
+    async def upsert_last_read(
+        self,
+        conversation_id: UUID,
+        kind: str,
+        subject_id: int,
+        last_message_id: UUID,
+    ) -> None:
+        self._advance(conversation_id, str(kind), subject_id, last_message_id)
+
+    async def upsert_last_read_many(self, marks: Sequence[ReadMarkDTO]) -> int:
+        newest: dict[tuple[UUID, str, int], tuple[datetime, UUID]] = {}
+        for mark in marks:
+            message = self._store.messages.get(mark.last_message_id)
+            if message is None or message.conversation_id != mark.conversation_id:
+                continue
+            if not mark.is_admin and not self._store.is_member(
+                mark.conversation_id, mark.kind, mark.subject_id,
+            ):
+                continue
+            key = (mark.conversation_id, mark.kind, mark.subject_id)
+            candidate = (aware(message.created_at), message.id)
+            if key not in newest or candidate[0] > newest[key][0]:
+                newest[key] = candidate
+        return sum(
+            self._advance(conversation_id, kind, subject_id, message_id)
+            for (conversation_id, kind, subject_id), (_, message_id) in newest.items()
+        )
+
+
+def _outbox_record(row: OutboxRow) -> OutboxRecord:
+    return OutboxRecord(
+        id=row.id,
+        event_type=row.event_type,
+        payload=row.payload,
+        attempts=row.attempts,
+        frame=row.frame,
+        created_at=row.created_at,
+    )
+
+
+class OutboxWriterRepo:
+    def __init__(
+        self, store: MemoryStore, journal: Journal, render_frame: FrameRenderer | None = None,
+    ) -> None:
+        self._store = store
+        self._journal = journal
+        self._render_frame = render_frame
+        self.added: list[OutboxRecord] = []
+
+    async def add(self, event_type: str, payload: dict[str, Any]) -> int:
+        frame = self._render_frame(event_type, payload) if self._render_frame else None
+        row = self._store.insert_outbox(event_type, payload, frame, self._journal)
+        self.added.append(_outbox_record(row))
+        return row.id
+
+    async def add_many(self, event_type: str, payloads: Sequence[dict[str, Any]]) -> None:
+        for payload in payloads:
+            await self.add(event_type, payload)
+
+    def take_added(self) -> list[OutboxRecord]:
+        added, self.added = self.added, []
+        return added
+
+    async def fetch_pending(self, batch_size: int, *, min_age: float = 0.0) -> list[OutboxRecord]:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=min_age)
+        rows = []
+        for row_id in self._store.outbox_pending:
+            row = self._store.outbox[row_id]
+            if row.created_at > cutoff:
+                # Ids grow with creation time: every later row is younger still.
+                break
+            if row.next_retry_at is None or aware(row.next_retry_at) <= now:
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    break
+        for row in rows:
+            self._store.set_outbox_status(row, "processing", self._journal)
+        return [_outbox_record(row) for row in rows]
+
+    async def count_pending(self) -> int:
+        return len(self._store.outbox_pending)
+
+    async def mark_sent(self, ids: list[int]) -> None:
+        for row_id in ids:
+            row = self._store.outbox.get(row_id)
+            if row is not None:
+                self._store.set_outbox_status(row, "sent", self._journal)
+
+    async def mark_failed(self, record_id: int, next_retry_at: datetime) -> None:
+        row = self._store.outbox.get(record_id)
+        if row is not None:
+            self._store.set_outbox_status(
+                row,
+                "failed",
+                self._journal,
+                attempts=row.attempts + 1,
+                next_retry_at=next_retry_at,
+            )
+
+
+class BlockedUserReaderRepo:
+    def __init__(self, store: MemoryStore) -> None:
+        self._store = store
+
+    async def list_blocked_ids(self) -> list[int]:
+        return list(self._store.blocked)
+
+
+class BlockedUserWriterRepo:
+    def __init__(self, store: MemoryStore, journal: Journal) -> None:
+        self._store = store
+        self._journal = journal
+
+    async def block(self, user_id: int, reason: str | None = None) -> bool:
+        return self._store.set_blocked(user_id, True, reason, self._journal)
+
+    async def unblock(self, user_id: int) -> bool:
+        return self._store.set_blocked(user_id, False, None, self._journal)
@@ -0,0 +1,304 @@
+"""Process-local tables and indexes for the in-memory backend."""
+from __future__ import annotations
+
+import bisect
+import itertools
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from uuid import UUID
+
+from chat_service.domain.entities.conversation import Conversation
+from chat_service.domain.entities.message import Message
+from chat_service.domain.entities.participant import Participant
+from chat_service.domain.entities.read_state import ReadState
+from chat_service.domain.value_objects.enums import ConversationStatus
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+Undo = Callable[[], None]
+Journal = list[Undo]
+# (conversation_id, sender_kind, sender_id, client_msg_id), the uq_message_idempotency key
+IdempotencyKey = tuple[UUID, str, int, UUID]
+MemberKey = tuple[str, int]
+# Conversations by activity: (no activity yet, -last_message_at in µs, id as int), ascending
+# = last_message_at DESC NULLS LAST, id ASC like the SQL listings.
+ActivityKey = tuple[bool, int, int]
+
+
+class IntegrityError(RuntimeError):
+    """A write the database would reject with a constraint violation."""
+
+
+def aware(ts: datetime) -> datetime:
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+def micros(ts: datetime) -> int:
+    return (aware(ts) - _EPOCH) // _MICROSECOND
+
+
+def activity_key(conversation: Conversation) -> ActivityKey:
+    lma = conversation.last_message_at
+    return (lma is None, -micros(lma) if lma is not None else 0, conversation.id.int)
+
+
+def open_slot(
+    topic_type: str, topic_id: int | None, owner_user_id: int | None,
+) -> tuple[Any, ...] | None:
+    """Key of the partial unique index an open conversation occupies, if any."""
+    if topic_id is not None:
+        return ("topic", topic_type, topic_id)
+    if topic_type == "support" and owner_user_id is not None:
+        return ("support", owner_user_id)
+    return None
+
+
+class OutboxRow:
+    __slots__ = (
+        "id", "event_type", "payload", "frame", "status", "attempts", "next_retry_at", "created_at",
+    )
+
+    def __init__(
+        self, id: int, event_type: str, payload: dict[str, Any], frame: bytes | None,
+    ) -> None:
+        self.id = id
+        self.event_type = event_type
+        self.payload = payload
+        self.frame = frame
+        self.status = "pending"
+        self.attempts = 0
+        self.next_retry_at: datetime | None = None
+        self.created_at = datetime.now(timezone.utc)
+
+
+class MemoryStore:
+    """Every table of the schema as dicts plus the indexes the queries need.
+
+    Mutators take the caller's undo ``journal`` and append what reverts
+    them, so a unit of work can roll back. They never await, which makes
+    each one atomic on the event loop.
+    """
+
+    def __init__(self) -> None:
+        self.conversations: dict[UUID, Conversation] = {}
+        self.owners: dict[UUID, int] = {}
+        self.open_slots: dict[tuple[Any, ...], UUID] = {}
+        self.topics: dict[tuple[str, int], list[UUID]] = {}
+        self.activity: list[ActivityKey] = []
+        self.participants: dict[UUID, dict[MemberKey, Participant]] = {}
+        self.member_of: dict[MemberKey, set[UUID]] = {}
+        self.messages: dict[UUID, Message] = {}
+        # Per conversation, sorted (created_at, id): the messages timeline index.
+        self.timelines: dict[UUID, list[tuple[datetime, UUID]]] = {}
+        self.idempotency: dict[IdempotencyKey, UUID] = {}
+        self.read_state: dict[tuple[UUID, str, int], ReadState] = {}
+        self.outbox: dict[int, OutboxRow] = {}
+        self.outbox_pending: list[int] = []
+        self.outbox_ids = itertools.count(1)
+        self.blocked: dict[int, str | None] = {}
+
+    # conversations
+
+    def insert_conversation(
+        self, conversation: Conversation, owner_user_id: int | None, journal: Journal,
+    ) -> None:
+        if conversation.id in self.conversations:
+            raise IntegrityError(f"conversation {conversation.id} already exists")
+        slot = None
+        if conversation.status == ConversationStatus.OPEN:
+            slot = open_slot(conversation.topic_type, conversation.topic_id, owner_user_id)
+            if slot is not None and slot in self.open_slots:
+                raise IntegrityError(f"open conversation already exists for {slot}")
+        cid = conversation.id
+        self.conversations[cid] = conversation
+        bisect.insort(self.activity, activity_key(conversation))
+        if owner_user_id is not None:
+            self.owners[cid] = owner_user_id
+        if slot is not None:
+            self.open_slots[slot] = cid
+        if conversation.topic_id is not None:
+            self.topics.setdefault((conversation.topic_type, conversation.topic_id), []).append(cid)
+
+        def undo() -> None:
+            del self.conversations[cid]
+            self._remove_activity(activity_key(conversation))
+            self.owners.pop(cid, None)
+            if slot is not None:
+                self.open_slots.pop(slot, None)
+            if conversation.topic_id is not None:
+                self.topics[(conversation.topic_type, conversation.topic_id)].remove(cid)
+
+        journal.append(undo)
+
+    def update_conversation(self, new: Conversation, journal: Journal) -> None:
+        old = self.conversations[new.id]
+        self._swap_conversation(old, new)
+        journal.append(lambda: self._swap_conversation(new, old))
+
+    def _swap_conversation(self, old: Conversation, new: Conversation) -> None:
+        self.conversations[new.id] = new
+        if old.last_message_at != new.last_message_at:
+            self._remove_activity(activity_key(old))
+            bisect.insort(self.activity, activity_key(new))
+        if old.status != new.status:
+            owner = self.owners.get(new.id)
+            old_slot = open_slot(old.topic_type, old.topic_id, owner)
+            if old.status == ConversationStatus.OPEN and self.open_slots.get(old_slot) == new.id:
+                del self.open_slots[old_slot]
+            if new.status == ConversationStatus.OPEN:
+                new_slot = open_slot(new.topic_type, new.topic_id, owner)
+                if new_slot is not None:
+                    self.open_slots[new_slot] = new.id
+
+    def _remove_activity(self, key: ActivityKey) -> None:
+        i = bisect.bisect_left(self.activity, key)
+        del self.activity[i]
+
+    def touch(self, conversation_id: UUID, ts: datetime, journal: Journal) -> None:
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            return
+        lma = conversation.last_message_at
+        if lma is None or aware(lma) < aware(ts):
+            self.update_conversation(replace(conversation, last_message_at=ts), journal)
+
+    # participants
+
+    def insert_participant(self, participant: Participant, journal: Journal) -> None:
+        if participant.conversation_id not in self.conversations:
+            raise IntegrityError(f"conversation {participant.conversation_id} does not exist")
+        member = (str(participant.kind), participant.subject_id)
+        members = self.participants.setdefault(participant.conversation_id, {})
+        if member in members:
+            raise IntegrityError(f"{member} already participates in {participant.conversation_id}")
+        members[member] = participant
+        self.member_of.setdefault(member, set()).add(participant.conversation_id)
+
+        def undo() -> None:
+            del members[member]
+            self.member_of[member].discard(participant.conversation_id)
+
+        journal.append(undo)
+
+    def is_member(self, conversation_id: UUID, kind: str, subject_id: int) -> bool:
+        return (str(kind), subject_id) in self.participants.get(conversation_id, ())
+
+    # messages
+
+    def insert_message(self, message: Message, journal: Journal) -> bool:
+        """Insert unless the idempotency key exists; returns whether it was inserted."""
+        if message.conversation_id not in self.conversations:
+            raise IntegrityError(f"conversation {message.conversation_id} does not exist")
+        key = idempotency_key(message)
+        if key in self.idempotency:
+            return False
+        if message.id in self.messages:
+            raise IntegrityError(f"message {message.id} already exists")
+        self.messages[message.id] = message
+        self.idempotency[key] = message.id
+        timeline = self.timelines.setdefault(message.conversation_id, [])
+        entry = (aware(message.created_at), message.id)
+        bisect.insort(timeline, entry)
+
+        def undo() -> None:
+            del self.messages[message.id]
+            del self.idempotency[key]
+            del timeline[bisect.bisect_left(timeline, entry)]
+
+        journal.append(undo)
+        return True
+
+    # read state
+
+    def put_read_state(self, state: ReadState, journal: Journal) -> None:
+        key = (state.conversation_id, state.kind, state.subject_id)
+        previous = self.read_state.get(key)
+        self.read_state[key] = state
+
+        def undo() -> None:
+            if previous is None:
+                del self.read_state[key]
+            else:
+                self.read_state[key] = previous
+
+        journal.append(undo)
+
+    # outbox
+
+    def insert_outbox(
+        self, event_type: str, payload: dict[str, Any], frame: bytes | None, journal: Journal,
+    ) -> OutboxRow:
+        row = OutboxRow(next(self.outbox_ids), event_type, payload, frame)
+        self.outbox[row.id] = row
+        bisect.insort(self.outbox_pending, row.id)
+
+        def undo() -> None:
+            del self.outbox[row.id]
+            self._unqueue(row.id)
+
+        journal.append(undo)
+        return row
+
+    def set_outbox_status(
+        self,
+        row: OutboxRow,
+        status: str,
+        journal: Journal,
+        *,
+        attempts: int | None = None,
+        next_retry_at: datetime | None = None,
+    ) -> None:
+        saved = (row.status, row.attempts, row.next_retry_at)
+        if attempts is None:
+            attempts = row.attempts
+        self._apply_outbox_status(row, status, attempts, next_retry_at)
+
+        def undo() -> None:
+            self._apply_outbox_status(row, *saved)
+
+        journal.append(undo)
+
+    def _apply_outbox_status(
+        self, row: OutboxRow, status: str, attempts: int, next_retry_at: datetime | None,
+    ) -> None:
+        was_queued = row.status in ("pending", "failed")
+        row.status, row.attempts, row.next_retry_at = status, attempts, next_retry_at
+        queued = status in ("pending", "failed")
+        if was_queued and not queued:
+            self._unqueue(row.id)
+        elif queued and not was_queued:
+            bisect.insort(self.outbox_pending, row.id)
+        # Published rows are dropped: nothing reads them, and keeping them
+        # would grow the store without bound.
+        if status == "sent":
+            self.outbox.pop(row.id, None)
+        else:
+            self.outbox[row.id] = row
+
+    def _unqueue(self, row_id: int) -> None:
+        i = bisect.bisect_left(self.outbox_pending, row_id)
+        if i < len(self.outbox_pending) and self.outbox_pending[i] == row_id:
+            del self.outbox_pending[i]
+
+    # blocked users
+
+    def set_blocked(
+        self, user_id: int, blocked: bool, reason: str | None, journal: Journal,
+    ) -> bool:
+        if blocked == (user_id in self.blocked):
+            return False
+        if blocked:
+            self.blocked[user_id] = reason
+            journal.append(lambda: self.blocked.pop(user_id, None))
+        else:
+            previous = self.blocked.pop(user_id)
+            journal.append(lambda: self.blocked.__setitem__(user_id, previous))
+        return True
+
+
+def idempotency_key(message: Message) -> IdempotencyKey:
+    return (
+        message.conversation_id, str(message.sender_kind), message.sender_id, message.client_msg_id,
+    )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from functools import cached_property
+from types import TracebackType
+from typing import Self
+
+from chat_service.application.uow import PostCommitHook
+from chat_service.infrastructure.memory.repositories import (
+    BlockedUserReaderRepo,
+    BlockedUserWriterRepo,
+    ConversationReaderRepo,
+    ConversationWriterRepo,
+    MessageReaderRepo,
+    MessageWriterRepo,
+    OutboxWriterRepo,
+    ParticipantReaderRepo,
+    ParticipantWriterRepo,
+    ReadStateWriterRepo,
+)
+from chat_service.infrastructure.memory.store import Journal, MemoryStore
+from chat_service.infrastructure.ws.protocol import render_event_frame
+
+
+class MemoryUoW:
+    """Unit-of-Work over a process-local MemoryStore.
+
+    Writes apply to the store immediately and are journaled; ``rollback``
+    (or leaving the context without ``commit``) undoes them in reverse.
+    Other units of work see uncommitted writes, and there are no row locks:
+    good enough for one process, benchmarks and tests, not a database.
+    ``post_commit`` behaves as in SqlAlchemyUoW.
+    """
+
+    def __init__(
+        self,
+        store: MemoryStore,
+        *,
+        outbox_frames: bool = False,
+        post_commit: PostCommitHook | None = None,
+    ) -> None:
+        self._store = store
+        self._journal: Journal = []
+        self._outbox_frames = outbox_frames
+        self._post_commit = post_commit
+
+    @cached_property
+    def conversations(self) -> ConversationReaderRepo:
+        return ConversationReaderRepo(self._store)
+
+    @cached_property
+    def conversations_w(self) -> ConversationWriterRepo:
+        return ConversationWriterRepo(self._store, self._journal)
+
+    @cached_property
+    def participants(self) -> ParticipantReaderRepo:
+        return ParticipantReaderRepo(self._store)
+
+    @cached_property
+    def participants_w(self) -> ParticipantWriterRepo:
+        return ParticipantWriterRepo(self._store, self._journal)
+
+    @cached_property
+    def messages(self) -> MessageReaderRepo:
+        return MessageReaderRepo(self._store)
+
+    @cached_property
+    def messages_w(self) -> MessageWriterRepo:
+        return MessageWriterRepo(self._store, self._journal)
+
+    @cached_property
+    def read_state_w(self) -> ReadStateWriterRepo:
+        return ReadStateWriterRepo(self._store, self._journal)
+
+    @cached_property
+    def outbox(self) -> OutboxWriterRepo:
+        return OutboxWriterRepo(
+            self._store,
+            self._journal,
+            render_frame=render_event_frame if self._outbox_frames else None,
+        )
+
+    @cached_property
+    def blocked_users(self) -> BlockedUserReaderRepo:
+        return BlockedUserReaderRepo(self._store)
+
+    @cached_property
+    def blocked_users_w(self) -> BlockedUserWriterRepo:
+        return BlockedUserWriterRepo(self._store, self._journal)
+
+    async def flush(self) -> None:
+        pass
+
+    async def commit(self) -> None:
+        self._journal.clear()
+        if "outbox" in self.__dict__:
+            added = self.outbox.take_added()
+            if added and self._post_commit is not None:
+                await self._post_commit(added)
+
+    async def rollback(self) -> None:
+        while self._journal:
+            self._journal.pop()()
+        if "outbox" in self.__dict__:
+            self.outbox.take_added()
+
+    async def close(self) -> None:
+        """Discard uncommitted writes, like closing a session. Safe to call repeatedly."""
+        await self.rollback()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.close()
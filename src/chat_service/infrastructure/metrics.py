@@ -0,0 +1,325 @@
+"""Prometheus metrics.
+
+Hot-path instruments are module-level histograms and counters whose label
+children are bound once at import, so an observation is a bucket search and
+a locked add — no label lookup, no allocation. Everything the components
+already count in their own stats objects (stream consumer, Pub/Sub
+subscriber, caches, WS registry) is read at scrape time by
+``StatsCollector`` instead of being double-counted on the hot path.
+"""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+from prometheus_client import (
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+from chat_service.infrastructure.bus.trace import STAGES as DELIVERY_STAGES
+
+if TYPE_CHECKING:
+    from chat_service.infrastructure.auth.caching_verifier import TokenCacheStats
+    from chat_service.infrastructure.bus.dedup import RecentIds
+    from chat_service.infrastructure.bus.post_commit import PostCommitPublisher
+    from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubSubscriber
+    from chat_service.infrastructure.bus.redis_streams import RedisStreamConsumer
+    from chat_service.infrastructure.bus.trace import DeliveryTrace
+    from chat_service.infrastructure.cache.rate_limiter import RateLimiterStats
+    from chat_service.infrastructure.cache.topic_directory import TopicDirectory
+    from chat_service.infrastructure.readiness import ReadinessProber
+    from chat_service.infrastructure.ws.manager import ConnectionManager
+
+logger = logging.getLogger(__name__)
+
+# Sub-millisecond to a few seconds: DB round trips and in-process fan-out.
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+# Seconds to minutes: queueing between processes.
+_LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Delivery stages range from in-process hand-offs to outbox polling.
+_DELIVERY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+SEND_MESSAGE_PHASES = (
+    "idempotency", "rate_limit", "access", "insert", "touch", "outbox", "commit", "total",
+)
+
+send_message_seconds = Histogram(
+    "chat_send_message_seconds",
+    "send_message duration by phase (total = end to end)",
+    ["phase"],
+    buckets=_LATENCY_BUCKETS,
+)
+broadcast_seconds = Histogram(
+    "chat_ws_broadcast_seconds",
+    "Time to write one event to every subscribed socket of a conversation",
+    buckets=_LATENCY_BUCKETS,
+)
+broadcast_recipients = Histogram(
+    "chat_ws_broadcast_recipients",
+    "Sockets written per conversation broadcast",
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250, 1000),
+)
+outbox_publish_lag_seconds = Histogram(
+    "chat_outbox_publish_lag_seconds",
+    "Time from outbox insert to Redis publish",
+    buckets=_LAG_BUCKETS,
+)
+outbox_published_total = Counter("chat_outbox_published", "Outbox records published")
+outbox_failed_total = Counter("chat_outbox_publish_failures", "Outbox publish attempts that failed")
+delivery_stage_seconds = Histogram(
+    "chat_delivery_stage_seconds",
+    "Time from the previous delivery stage to this one (total = created to written)",
+    ["stage"],
+    buckets=_DELIVERY_BUCKETS,
+)
+_delivery_children = {
+    stage: delivery_stage_seconds.labels(stage) for stage in (*DELIVERY_STAGES[1:], "total")
+}
+db_pool_checkout_seconds = Histogram(
+    "chat_db_pool_checkout_seconds",
+    "Wait for a pooled DB connection (including connect when the pool grows)",
+    buckets=_LATENCY_BUCKETS,
+)
+http_request_seconds = Histogram(
+    "chat_http_request_seconds",
+    "HTTP request duration",
+    ["method", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+class HistogramPhaseTimer:
+    """Implements application.ports.metrics.PhaseTimer on a ``phase``-labelled histogram."""
+
+    def __init__(self, histogram: Histogram, phases: Iterable[str]) -> None:
+        self._histogram = histogram
+        self._children = {phase: histogram.labels(phase) for phase in phases}
+
+    def observe(self, phase: str, seconds: float) -> None:
+        child = self._children.get(phase)
+        if child is None:
+            child = self._children[phase] = self._histogram.labels(phase)
+        child.observe(seconds)
+
+
+send_message_phases = HistogramPhaseTimer(send_message_seconds, SEND_MESSAGE_PHASES)
+
+
+def observe_delivery(trace: DeliveryTrace, stages: frozenset[str], *, total: bool = False) -> None:
+    """Observe the intervals ending in ``stages`` — each process reports the
+    stages it performed, so an event fanned out to N nodes counts its
+    upstream stages once."""
+    for stage, seconds in trace.lags():
+        if stage in stages:
+            _delivery_children[stage].observe(seconds)
+    if total:
+        seconds = trace.total()
+        if seconds is not None:
+            _delivery_children["total"].observe(seconds)
+
+
+class StatsCollector(Collector):
+    """Bridges the components' own stats objects into Prometheus at scrape time.
+
+    Components are registered with the ``track_*`` functions under a name;
+    registering a name again replaces the previous source (tests and
+    reloads create new instances).
+    """
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], Iterator[Metric]]] = {}
+
+    def track(self, name: str, source: Callable[[], Iterator[Metric]]) -> None:
+        self._sources[name] = source
+
+    def untrack(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def collect(self) -> Iterator[Metric]:
+        for name, source in list(self._sources.items()):
+            try:
+                yield from source()
+            except Exception:
+                logger.warning("Metrics source %s failed", name, exc_info=True)
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def _gauge(name: str, doc: str, value: float | None, labels: dict[str, str] | None = None) -> Metric:
+    family = GaugeMetricFamily(name, doc, labels=list(labels or ()))
+    if value is not None:
+        family.add_metric(list((labels or {}).values()), value)
+    return family
+
+
+def _counter(name: str, doc: str, value: float, labels: dict[str, str] | None = None) -> Metric:
+    family = CounterMetricFamily(name, doc, labels=list(labels or ()))
+    family.add_metric(list((labels or {}).values()), value)
+    return family
+
+
+def track_stream_consumer(consumer: RedisStreamConsumer, stream: str) -> None:
+    def collect() -> Iterator[Metric]:
+        s, labels = consumer.stats, {"stream": stream}
+        yield _counter("chat_stream_processed", "Stream entries processed", s.processed, labels)
+        yield _counter("chat_stream_failed", "Stream entries that failed", s.failed, labels)
+        yield _counter("chat_stream_reclaimed", "Stream entries reclaimed", s.reclaimed, labels)
+        yield _counter("chat_stream_dead_lettered", "Stream entries dead-lettered", s.dead_lettered, labels)
+        yield _gauge("chat_stream_in_flight", "Entries read but not acknowledged", s.in_flight, labels)
+        yield _gauge("chat_stream_group_lag", "Consumer group lag (XINFO GROUPS)", s.group_lag, labels)
+        yield _gauge("chat_stream_group_pending", "Consumer group pending entries", s.group_pending, labels)
+        yield _gauge(
+            "chat_stream_entry_age_seconds", "Age of the last processed entry",
+            s.last_entry_age_seconds, labels,
+        )
+
+    stats_collector.track(f"stream:{stream}", collect)
+
+
+def track_pubsub_subscriber(subscriber: RedisPubSubSubscriber, channel: str) -> None:
+    def collect() -> Iterator[Metric]:
+        s, labels = subscriber.stats, {"channel": channel}
+        yield _counter("chat_pubsub_received", "Pub/Sub messages received", s.received, labels)
+        yield _counter("chat_pubsub_dispatched", "Pub/Sub events dispatched", s.dispatched, labels)
+        yield _counter("chat_pubsub_failed", "Pub/Sub events that failed", s.failed, labels)
+        yield _counter("chat_pubsub_dropped", "Pub/Sub events dropped on full queues", s.dropped, labels)
+        yield _counter("chat_pubsub_resubscribes", "Pub/Sub resubscriptions", s.resubscribes, labels)
+        yield _gauge("chat_pubsub_queue_depth", "Events waiting for dispatch", sum(subscriber.queue_depths), labels)
+        yield _gauge(
+            "chat_pubsub_queue_lag_seconds", "Queue wait of the last dispatched event",
+            s.last_queue_lag_seconds, labels,
+        )
+
+    stats_collector.track(f"pubsub:{channel}", collect)
+
+
+def track_pubsub_dedup(seen: RecentIds, channel: str) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _counter(
+            "chat_pubsub_duplicates", "Pub/Sub events dropped as already delivered",
+            seen.duplicates, {"channel": channel},
+        )
+
+    stats_collector.track(f"pubsub_dedup:{channel}", collect)
+
+
+def track_post_commit(publisher: PostCommitPublisher) -> None:
+    def collect() -> Iterator[Metric]:
+        s = publisher.stats
+        yield _counter(
+            "chat_outbox_immediate_published", "Outbox records published on commit", s.published,
+        )
+        yield _counter(
+            "chat_outbox_immediate_failed", "Post-commit publishes left to the worker", s.failed,
+        )
+        yield _counter(
+            "chat_outbox_immediate_acked", "Post-commit publishes marked sent", s.acked,
+        )
+        yield _counter(
+            "chat_outbox_immediate_ack_failures", "Failed post-commit ack flushes", s.ack_failures,
+        )
+        yield _gauge(
+            "chat_outbox_immediate_pending_acks", "Published records awaiting their ack",
+            publisher.pending_acks,
+        )
+
+    stats_collector.track("outbox_post_commit", collect)
+
+
+def track_ws_manager(manager: ConnectionManager) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _gauge("chat_ws_connections", "Open WebSocket connections", manager.connection_count)
+        yield _gauge("chat_ws_principals", "Principals with at least one connection", manager.principal_count)
+        yield _gauge("chat_ws_subscriptions", "Conversation subscriptions", manager.subscription_count)
+
+    stats_collector.track("ws", collect)
+
+
+def track_token_cache(stats: TokenCacheStats) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _counter("chat_token_cache_hits", "Verified-token cache hits", stats.hits)
+        yield _counter("chat_token_cache_misses", "Verified-token cache misses", stats.misses)
+        yield _counter("chat_token_cache_evictions", "Verified-token cache evictions", stats.evictions)
+
+    stats_collector.track("token_cache", collect)
+
+
+def track_rate_limiter(stats: RateLimiterStats) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _counter("chat_rate_limit_allowed", "Message sends admitted", stats.allowed)
+        rejected = CounterMetricFamily(
+            "chat_rate_limit_rejected", "Message sends rejected, by tier", labels=["tier"],
+        )
+        rejected.add_metric(["local"], stats.local_rejections)
+        rejected.add_metric(["cluster"], stats.cluster_rejections)
+        yield rejected
+        yield _counter(
+            "chat_rate_limit_window_calls", "Redis sliding-window lease requests",
+            stats.window_calls,
+        )
+        yield _counter(
+            "chat_rate_limit_window_errors", "Failed sliding-window lease requests",
+            stats.window_errors,
+        )
+
+    stats_collector.track("rate_limiter", collect)
+
+
+def track_topic_directory(directory: TopicDirectory) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _counter("chat_topic_directory_hits", "Topic directory hits", directory.hits)
+        yield _counter("chat_topic_directory_misses", "Topic directory misses", directory.misses)
+        yield _gauge("chat_topic_directory_entries", "Topic directory size", len(directory))
+
+    stats_collector.track("topic_directory", collect)
+
+
+def track_readiness(prober: ReadinessProber) -> None:
+    def collect() -> Iterator[Metric]:
+        yield _gauge("chat_ready", "1 while the last readiness round passed", float(prober.ready))
+        up = GaugeMetricFamily(
+            "chat_dependency_up",
+            "Dependency passed its last readiness probe",
+            labels=["dependency"],
+        )
+        latency = GaugeMetricFamily(
+            "chat_dependency_probe_seconds",
+            "Duration of the last readiness probe (event_loop: loop lag)",
+            labels=["dependency"],
+        )
+        for name, result in prober.results.items():
+            up.add_metric([name], float(result.ok))
+            latency.add_metric([name], result.latency_seconds)
+        yield up
+        yield latency
+
+    stats_collector.track("readiness", collect)
+
+
+def track_gauge(name: str, doc: str, read: Callable[[], float | None]) -> None:
+    """Expose a single value read at scrape time (e.g. a worker's backlog)."""
+    stats_collector.track(name, lambda: iter((_gauge(name, doc, read()),)))
+
+
+def render_latest() -> bytes:
+    return generate_latest(REGISTRY)
+
+
+def serve(port: int) -> None:
+    """Expose /metrics on ``port`` from a background thread (worker processes)."""
+    if port > 0:
+        start_http_server(port)
+        logger.info("Prometheus metrics on :%d/metrics", port)
@@ -0,0 +1,183 @@
+"""Background readiness probing.
+
+``/readyz`` used to open a DB session and ping Redis on every request, so
+frequent probes from many pods churned the pool and timed out exactly when
+it was saturated. ReadinessProber checks on its own schedule and the
+endpoint only reads the last result.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Mapping
+
+from sqlalchemy import text
+
+from chat_service.tasks import cancel_task
+
+if TYPE_CHECKING:
+    import redis.asyncio as aioredis
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubSubscriber
+
+logger = logging.getLogger(__name__)
+
+# Raises (or times out) when the dependency is not usable.
+Probe = Callable[[], Awaitable[None]]
+
+EVENT_LOOP = "event_loop"
+
+
+def postgres_probe(engine: AsyncEngine) -> Probe:
+    async def probe() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    return probe
+
+
+def redis_probe(redis: aioredis.Redis) -> Probe:
+    async def probe() -> None:
+        await redis.ping()
+
+    return probe
+
+
+def pubsub_probe(subscriber: RedisPubSubSubscriber) -> Probe:
+    """The subscriber's tasks are alive and it currently holds a subscription."""
+
+    async def probe() -> None:
+        if not subscriber.running:
+            raise RuntimeError("subscriber tasks exited")
+        if not subscriber.subscribed:
+            raise RuntimeError("not subscribed, reconnecting")
+
+    return probe
+
+
+@dataclass(frozen=True, slots=True)
+class ProbeResult:
+    ok: bool
+    latency_seconds: float
+    error: str | None = None
+
+
+class ReadinessProber:
+    """Runs ``probes`` concurrently every ``interval`` seconds and caches the outcome.
+
+    Each probe is bounded by ``timeout``; while unready the next round
+    comes after ``retry_interval`` instead. Event-loop lag is how late the
+    prober's own sleep returns; above ``max_loop_lag`` the node reports
+    unready, since every request on it would be that late too. A result
+    older than ``stale_after`` (the prober itself stuck) counts as unready.
+    """
+
+    def __init__(
+        self,
+        probes: Mapping[str, Probe],
+        *,
+        interval: float = 5.0,
+        retry_interval: float = 1.0,
+        timeout: float = 2.0,
+        max_loop_lag: float = 0.5,
+        stale_after: float | None = None,
+    ) -> None:
+        self._probes = dict(probes)
+        self._interval = interval
+        self._retry_interval = min(retry_interval, interval)
+        self._timeout = timeout
+        self._max_loop_lag = max_loop_lag
+        self._stale_after = stale_after if stale_after is not None else 3 * interval + timeout
+        self._task: asyncio.Task[None] | None = None
+        self.results: dict[str, ProbeResult] = {}
+        self.loop_lag = 0.0
+        self.checked_at: float | None = None  # monotonic
+
+    async def start(self) -> None:
+        """Probe once, so the first /readyz already has an answer, then keep probing."""
+        await self.probe()
+        self._task = asyncio.create_task(self._run(), name="readiness-prober")
+        logger.info("Readiness prober started (interval=%.1fs)", self._interval)
+
+    async def stop(self) -> None:
+        if self._task:
+            await cancel_task(self._task)
+            logger.info("Readiness prober stopped")
+
+    async def _run(self) -> None:
+        while True:
+            delay = self._interval if self.ready else self._retry_interval
+            slept_from = time.monotonic()
+            await asyncio.sleep(delay)
+            self.loop_lag = max(0.0, time.monotonic() - slept_from - delay)
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Readiness probe round failed")
+
+    async def probe(self) -> None:
+        names = list(self._probes)
+        outcomes = await asyncio.gather(*(self._run_probe(self._probes[n]) for n in names))
+        results = dict(zip(names, outcomes))
+        results[EVENT_LOOP] = ProbeResult(
+            ok=self.loop_lag <= self._max_loop_lag,
+            latency_seconds=self.loop_lag,
+            error=None if self.loop_lag <= self._max_loop_lag else "event loop lagging",
+        )
+        for name, result in results.items():
+            previous = self.results.get(name)
+            if previous is not None and previous.ok != result.ok:
+                if result.ok:
+                    logger.info("Readiness: %s recovered", name)
+                else:
+                    logger.warning("Readiness: %s failing: %s", name, result.error)
+        self.results = results
+        self.checked_at = time.monotonic()
+
+    async def _run_probe(self, probe: Probe) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), self._timeout)
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            return ProbeResult(False, time.perf_counter() - started, "timed out")
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc) or type(exc).__name__
+            return ProbeResult(False, time.perf_counter() - started, error)
+        return ProbeResult(True, time.perf_counter() - started)
+
+    @property
+    def age(self) -> float | None:
+        return None if self.checked_at is None else time.monotonic() - self.checked_at
+
+    @property
+    def ready(self) -> bool:
+        age = self.age
+        return (
+            age is not None
+            and age <= self._stale_after
+            and all(r.ok for r in self.results.values())
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """The cached status as the /readyz body."""
+        age = self.age
+        body: dict[str, Any] = {
+            "status": "ready" if self.ready else "unavailable",
+            "checked_seconds_ago": None if age is None else round(age, 3),
+            "checks": {
+                name: {
+                    "ok": r.ok,
+                    "latency_ms": round(r.latency_seconds * 1000, 3),
+                    **({"error": r.error} if r.error else {}),
+                }
+                for name, r in self.results.items()
+            },
+        }
+        if age is not None and age > self._stale_after:
+            body["error"] = "readiness status is stale"
+        return body
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Any
 from uuid import UUID
 
 from fastapi import WebSocket
 
-from chat_service.infrastructure.ws.protocol import WsOutbound
+from chat_service.infrastructure.metrics import broadcast_recipients, broadcast_seconds
+from chat_service.infrastructure.ws.protocol import render_outbound
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,18 @@ class ConnectionManager:
         self._connections: dict[str, set[WebSocket]] = {}
         self._subscriptions: dict[UUID, set[str]] = {}
 
+    @property
+    def connection_count(self) -> int:
+        return sum(len(conns) for conns in self._connections.values())
+
+    @property
+    def principal_count(self) -> int:
+        return len(self._connections)
+
+    @property
+    def subscription_count(self) -> int:
+        return sum(len(subs) for subs in self._subscriptions.values())
+
     async def connect(self, ws: WebSocket, principal_key: str) -> None:
         await ws.accept()
         self._connections.setdefault(principal_key, set()).add(ws)
@@ -47,20 +61,31 @@ class ConnectionManager:
         conversation_id: UUID,
         event_type: str,
         data: dict[str, Any],
-    ) -> None:
+    ) -> int:
         """Send a WS message to all principals subscribed to a conversation."""
+        return await self.broadcast_raw(conversation_id, render_outbound(event_type, data))
+
+    async def broadcast_raw(self, conversation_id: UUID, raw: str) -> int:
+        """Send an already rendered frame to all principals subscribed to a conversation.
+
+        Returns the number of sockets written.
+        """
         subs = self._subscriptions.get(conversation_id, set())
-        payload = WsOutbound(type=event_type, data=data)
-        raw = payload.model_dump_json()
+        start = time.perf_counter()
+        sent = 0
         dead: list[tuple[str, WebSocket]] = []
         for pkey in subs:
             for ws in self._connections.get(pkey, set()):
                 try:
                     await ws.send_text(raw)
+                    sent += 1
                 except Exception:
                     dead.append((pkey, ws))
+        broadcast_seconds.observe(time.perf_counter() - start)
+        broadcast_recipients.observe(sent)
         for pkey, ws in dead:
             self.disconnect(ws, pkey)
+        return sent
 
     async def send_to_principal(
         self,
@@ -69,8 +94,7 @@ class ConnectionManager:
         data: dict[str, Any],
     ) -> None:
         """Send a WS message to a specific principal."""
-        payload = WsOutbound(type=event_type, data=data)
-        raw = payload.model_dump_json()
+        raw = render_outbound(event_type, data)
         dead: list[WebSocket] = []
         for ws in self._connections.get(principal_key, set()):
             try:
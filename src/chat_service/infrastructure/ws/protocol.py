@@ -16,5 +16,20 @@ class WsInbound(BaseModel):
 class WsOutbound(BaseModel):
     """Server → Client."""
 
-    type: str  # message.created | conversation.updated | error | pong
+    type: str  # chat.message_created | conversation.updated | error | pong
     data: dict[str, Any] = {}
+
+
+def render_outbound(event_type: str, data: dict[str, Any]) -> str:
+    """Serialized Server → Client frame."""
+    return WsOutbound(type=event_type, data=data).model_dump_json()
+
+
+def render_event_frame(event_type: str, payload: dict[str, Any]) -> bytes:
+    """The frame nodes send for a bus event, rendered from its outbox payload.
+
+    Matches what a node produces from a decoded event (the worker adds
+    ``event_type`` to the data), so pre-rendered and decoded events look the
+    same to clients.
+    """
+    return render_outbound(event_type, {"event_type": event_type, **payload}).encode()
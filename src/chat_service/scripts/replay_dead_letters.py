@@ -0,0 +1,74 @@
+"""Move dead-lettered LeafFlow events back to their source stream.
+
+    python -m chat_service.scripts.replay_dead_letters [--count N] [--event-type T] [--dry-run]
+
+Entries are re-added with their original fields (``dlq_*`` metadata stripped)
+and deleted from the DLQ in the same MULTI, oldest first.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+import redis.asyncio as aioredis
+
+from chat_service.config import settings
+from chat_service.infrastructure.bus.redis_streams import DLQ_FIELD_PREFIX
+
+logger = logging.getLogger(__name__)
+
+
+async def replay(count: int, event_type: str | None, dry_run: bool) -> int:
+    r = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    dlq = settings.LEAF_EVENTS_DLQ_STREAM
+    replayed = 0
+    start = "-"
+    try:
+        while replayed < count:
+            page = await r.xrange(dlq, min=start, max="+", count=min(100, count - replayed))
+            if not page:
+                break
+            for msg_id, fields in page:
+                if event_type and fields.get("event_type") != event_type:
+                    continue
+                target = fields.get(f"{DLQ_FIELD_PREFIX}source_stream", settings.LEAF_EVENTS_STREAM)
+                original = {k: v for k, v in fields.items() if not k.startswith(DLQ_FIELD_PREFIX)}
+                logger.info(
+                    "%s %s (%s, source id %s, %s deliveries) -> %s",
+                    "Would replay" if dry_run else "Replaying",
+                    msg_id,
+                    original.get("event_type", "unknown"),
+                    fields.get(f"{DLQ_FIELD_PREFIX}source_id"),
+                    fields.get(f"{DLQ_FIELD_PREFIX}deliveries"),
+                    target,
+                )
+                if not dry_run:
+                    async with r.pipeline(transaction=True) as pipe:
+                        pipe.xadd(target, original)
+                        pipe.xdel(dlq, msg_id)
+                        await pipe.execute()
+                replayed += 1
+                if replayed >= count:
+                    break
+            # Exclusive start: continue after the last id of this page.
+            start = f"({page[-1][0]}"
+    finally:
+        await r.aclose()
+    logger.info("%s %d entries from %s", "Matched" if dry_run else "Replayed", replayed, dlq)
+    return replayed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay dead-lettered LeafFlow events.")
+    parser.add_argument("--count", type=int, default=1000, help="max entries to replay")
+    parser.add_argument("--event-type", help="only replay entries of this event_type")
+    parser.add_argument("--dry-run", action="store_true", help="list entries without moving them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(replay(args.count, args.event_type, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from chat_service.application.uow import UnitOfWork
+
+USER_BLOCK_CHANGED = "chat.user_block_changed"
+
+
+async def set_user_blocked(
+    user_id: int,
+    blocked: bool,
+    uow: UnitOfWork,
+    *,
+    reason: str | None = None,
+) -> bool:
+    """Persist a block or unblock. Returns True if the state changed.
+
+    A change is published through the outbox so every API node can update its
+    in-memory block list.
+    """
+    if blocked:
+        changed = await uow.blocked_users_w.block(user_id, reason)
+    else:
+        changed = await uow.blocked_users_w.unblock(user_id)
+    if changed:
+        await uow.outbox.add(USER_BLOCK_CHANGED, {"user_id": user_id, "blocked": blocked})
+        await uow.commit()
+    return changed
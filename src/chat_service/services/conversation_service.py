@@ -4,53 +4,48 @@ import uuid
 from datetime import datetime, timezone
 
 from chat_service.application.dto.principal import Principal
-from chat_service.application.exceptions import NotFoundError
+from chat_service.application.ports.cache import ConversationDirectory
 from chat_service.application.policies.permissions import assert_conversation_access
 from chat_service.application.uow import UnitOfWork
 from chat_service.domain.entities.conversation import Conversation
-from chat_service.domain.entities.participant import Participant
-from chat_service.domain.value_objects.enums import ConversationStatus, ParticipantKind
+from chat_service.domain.value_objects.enums import ConversationStatus
 
+CONVERSATION_CREATED = "chat.conversation_created"
 
-async def get_or_create_support_conversation(
-    user_id: int,
-    uow: UnitOfWork,
-) -> Conversation:
-    """Return an existing open support conversation for the user, or create a new one."""
-    existing = await uow.conversations.get_support_for_user(user_id)
-    if existing is not None:
-        return existing
 
+def _new_open_conversation(topic_type: str, topic_id: int | None) -> Conversation:
     now = datetime.now(timezone.utc)
-    conversation = Conversation(
+    return Conversation(
         id=uuid.uuid4(),
-        topic_type="support",
-        topic_id=None,
+        topic_type=topic_type,
+        topic_id=topic_id,
         status=ConversationStatus.OPEN,
         assignee_admin_id=None,
         last_message_at=None,
         created_at=now,
         updated_at=now,
     )
-    conversation = await uow.conversations_w.create(conversation)
 
-    participant = Participant(
-        conversation_id=conversation.id,
-        kind=ParticipantKind.USER,
-        subject_id=user_id,
-        joined_at=now,
-    )
-    await uow.participants_w.add(participant)
 
-    await uow.outbox.add(
-        "chat.conversation_created",
-        {
-            "conversation_id": str(conversation.id),
-            "user_id": user_id,
-            "topic_type": "support",
-        },
+async def get_or_create_support_conversation(
+    user_id: int,
+    uow: UnitOfWork,
+) -> Conversation:
+    """Return an existing open support conversation for the user, or create a new one."""
+    conversation = _new_open_conversation("support", None)
+    conversation, created = await uow.conversations_w.create_open_or_get(
+        conversation, owner_user_id=user_id,
     )
-    await uow.commit()
+    if created:
+        await uow.outbox.add(
+            CONVERSATION_CREATED,
+            {
+                "conversation_id": str(conversation.id),
+                "user_id": user_id,
+                "topic_type": "support",
+            },
+        )
+        await uow.commit()
     return conversation
 
 
@@ -59,49 +54,32 @@ async def get_or_create_topic_conversation(
     topic_id: int,
     user_id: int,
     uow: UnitOfWork,
+    *,
+    directory: ConversationDirectory | None = None,
 ) -> tuple[Conversation, bool]:
     """Return existing open conversation for topic or create a new one.
 
     Returns (conversation, created) where created=True if a new conversation was made.
+    The result is recorded in ``directory`` when one is given.
     """
-    existing = await uow.conversations.get_by_topic(
-        topic_type, topic_id, status=ConversationStatus.OPEN,
-    )
-    if existing is not None:
-        return existing, False
-
-    now = datetime.now(timezone.utc)
-    conversation = Conversation(
-        id=uuid.uuid4(),
-        topic_type=topic_type,
-        topic_id=topic_id,
-        status=ConversationStatus.OPEN,
-        assignee_admin_id=None,
-        last_message_at=None,
-        created_at=now,
-        updated_at=now,
-    )
-    conversation = await uow.conversations_w.create(conversation)
-
-    participant = Participant(
-        conversation_id=conversation.id,
-        kind=ParticipantKind.USER,
-        subject_id=user_id,
-        joined_at=now,
-    )
-    await uow.participants_w.add(participant)
-
-    await uow.outbox.add(
-        "chat.conversation_created",
-        {
-            "conversation_id": str(conversation.id),
-            "user_id": user_id,
-            "topic_type": topic_type,
-            "topic_id": topic_id,
-        },
+    conversation = _new_open_conversation(topic_type, topic_id)
+    conversation, created = await uow.conversations_w.create_open_or_get(
+        conversation, owner_user_id=user_id,
     )
-    await uow.commit()
-    return conversation, True
+    if created:
+        await uow.outbox.add(
+            CONVERSATION_CREATED,
+            {
+                "conversation_id": str(conversation.id),
+                "user_id": user_id,
+                "topic_type": topic_type,
+                "topic_id": topic_id,
+            },
+        )
+        await uow.commit()
+    if directory is not None:
+        directory.put(topic_type, topic_id, conversation.id)
+    return conversation, created
 
 
 async def list_user_conversations(
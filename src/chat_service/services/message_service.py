@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import time
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence
 
+from chat_service.application.dto.message import SendMessageDTO
 from chat_service.application.dto.principal import Principal
+from chat_service.application.exceptions import ForbiddenError
+from chat_service.application.ports.block_list import BlockList
+from chat_service.application.ports.cache import IdempotencyCache
+from chat_service.application.ports.metrics import NullPhaseTimer, PhaseTimer
+from chat_service.application.ports.rate_limit import RateLimiter
 from chat_service.application.policies.permissions import assert_conversation_access
+from chat_service.application.policies.rate_limit import assert_send_allowed
 from chat_service.application.uow import UnitOfWork
 from chat_service.domain.entities.message import Message
-from chat_service.domain.value_objects.enums import MessageType
+from chat_service.domain.value_objects.enums import MessageType, ParticipantKind
+
+MESSAGE_CREATED = "chat.message_created"
+
+_NO_PHASES = NullPhaseTimer()
 
 
 async def send_message(
@@ -17,14 +30,49 @@ async def send_message(
     msg_type: MessageType,
     body: str | None,
     uow: UnitOfWork,
+    *,
+    idempotency: IdempotencyCache | None = None,
+    block_list: BlockList | None = None,
+    rate_limiter: RateLimiter | None = None,
+    phases: PhaseTimer | None = None,
 ) -> tuple[Message, bool]:
     """Create a message idempotently.
 
     Returns (message, created). If a message with the same client_msg_id
     already exists the existing one is returned with created=False.
+    When an idempotency cache is given, retries it already knows about are
+    answered from the cache once the access check has passed, so a sender
+    removed from the conversation cannot read their old message back.
+    Blocked users are rejected from the local ``block_list`` before any I/O.
+    Non-admin senders over a ``rate_limiter`` limit get RateLimitedError;
+    retries answered from the cache do not count against it.
+    ``phases`` receives the duration of each step and the ``total``.
     """
+    if (
+        block_list is not None
+        and principal.kind == ParticipantKind.USER
+        and block_list.is_blocked(principal.subject_id)
+    ):
+        raise ForbiddenError("User is blocked")
+
+    phases = phases or _NO_PHASES
+    started = mark = time.perf_counter()
     conversation = await uow.conversations.get_by_id(conversation_id)
     await assert_conversation_access(principal, conversation, uow.participants)
+    mark = _lap(phases, "access", mark)
+
+    if idempotency is not None:
+        cached = await idempotency.get(
+            conversation_id, principal.kind.value, principal.subject_id, client_msg_id,
+        )
+        mark = _lap(phases, "idempotency", mark)
+        if cached is not None:
+            phases.observe("total", mark - started)
+            return cached, False
+
+    if rate_limiter is not None and not principal.is_admin:
+        await assert_send_allowed(rate_limiter, principal, conversation_id)
+        _lap(phases, "rate_limit", mark)
 
     now = datetime.now(timezone.utc)
     msg = Message(
@@ -39,26 +87,120 @@ async def send_message(
         created_at=now,
     )
 
-    msg, created = await uow.messages_w.create_if_not_exists(msg)
+    msg, created = await _store_message(msg, uow, phases)
+
+    if idempotency is not None:
+        await idempotency.put(msg)
+
+    phases.observe("total", time.perf_counter() - started)
+    return msg, created
+
 
+async def send_system_message(
+    conversation_id: uuid.UUID,
+    body: str,
+    sender: Principal,
+    uow: UnitOfWork,
+    *,
+    client_msg_id: uuid.UUID | None = None,
+) -> tuple[Message, bool]:
+    """Trusted single-message path for internal senders.
+
+    Skips the conversation lookup and access check: the caller vouches that
+    ``conversation_id`` exists (e.g. it came from the topic directory).
+    """
+    msg = Message(
+        id=uuid.uuid4(),
+        conversation_id=conversation_id,
+        sender_kind=sender.kind.value,
+        sender_id=sender.subject_id,
+        type=MessageType.SYSTEM.value,
+        body=body,
+        payload=None,
+        client_msg_id=client_msg_id or uuid.uuid4(),
+        created_at=datetime.now(timezone.utc),
+    )
+    return await _store_message(msg, uow)
+
+
+async def _store_message(
+    msg: Message, uow: UnitOfWork, phases: PhaseTimer = _NO_PHASES,
+) -> tuple[Message, bool]:
+    mark = time.perf_counter()
+    msg, created = await uow.messages_w.create_if_not_exists(msg)
+    mark = _lap(phases, "insert", mark)
     if created:
-        await uow.conversations_w.touch_last_message_at(conversation_id, msg.created_at)
-        await uow.outbox.add(
-            "chat.message_created",
-            {
-                "message_id": str(msg.id),
-                "conversation_id": str(msg.conversation_id),
-                "sender_kind": msg.sender_kind,
-                "sender_id": msg.sender_id,
-                "type": msg.type,
-                "body": msg.body,
-            },
-        )
+        await uow.conversations_w.touch_last_message_at(msg.conversation_id, msg.created_at)
+        mark = _lap(phases, "touch", mark)
+        await uow.outbox.add(MESSAGE_CREATED, message_created_payload(msg))
+        mark = _lap(phases, "outbox", mark)
         await uow.commit()
-
+        _lap(phases, "commit", mark)
     return msg, created
 
 
+def _lap(phases: PhaseTimer, phase: str, since: float) -> float:
+    now = time.perf_counter()
+    phases.observe(phase, now - since)
+    return now
+
+
+async def send_system_messages(
+    items: Sequence[SendMessageDTO],
+    sender: Principal,
+    uow: UnitOfWork,
+) -> list[Message]:
+    """Insert trusted messages in one statement and commit once.
+
+    No access check: callers are internal event handlers. Items whose
+    client_msg_id already exists are skipped, so redelivered events do not
+    duplicate messages. Returns the created messages in insertion order.
+    """
+    if not items:
+        return []
+    now = datetime.now(timezone.utc)
+    drafts = [
+        Message(
+            id=uuid.uuid4(),
+            conversation_id=item.conversation_id,
+            sender_kind=sender.kind.value,
+            sender_id=sender.subject_id,
+            type=item.type.value,
+            body=item.body,
+            payload=None,
+            client_msg_id=item.client_msg_id,
+            # Strictly increasing so the timeline keeps the batch order.
+            created_at=now + timedelta(microseconds=i),
+        )
+        for i, item in enumerate(items)
+    ]
+    created = await uow.messages_w.create_many(drafts)
+    if not created:
+        return []
+
+    latest: dict[uuid.UUID, datetime] = {}
+    for msg in created:
+        latest[msg.conversation_id] = max(msg.created_at, latest.get(msg.conversation_id, msg.created_at))
+    await uow.conversations_w.touch_last_message_at_many(latest)
+    await uow.outbox.add_many(MESSAGE_CREATED, [message_created_payload(m) for m in created])
+    await uow.commit()
+    return created
+
+
+def message_created_payload(msg: Message) -> dict[str, Any]:
+    """The MESSAGE_CREATED event data; ``client_msg_id`` lets a sender match the echo."""
+    return {
+        "message_id": str(msg.id),
+        "conversation_id": str(msg.conversation_id),
+        "sender_kind": msg.sender_kind,
+        "sender_id": msg.sender_id,
+        "type": msg.type,
+        "body": msg.body,
+        "client_msg_id": str(msg.client_msg_id),
+        "created_at": msg.created_at.isoformat(),
+    }
+
+
 async def list_messages(
     conversation_id: uuid.UUID,
     principal: Principal,
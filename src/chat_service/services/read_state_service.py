@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import uuid
 
 from chat_service.application.dto.principal import Principal
+from chat_service.application.dto.read_state import ReadMarkDTO
 from chat_service.application.policies.permissions import assert_conversation_access
-from chat_service.application.uow import UnitOfWork
+from chat_service.application.uow import UnitOfWork, UoWFactory
+from chat_service.tasks import cancel_task
+
+logger = logging.getLogger(__name__)
 
 
 async def mark_read(
@@ -22,3 +28,93 @@ async def mark_read(
         last_message_id,
     )
     await uow.commit()
+
+
+_MarkKey = tuple[uuid.UUID, str, int]
+
+
+class ReadStateBuffer:
+    """Write-behind buffer for mark_read.
+
+    Collects the marks per (conversation, kind, subject) and flushes them as
+    one multi-row upsert every ``flush_interval`` seconds, or earlier once
+    ``max_pending`` keys are waiting. Marks may arrive out of order and only
+    the upsert knows the messages' times, so every distinct mark of a key is
+    handed over and the upsert keeps the newest. The access check and the
+    "never move backwards" guard run there too, so ``add`` does no I/O.
+    """
+
+    def __init__(
+        self,
+        uow_factory: UoWFactory,
+        *,
+        flush_interval: float,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending: dict[_MarkKey, dict[uuid.UUID, ReadMarkDTO]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        conversation_id: uuid.UUID,
+        principal: Principal,
+        last_message_id: uuid.UUID,
+    ) -> None:
+        kind = principal.kind.value
+        marks = self._pending.setdefault((conversation_id, kind, principal.subject_id), {})
+        marks[last_message_id] = ReadMarkDTO(
+            conversation_id=conversation_id,
+            kind=kind,
+            subject_id=principal.subject_id,
+            last_message_id=last_message_id,
+            is_admin=principal.is_admin,
+        )
+        if len(self._pending) >= self._max_pending:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="read-state-buffer")
+        logger.info("Read-state buffer started (flush every %.3fs)", self._flush_interval)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and drain whatever is still pending."""
+        if self._task:
+            await cancel_task(self._task)
+        await self.flush()
+        logger.info("Read-state buffer stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self._uow_factory() as uow:
+                written = await uow.read_state_w.upsert_last_read_many(
+                    [mark for marks in batch.values() for mark in marks.values()],
+                )
+                await uow.commit()
+        except Exception:
+            logger.exception("Read-state flush of %d marks failed, will retry", len(batch))
+            # Merge with marks that arrived meanwhile; the next upsert picks the newest.
+            for key, marks in batch.items():
+                self._pending.setdefault(key, {}).update(marks)
+            return 0
+        logger.debug("Flushed %d read marks (%d rows written)", len(batch), written)
+        return written
@@ -0,0 +1,257 @@
+"""Multi-process API server: N uvicorn workers sharing one port.
+
+Each worker binds its own listening socket with SO_REUSEPORT, so the kernel
+spreads new connections across processes without a shared accept lock.
+Workers are independent: every one has its own event loop, WebSocket
+ConnectionManager, Pub/Sub subscription, caches and readiness prober —
+fan-out already goes through Redis, so no state is shared between them.
+
+The supervisor restarts workers that die, stops all of them on SIGTERM or
+SIGINT, and on SIGHUP replaces them one at a time: the replacement starts
+listening before the old worker is told to shut down, so the port never
+goes dark. WebSocket clients of the old worker see a close frame and
+reconnect to whichever worker the kernel picks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from multiprocessing.connection import wait
+from multiprocessing.context import SpawnProcess
+from multiprocessing.synchronize import Event
+from typing import Callable
+
+import uvicorn
+from prometheus_client import start_http_server
+
+logger = logging.getLogger(__name__)
+
+# target(index, ready): serve as worker ``index``; set ``ready`` once accepting.
+WorkerTarget = Callable[[int, Event], None]
+
+_MAX_RESTART_DELAY = 30.0
+
+
+def default_worker_count() -> int:
+    """CPUs this process may run on (not the cgroup quota: set API_WORKERS in containers)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not Linux
+        return os.cpu_count() or 1
+
+
+def bind_reuseport(host: str, port: int) -> socket.socket:
+    """A listening-ready TCP socket other processes can bind to the same address."""
+    if not hasattr(socket, "SO_REUSEPORT"):  # pragma: no cover - Windows
+        raise RuntimeError("API_WORKERS > 1 needs SO_REUSEPORT, which this platform lacks")
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def _serve_metrics_when_free(port: int) -> None:
+    """Expose this worker's metrics on ``port``, waiting while a predecessor holds it."""
+
+    def bind() -> None:
+        while True:
+            try:
+                start_http_server(port)
+            except OSError:
+                time.sleep(0.5)
+                continue
+            logger.info("Worker metrics on :%d/metrics", port)
+            return
+
+    threading.Thread(target=bind, name="metrics-bind", daemon=True).start()
+
+
+def serve_reuseport(config: uvicorn.Config, host: str, port: int, ready: Event) -> None:
+    """Run uvicorn ``config`` on a SO_REUSEPORT socket; set ``ready`` once it accepts."""
+    sock = bind_reuseport(host, port)
+    server = uvicorn.Server(config)
+
+    async def serve() -> None:
+        task = asyncio.create_task(server.serve(sockets=[sock]))
+        while not server.started and not task.done():
+            await asyncio.sleep(0.05)
+        if server.started:
+            ready.set()
+        await task
+
+    asyncio.run(serve())
+
+
+def run_api_worker(
+    host: str,
+    port: int,
+    graceful_timeout: float,
+    metrics_port: int,
+    index: int,
+    ready: Event,
+) -> None:
+    """Worker process body: the chat API as worker ``index``."""
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if metrics_port > 0:
+        _serve_metrics_when_free(metrics_port + index)
+    config = uvicorn.Config(
+        "chat_service.app:create_app",
+        factory=True,
+        log_level="info",
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    serve_reuseport(config, host, port, ready)
+
+
+class Supervisor:
+    """Keeps ``workers`` processes running ``target`` and restarts them on demand.
+
+    Processes are started with the spawn method: no event loop, pool or
+    socket of the supervisor leaks into a worker. A worker that exits on
+    its own is restarted after a delay doubling per consecutive failure up
+    to 30 s; one that becomes ready resets its delay.
+    """
+
+    def __init__(
+        self,
+        target: WorkerTarget,
+        workers: int,
+        *,
+        ready_timeout: float = 60.0,
+        stop_timeout: float = 30.0,
+        restart_delay: float = 1.0,
+    ) -> None:
+        self._target = target
+        self._count = workers
+        self._ready_timeout = ready_timeout
+        self._stop_timeout = stop_timeout
+        self._restart_delay = restart_delay
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: dict[int, tuple[SpawnProcess, Event]] = {}
+        self._failures: dict[int, int] = {}
+        self._respawn_at: dict[int, float] = {}
+        self._stopping = False
+        self._reload = False
+        self.restarts = 0
+
+    @property
+    def pids(self) -> list[int | None]:
+        return [self._workers[i][0].pid for i in sorted(self._workers)]
+
+    def _spawn(self, index: int) -> tuple[SpawnProcess, Event]:
+        ready = self._ctx.Event()
+        process = self._ctx.Process(
+            target=self._target, args=(index, ready), name=f"api-worker-{index}",
+        )
+        process.start()
+        logger.info("Worker %d started (pid %s)", index, process.pid)
+        return process, ready
+
+    def _await_ready(self, process: SpawnProcess, ready: Event) -> bool:
+        deadline = time.monotonic() + self._ready_timeout
+        while time.monotonic() < deadline:
+            if ready.wait(0.1):
+                return True
+            if not process.is_alive():
+                return False
+        return False
+
+    def _terminate(self, processes: list[SpawnProcess]) -> None:
+        """SIGTERM ``processes`` (uvicorn shuts down gracefully), SIGKILL after stop_timeout."""
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self._stop_timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("Worker pid %s ignored SIGTERM, killing it", process.pid)
+                process.kill()
+                process.join()
+
+    def start(self) -> None:
+        for index in range(self._count):
+            self._workers[index] = self._spawn(index)
+        for index, (process, ready) in self._workers.items():
+            if self._await_ready(process, ready):
+                self._failures[index] = 0
+            else:
+                logger.error("Worker %d did not become ready", index)
+
+    def rolling_restart(self) -> bool:
+        """Replace the workers one by one; stops at the first replacement that fails."""
+        logger.info("Rolling restart of %d workers", len(self._workers))
+        for index in sorted(self._workers):
+            old, _ = self._workers[index]
+            self._respawn_at.pop(index, None)
+            process, ready = self._spawn(index)
+            if not self._await_ready(process, ready):
+                logger.error("Replacement for worker %d failed, keeping the old one", index)
+                self._terminate([process])
+                return False
+            self._workers[index] = (process, ready)
+            self._terminate([old])
+            self.restarts += 1
+        logger.info("Rolling restart complete")
+        return True
+
+    def check_workers(self) -> None:
+        """Schedule and perform restarts of workers that exited."""
+        now = time.monotonic()
+        for index, (process, ready) in list(self._workers.items()):
+            if process.is_alive():
+                if ready.is_set():
+                    self._failures[index] = 0
+                continue
+            respawn_at = self._respawn_at.get(index)
+            if respawn_at is None:
+                failures = self._failures.get(index, 0)
+                delay = min(self._restart_delay * 2 ** failures, _MAX_RESTART_DELAY)
+                self._failures[index] = failures + 1
+                self._respawn_at[index] = now + delay
+                logger.error(
+                    "Worker %d (pid %s) exited with %s, restarting in %.1fs",
+                    index, process.pid, process.exitcode, delay,
+                )
+            elif now >= respawn_at:
+                del self._respawn_at[index]
+                self._workers[index] = self._spawn(index)
+                self.restarts += 1
+
+    def stop(self) -> None:
+        logger.info("Stopping %d workers", len(self._workers))
+        self._terminate([process for process, _ in self._workers.values()])
+
+    def run(self) -> None:
+        """Supervise until SIGTERM/SIGINT; SIGHUP triggers a rolling restart."""
+
+        def request_stop(_sig: int, _frame: object) -> None:
+            self._stopping = True
+
+        def request_reload(_sig: int, _frame: object) -> None:
+            self._reload = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_reload)
+        self.start()
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self.rolling_restart()
+                alive = [p.sentinel for p, _ in self._workers.values() if p.is_alive()]
+                wait(alive, timeout=0.5)
+                self.check_workers()
+        finally:
+            self.stop()
@@ -0,0 +1,13 @@
+"""Helpers for the background tasks behind start()/stop() components."""
+from __future__ import annotations
+
+import asyncio
+
+
+async def cancel_task(task: asyncio.Task[None]) -> None:
+    """Cancel ``task`` and wait until it has finished."""
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
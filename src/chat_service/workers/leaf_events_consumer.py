@@ -4,55 +4,198 @@ from __future__ import annotations
 import asyncio
 import logging
 import uuid
+from functools import partial
 from typing import Any
 
 import redis.asyncio as aioredis
 
+from chat_service.application.dto.message import SendMessageDTO
 from chat_service.application.dto.principal import Principal
+from chat_service.application.uow import UoWFactory
 from chat_service.config import settings
-from chat_service.domain.value_objects.enums import MessageType, ParticipantKind
-from chat_service.infrastructure.bus.redis_streams import RedisStreamConsumer
-from chat_service.infrastructure.db.session import AsyncSessionLocal
+from chat_service.domain.value_objects.enums import (
+    ConversationStatus,
+    MessageType,
+    ParticipantKind,
+)
+from chat_service.infrastructure.bus.post_commit import PostCommitPublisher
+from chat_service.infrastructure.bus.redis_pubsub import (
+    RedisPubSubPublisher,
+    RedisPubSubSubscriber,
+    conversation_key,
+)
+from chat_service.infrastructure.bus.redis_streams import (
+    AdaptiveReadTuner,
+    RedisStreamConsumer,
+    StreamEntry,
+)
+from chat_service.infrastructure.bus.serializer import EventEnvelope, get_codec
+from chat_service.infrastructure.cache.topic_directory import TopicDirectory
+from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+from chat_service.infrastructure.db.pool import PoolHealthChecker
+from chat_service.infrastructure.db.session import AsyncSessionLocal, engine
 from chat_service.infrastructure.db.uow import SqlAlchemyUoW
-from chat_service.services import conversation_service, message_service
+from chat_service.infrastructure.metrics import (
+    serve as serve_metrics,
+    track_post_commit,
+    track_pubsub_subscriber,
+    track_stream_consumer,
+    track_topic_directory,
+)
+from chat_service.services import block_service, conversation_service, message_service
 
 logger = logging.getLogger(__name__)
 
+# Open order conversations by order_id. Filled by order.created and by
+# chat.conversation_created fan-out events, dropped when a conversation closes.
+_directory = TopicDirectory(settings.TOPIC_DIRECTORY_MAX_ENTRIES)
 
-async def _handle_event(event_type: str, fields: dict[str, Any]) -> None:
+# System messages get a client_msg_id derived from the stream entry id, so a
+# redelivered event hits the idempotency constraint instead of posting twice.
+_SYSTEM_MSG_NAMESPACE = uuid.UUID("6f1c3a52-9d0e-4b8f-a1e7-2c5d8b4f0e91")
+
+
+def _system_client_msg_id(stream_id: str) -> uuid.UUID:
+    return uuid.uuid5(_SYSTEM_MSG_NAMESPACE, stream_id)
+
+
+def _partition_key(fields: dict[str, Any]) -> str | None:
+    """Events of one order (or, failing that, one user) must apply in order."""
+    if order_id := fields.get("order_id"):
+        return f"order:{order_id}"
+    if user_id := fields.get("user_id"):
+        return f"user:{user_id}"
+    return None
+
+
+async def _handle_event(
+    uow_factory: UoWFactory, msg_id: str, event_type: str, fields: dict[str, Any],
+) -> None:
     """Dispatch a stream event to the appropriate handler."""
     if event_type == "user.blocked":
-        await _handle_user_blocked(fields)
+        await _handle_user_blocked(uow_factory, fields)
     elif event_type == "user.updated":
-        await _handle_user_updated(fields)
+        await _handle_user_updated(uow_factory, fields)
     elif event_type == "order.created":
-        await _handle_order_created(fields)
+        await _handle_order_created(uow_factory, fields)
     elif event_type == "order.status_changed":
-        await _handle_order_status_changed(fields)
+        await _handle_order_status_changed(uow_factory, msg_id, fields)
     else:
         logger.debug("Ignoring unknown event: %s", event_type)
 
 
-async def _handle_user_blocked(fields: dict[str, Any]) -> None:
-    user_id = fields.get("user_id")
-    logger.info("User %s blocked — future send_message calls will be rejected", user_id)
-    # TODO: persist blocked state, check in send_message
+async def _handle_batch(uow_factory: UoWFactory, entries: list[StreamEntry]) -> set[str]:
+    """Apply one lane's share of a read in stream order; returns applied ids.
+
+    Runs of consecutive ``order.status_changed`` events are applied in one
+    transaction with a multi-row message insert; other events go through
+    ``_handle_event`` one at a time.
+    """
+    applied: set[str] = set()
+    run: list[StreamEntry] = []
+    for msg_id, fields in entries:
+        event_type = fields.get("event_type", "unknown")
+        if event_type == "order.status_changed":
+            run.append((msg_id, fields))
+            continue
+        applied |= await _apply_status_changes(uow_factory, run)
+        run = []
+        try:
+            await _handle_event(uow_factory, msg_id, event_type, fields)
+            applied.add(msg_id)
+        except Exception:
+            logger.exception("Error processing stream message %s", msg_id)
+    applied |= await _apply_status_changes(uow_factory, run)
+    return applied
+
+
+async def _apply_status_changes(uow_factory: UoWFactory, run: list[StreamEntry]) -> set[str]:
+    if not run:
+        return set()
+    try:
+        async with uow_factory() as uow:
+            order_ids = [int(fields["order_id"]) for _, fields in run]
+            conversation_ids = {
+                order_id: conv_id
+                for order_id in order_ids
+                if (conv_id := _directory.get("order", order_id)) is not None
+            }
+            misses = [order_id for order_id in order_ids if order_id not in conversation_ids]
+            for order_id, conv in (await uow.conversations.get_by_topics("order", misses)).items():
+                conversation_ids[order_id] = conv.id
+                if conv.status == ConversationStatus.OPEN:
+                    _directory.put("order", order_id, conv.id)
+
+            items: list[SendMessageDTO] = []
+            for msg_id, fields in run:
+                conversation_id = conversation_ids.get(int(fields["order_id"]))
+                if conversation_id is None:
+                    logger.warning(
+                        "No conversation for order %s, cannot notify about status %s",
+                        fields["order_id"], fields["status"],
+                    )
+                    continue
+                items.append(
+                    SendMessageDTO(
+                        conversation_id=conversation_id,
+                        client_msg_id=_system_client_msg_id(msg_id),
+                        type=MessageType.SYSTEM,
+                        body=_status_change_body(fields),
+                    )
+                )
+            created = await message_service.send_system_messages(items, _SYSTEM_PRINCIPAL, uow)
+    except Exception:
+        logger.exception("Batched status changes failed, applying %d one by one", len(run))
+        applied: set[str] = set()
+        for msg_id, fields in run:
+            try:
+                await _handle_order_status_changed(uow_factory, msg_id, fields)
+                applied.add(msg_id)
+            except Exception:
+                logger.exception("Error processing stream message %s", msg_id)
+        return applied
+
+    logger.info(
+        "Applied %d order status changes (%d new system messages)", len(run), len(created),
+    )
+    return {msg_id for msg_id, _ in run}
+
+
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
 
 
-async def _handle_user_updated(fields: dict[str, Any]) -> None:
-    user_id = fields.get("user_id")
-    logger.debug("User %s updated (no-op for now)", user_id)
+async def _handle_user_blocked(uow_factory: UoWFactory, fields: dict[str, Any]) -> None:
+    await _set_user_blocked(uow_factory, int(fields["user_id"]), True, fields.get("reason"))
 
 
-async def _handle_order_created(fields: dict[str, Any]) -> None:
+async def _handle_user_updated(uow_factory: UoWFactory, fields: dict[str, Any]) -> None:
+    """Sync the block flag when the update carries one (``is_blocked``)."""
+    user_id = int(fields["user_id"])
+    flag = fields.get("is_blocked")
+    if flag is None:
+        logger.debug("User %d updated (no block flag)", user_id)
+        return
+    blocked = str(flag).lower() in _TRUE_VALUES
+    await _set_user_blocked(uow_factory, user_id, blocked, fields.get("reason"))
+
+
+async def _set_user_blocked(
+    uow_factory: UoWFactory, user_id: int, blocked: bool, reason: str | None,
+) -> None:
+    async with uow_factory() as uow:
+        changed = await block_service.set_user_blocked(user_id, blocked, uow, reason=reason)
+    if changed:
+        logger.info("User %d %s", user_id, "blocked" if blocked else "unblocked")
+
+
+async def _handle_order_created(uow_factory: UoWFactory, fields: dict[str, Any]) -> None:
     """Create a chat conversation tied to a new order."""
     user_id = int(fields["user_id"])
     order_id = int(fields["order_id"])
 
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
+    async with uow_factory() as uow:
         conv, created = await conversation_service.get_or_create_topic_conversation(
-            "order", order_id, user_id, uow,
+            "order", order_id, user_id, uow, directory=_directory,
         )
 
     if created:
@@ -80,38 +223,88 @@ _ORDER_STATUS_LABELS: dict[str, str] = {
 }
 
 
-async def _handle_order_status_changed(fields: dict[str, Any]) -> None:
+def _status_change_body(fields: dict[str, Any]) -> str:
+    new_status = fields["status"]
+    label = _ORDER_STATUS_LABELS.get(new_status, f"Статус заказа: {new_status}")
+    return f"{label} (#{int(fields['order_id'])})"
+
+
+async def _handle_order_status_changed(
+    uow_factory: UoWFactory, msg_id: str, fields: dict[str, Any],
+) -> None:
     """Send a system message to the order conversation when status changes."""
     order_id = int(fields["order_id"])
     new_status = fields["status"]
     old_status = fields.get("old_status")
 
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
-        conv = await uow.conversations.get_by_topic("order", order_id)
-        if conv is None:
-            logger.warning(
-                "No conversation for order %d, cannot notify about status %s",
-                order_id, new_status,
-            )
-            return
-
-        label = _ORDER_STATUS_LABELS.get(new_status, f"Статус заказа: {new_status}")
-        body = f"{label} (#{order_id})"
-
-        await message_service.send_message(
-            conv.id, _SYSTEM_PRINCIPAL, uuid.uuid4(),
-            MessageType.SYSTEM, body, uow,
+    conversation_id = _directory.get("order", order_id)
+    async with uow_factory() as uow:
+        if conversation_id is None:
+            conv = await uow.conversations.get_by_topic("order", order_id)
+            if conv is None:
+                logger.warning(
+                    "No conversation for order %d, cannot notify about status %s",
+                    order_id, new_status,
+                )
+                return
+            conversation_id = conv.id
+            if conv.status == ConversationStatus.OPEN:
+                _directory.put("order", order_id, conv.id)
+
+        await message_service.send_system_message(
+            conversation_id, _status_change_body(fields), _SYSTEM_PRINCIPAL, uow,
+            client_msg_id=_system_client_msg_id(msg_id),
         )
 
     logger.info(
         "Order %d status %s → %s — notified in conversation %s",
-        order_id, old_status or "?", new_status, conv.id,
+        order_id, old_status or "?", new_status, conversation_id,
     )
 
 
+async def _on_fanout_event(envelope: EventEnvelope) -> None:
+    """Keep the topic directory in step with conversations created or closed elsewhere."""
+    # Check the type first: other events (and their frames) are never parsed.
+    if envelope.event_type == "chat.conversation_created":
+        data = envelope.data
+        if data.get("topic_id") is not None:
+            _directory.put(data["topic_type"], int(data["topic_id"]), uuid.UUID(data["conversation_id"]))
+    elif envelope.event_type == "chat.conversation_updated":
+        data = envelope.data
+        if data.get("status") == ConversationStatus.CLOSED:
+            _directory.invalidate_conversation(uuid.UUID(data["conversation_id"]))
+
+
 async def run_consumer() -> None:
     redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    bus_redis = aioredis.from_url(settings.REDIS_URL)
+    last_activity: LastActivityAggregator | None = None
+    if settings.CONVERSATION_TOUCH_MODE == "deferred":
+        last_activity = LastActivityAggregator(
+            partial(SqlAlchemyUoW, session_factory=AsyncSessionLocal),
+            flush_interval=settings.CONVERSATION_TOUCH_FLUSH_MS / 1000,
+        )
+        await last_activity.start()
+    # The worker leaves young records to the post-commit hook, so this process
+    # needs one too or its events would wait out the grace period.
+    post_commit: PostCommitPublisher | None = None
+    if settings.OUTBOX_IMMEDIATE_PUBLISH:
+        post_commit = PostCommitPublisher(
+            RedisPubSubPublisher(bus_redis, get_codec(settings.EVENT_CODEC)),
+            settings.REDIS_PUBSUB_CHANNEL,
+            partial(SqlAlchemyUoW, session_factory=AsyncSessionLocal),
+            flush_interval=settings.OUTBOX_ACK_FLUSH_MS / 1000,
+            tracing=settings.DELIVERY_TRACING,
+        )
+        await post_commit.start()
+        track_post_commit(post_commit)
+    uow_factory = partial(
+        SqlAlchemyUoW,
+        session_factory=AsyncSessionLocal,
+        last_activity=last_activity,
+        outbox_frames=settings.OUTBOX_PRERENDER_FRAMES,
+        post_commit=post_commit,
+    )
     consumer_name = f"consumer-{uuid.uuid4().hex[:8]}"
 
     consumer = RedisStreamConsumer(
@@ -119,8 +312,39 @@ async def run_consumer() -> None:
         stream=settings.LEAF_EVENTS_STREAM,
         group=settings.LEAF_EVENTS_GROUP,
         consumer=consumer_name,
-        callback=_handle_event,
+        callback=partial(_handle_event, uow_factory),
+        concurrency=settings.LEAF_EVENTS_CONCURRENCY,
+        max_in_flight=settings.LEAF_EVENTS_MAX_IN_FLIGHT,
+        partition_key=_partition_key,
+        claim_idle_ms=settings.LEAF_EVENTS_CLAIM_IDLE_MS,
+        max_deliveries=settings.LEAF_EVENTS_MAX_DELIVERIES,
+        dead_letter_stream=settings.LEAF_EVENTS_DLQ_STREAM or None,
+        batch_size=settings.LEAF_EVENTS_BATCH_SIZE,
+        block_ms=settings.LEAF_EVENTS_BLOCK_MS,
+        batch_callback=(
+            partial(_handle_batch, uow_factory) if settings.LEAF_EVENTS_BATCH_MODE else None
+        ),
+        tuner=AdaptiveReadTuner(
+            min_batch=settings.LEAF_EVENTS_BATCH_SIZE,
+            max_batch=settings.LEAF_EVENTS_MAX_BATCH_SIZE,
+            max_block_ms=settings.LEAF_EVENTS_BLOCK_MS,
+        ) if settings.LEAF_EVENTS_ADAPTIVE_READS else None,
+    )
+    fanout = RedisPubSubSubscriber(
+        bus_redis,
+        settings.REDIS_PUBSUB_CHANNEL,
+        _on_fanout_event,
+        queue_size=settings.PUBSUB_QUEUE_SIZE,
+        partition_key=conversation_key,
+        reconnect_max_delay=settings.PUBSUB_RECONNECT_MAX_DELAY_SECONDS,
     )
+    pool_checker = PoolHealthChecker(engine, settings.DB_POOL_HEALTHCHECK_INTERVAL)
+    await pool_checker.start()
+    track_stream_consumer(consumer, settings.LEAF_EVENTS_STREAM)
+    track_pubsub_subscriber(fanout, settings.REDIS_PUBSUB_CHANNEL)
+    track_topic_directory(_directory)
+    serve_metrics(settings.LEAF_CONSUMER_METRICS_PORT)
+    await fanout.start()
     await consumer.start()
     logger.info("LeafFlow events consumer started (%s)", consumer_name)
 
@@ -131,6 +355,13 @@ async def run_consumer() -> None:
         pass
     finally:
         await consumer.stop()
+        await fanout.stop()
+        if post_commit is not None:
+            await post_commit.stop()
+        if last_activity is not None:
+            await last_activity.stop()
+        await pool_checker.stop()
+        await bus_redis.aclose()
         await redis.aclose()
 
 
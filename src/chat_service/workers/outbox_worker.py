@@ -3,19 +3,48 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta, timezone
+from functools import partial
 
 import redis.asyncio as aioredis
 
+from chat_service.application.uow import UoWFactory
 from chat_service.config import settings
 from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubPublisher
-from chat_service.infrastructure.db.session import AsyncSessionLocal
+from chat_service.infrastructure.bus.serializer import get_codec
+from chat_service.infrastructure.bus.trace import WORKER_STAGES, DeliveryTrace, outbox_trace
+from chat_service.infrastructure.db.pool import PoolHealthChecker
+from chat_service.infrastructure.db.session import AsyncSessionLocal, engine
 from chat_service.infrastructure.db.uow import SqlAlchemyUoW
+from chat_service.infrastructure.metrics import (
+    observe_delivery,
+    outbox_failed_total,
+    outbox_publish_lag_seconds,
+    outbox_published_total,
+    serve as serve_metrics,
+    track_gauge,
+)
 
 logger = logging.getLogger(__name__)
 
 BASE_DELAY_SECONDS = 5
 MAX_DELAY_SECONDS = 300
+# COUNT(*) over the pending rows is not free, so the backlog gauge lags a little.
+BACKLOG_REFRESH_SECONDS = 15
+
+_backlog: int | None = None
+
+
+def publish_grace_seconds() -> float:
+    """How old a pending record must be before the worker relays it.
+
+    With immediate publishing the API publishes each record right after its
+    commit and acknowledges it shortly after, so younger records are left to
+    it; the worker relays only those whose publish failed or whose ack was
+    lost.
+    """
+    return settings.OUTBOX_PUBLISH_GRACE_SECONDS if settings.OUTBOX_IMMEDIATE_PUBLISH else 0.0
 
 
 def _calc_backoff(attempts: int) -> datetime:
@@ -25,7 +54,11 @@ def _calc_backoff(attempts: int) -> datetime:
 
 async def run_outbox_worker() -> None:
     redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
-    publisher = RedisPubSubPublisher(redis)
+    publisher = RedisPubSubPublisher(redis, get_codec(settings.EVENT_CODEC))
+    pool_checker = PoolHealthChecker(engine, settings.DB_POOL_HEALTHCHECK_INTERVAL)
+    await pool_checker.start()
+    track_gauge("chat_outbox_backlog", "Outbox records waiting to be published", lambda: _backlog)
+    serve_metrics(settings.OUTBOX_WORKER_METRICS_PORT)
 
     logger.info(
         "Outbox worker started (poll=%.1fs, batch=%d, max_attempts=%d)",
@@ -35,36 +68,63 @@ async def run_outbox_worker() -> None:
     )
 
     try:
-        while True:
-            try:
-                await _process_batch(publisher)
-            except Exception:
-                logger.exception("Outbox worker loop error")
-            await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL)
+        await relay_outbox(publisher, partial(SqlAlchemyUoW, session_factory=AsyncSessionLocal))
     finally:
+        await pool_checker.stop()
         await redis.aclose()
 
 
-async def _process_batch(publisher: RedisPubSubPublisher) -> None:
-    async with AsyncSessionLocal() as session:
-        uow = SqlAlchemyUoW(session)
-        batch = await uow.outbox.fetch_pending(settings.OUTBOX_BATCH_SIZE)
+async def relay_outbox(publisher: RedisPubSubPublisher, uow_factory: UoWFactory) -> None:
+    """Publish pending outbox records every poll interval until cancelled.
+
+    Also run in-process by the API when STORAGE_BACKEND=memory, since a
+    separate worker cannot see that store.
+    """
+    backlog_at = float("-inf")
+    while True:
+        try:
+            await _process_batch(publisher, uow_factory)
+            if time.monotonic() - backlog_at >= BACKLOG_REFRESH_SECONDS:
+                await _refresh_backlog(uow_factory)
+                backlog_at = time.monotonic()
+        except Exception:
+            logger.exception("Outbox worker loop error")
+        await asyncio.sleep(settings.OUTBOX_POLL_INTERVAL)
+
+
+async def _process_batch(publisher: RedisPubSubPublisher, uow_factory: UoWFactory) -> None:
+    async with uow_factory() as uow:
+        batch = await uow.outbox.fetch_pending(
+            settings.OUTBOX_BATCH_SIZE, min_age=publish_grace_seconds(),
+        )
         if not batch:
             return
+        fetched: DeliveryTrace | None = None
+        if settings.DELIVERY_TRACING:
+            fetched = DeliveryTrace()
+            fetched.mark("fetched")
 
         sent_ids: list[int] = []
         for record in batch:
             if record.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
                 logger.warning("Outbox record %d exceeded max attempts, skipping", record.id)
                 continue
+            trace = outbox_trace(record, fetched) if fetched is not None else None
             try:
-                payload = {
-                    "event_type": record.event_type,
-                    **record.payload,
-                }
-                await publisher.publish(settings.REDIS_PUBSUB_CHANNEL, payload)
+                await publisher.publish_record(
+                    settings.REDIS_PUBSUB_CHANNEL,
+                    record,
+                    trace=trace.stamps if trace is not None else None,
+                )
                 sent_ids.append(record.id)
+                if trace is not None:
+                    observe_delivery(trace, WORKER_STAGES)
+                if record.created_at is not None:
+                    outbox_publish_lag_seconds.observe(
+                        (datetime.now(timezone.utc) - record.created_at).total_seconds()
+                    )
             except Exception:
+                outbox_failed_total.inc()
                 logger.exception("Failed to publish outbox record %d", record.id)
                 await uow.outbox.mark_failed(record.id, _calc_backoff(record.attempts))
 
@@ -73,9 +133,16 @@ async def _process_batch(publisher: RedisPubSubPublisher) -> None:
 
         await uow.commit()
         if sent_ids:
+            outbox_published_total.inc(len(sent_ids))
             logger.info("Published %d outbox records", len(sent_ids))
 
 
+async def _refresh_backlog(uow_factory: UoWFactory) -> None:
+    global _backlog  # noqa: PLW0603
+    async with uow_factory() as uow:
+        _backlog = await uow.outbox.count_pending()
+
+
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     asyncio.run(run_outbox_worker())
@@ -2,9 +2,10 @@
 from __future__ import annotations
 
 import uuid
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator, Callable
 from uuid import UUID
 
 import pytest
@@ -84,6 +85,19 @@ class FakeConversationReader:
                 return c
         return None
 
+    async def get_by_topic(self, topic_type: str, topic_id: int, *, status: str | None = None) -> Conversation | None:
+        for c in self._store.values():
+            if c.topic_type == topic_type and c.topic_id == topic_id and (status is None or c.status == status):
+                return c
+        return None
+
+    async def get_by_topics(self, topic_type: str, topic_ids: Any) -> dict[int, Conversation]:
+        return {
+            c.topic_id: c
+            for c in self._store.values()
+            if c.topic_type == topic_type and c.topic_id in set(topic_ids)
+        }
+
     async def list_for_user(self, user_id: int, *, cursor: str | None = None, limit: int = 20) -> list[Conversation]:
         return self._user_convs.get(user_id, [])[:limit]
 
@@ -94,11 +108,40 @@ class FakeConversationReader:
 @dataclass
 class FakeConversationWriter:
     _reader: FakeConversationReader
+    _participants: FakeParticipantReader | None = None
+    touched: dict[UUID, datetime] = field(default_factory=dict)
 
     async def create(self, conversation: Conversation) -> Conversation:
         self._reader._store[conversation.id] = conversation
         return conversation
 
+    async def create_open_or_get(
+        self,
+        conversation: Conversation,
+        *,
+        owner_user_id: int,
+    ) -> tuple[Conversation, bool]:
+        if conversation.topic_id is None:
+            existing = await self._reader.get_support_for_user(owner_user_id)
+        else:
+            existing = await self._reader.get_by_topic(
+                conversation.topic_type, conversation.topic_id, status=ConversationStatus.OPEN,
+            )
+        if existing is not None:
+            return existing, False
+        self._reader._store[conversation.id] = conversation
+        self._reader._user_convs.setdefault(owner_user_id, []).append(conversation)
+        if self._participants is not None:
+            self._participants._participants.append(
+                Participant(
+                    conversation_id=conversation.id,
+                    kind=ParticipantKind.USER,
+                    subject_id=owner_user_id,
+                    joined_at=conversation.created_at,
+                )
+            )
+        return conversation, True
+
     async def assign(self, conversation_id: UUID, admin_id: int | None) -> None:
         pass
 
@@ -108,6 +151,9 @@ class FakeConversationWriter:
     async def touch_last_message_at(self, conversation_id: UUID, ts: datetime) -> None:
         pass
 
+    async def touch_last_message_at_many(self, touches: Any) -> None:
+        self.touched.update(touches)
+
 
 @dataclass
 class FakeParticipantReader:
@@ -157,6 +203,14 @@ class FakeMessageWriter:
         self._created_ids.add(message.id)
         return message, True
 
+    async def create_many(self, messages: Any) -> list[Message]:
+        created = []
+        for message in messages:
+            msg, was_created = await self.create_if_not_exists(message)
+            if was_created:
+                created.append(msg)
+        return created
+
     async def get_by_client_msg_id(self, conversation_id: UUID, sender_kind: str, sender_id: int, client_msg_id: UUID) -> Message | None:
         for m in self._reader._messages:
             if m.conversation_id == conversation_id and m.client_msg_id == client_msg_id:
@@ -171,17 +225,30 @@ class FakeReadStateWriter:
     async def upsert_last_read(self, conversation_id: UUID, kind: str, subject_id: int, last_message_id: UUID) -> None:
         self._states.append((conversation_id, kind, subject_id, last_message_id))
 
+    async def upsert_last_read_many(self, marks: Any) -> int:
+        for m in marks:
+            self._states.append((m.conversation_id, m.kind, m.subject_id, m.last_message_id))
+        return len(marks)
+
 
 @dataclass
 class FakeOutboxWriter:
     _records: list[dict[str, Any]] = field(default_factory=list)
 
-    async def add(self, event_type: str, payload: dict[str, Any]) -> None:
+    async def add(self, event_type: str, payload: dict[str, Any]) -> int:
         self._records.append({"event_type": event_type, "payload": payload})
+        return len(self._records)
+
+    async def add_many(self, event_type: str, payloads: Any) -> None:
+        for payload in payloads:
+            await self.add(event_type, payload)
 
-    async def fetch_pending(self, batch_size: int) -> list[OutboxRecord]:
+    async def fetch_pending(self, batch_size: int, *, min_age: float = 0.0) -> list[OutboxRecord]:
         return []
 
+    async def count_pending(self) -> int:
+        return len(self._records)
+
     async def mark_sent(self, ids: list[int]) -> None:
         pass
 
@@ -189,6 +256,38 @@ class FakeOutboxWriter:
         pass
 
 
+@dataclass
+class FakeBlockedUsers:
+    _ids: set[int] = field(default_factory=set)
+
+    async def list_blocked_ids(self) -> list[int]:
+        return sorted(self._ids)
+
+    async def block(self, user_id: int, reason: str | None = None) -> bool:
+        if user_id in self._ids:
+            return False
+        self._ids.add(user_id)
+        return True
+
+    async def unblock(self, user_id: int) -> bool:
+        if user_id not in self._ids:
+            return False
+        self._ids.discard(user_id)
+        return True
+
+
+@dataclass
+class FakeIdempotencyCache:
+    _entries: dict[tuple[UUID, str, int, UUID], Message] = field(default_factory=dict)
+
+    async def get(self, conversation_id: UUID, sender_kind: str, sender_id: int, client_msg_id: UUID) -> Message | None:
+        return self._entries.get((conversation_id, sender_kind, sender_id, client_msg_id))
+
+    async def put(self, message: Message) -> None:
+        key = (message.conversation_id, message.sender_kind, message.sender_id, message.client_msg_id)
+        self._entries[key] = message
+
+
 @dataclass
 class FakeUoW:
     """In-memory UoW for unit tests."""
@@ -200,15 +299,19 @@ class FakeUoW:
     messages_w: FakeMessageWriter | None = None
     read_state_w: FakeReadStateWriter = field(default_factory=FakeReadStateWriter)
     outbox: FakeOutboxWriter = field(default_factory=FakeOutboxWriter)
+    blocked_users: FakeBlockedUsers = field(default_factory=FakeBlockedUsers)
+    blocked_users_w: FakeBlockedUsers | None = None
     _committed: bool = False
 
     def __post_init__(self) -> None:
         if self.conversations_w is None:
-            self.conversations_w = FakeConversationWriter(self.conversations)
+            self.conversations_w = FakeConversationWriter(self.conversations, self.participants)
         if self.participants_w is None:
             self.participants_w = FakeParticipantWriter(self.participants)
         if self.messages_w is None:
             self.messages_w = FakeMessageWriter(self.messages)
+        if self.blocked_users_w is None:
+            self.blocked_users_w = self.blocked_users
 
     async def flush(self) -> None:
         pass
@@ -218,3 +321,13 @@ class FakeUoW:
 
     async def rollback(self) -> None:
         pass
+
+
+def fake_uow_factory(uow: FakeUoW) -> Callable[[], Any]:
+    """UoWFactory that hands out the same FakeUoW every time."""
+
+    @asynccontextmanager
+    async def _open() -> AsyncIterator[FakeUoW]:
+        yield uow
+
+    return _open
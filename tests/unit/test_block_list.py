@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from chat_service.infrastructure.cache.block_list import InMemoryBlockList
+from chat_service.services import block_service
+from chat_service.services.block_service import USER_BLOCK_CHANGED
+from tests.conftest import FakeUoW, fake_uow_factory
+
+
+@pytest.mark.asyncio
+async def test_set_user_blocked_publishes_only_changes():
+    uow = FakeUoW()
+
+    assert await block_service.set_user_blocked(7, True, uow) is True
+    assert await block_service.set_user_blocked(7, True, uow) is False
+    assert await block_service.set_user_blocked(7, False, uow) is True
+
+    assert [r["payload"] for r in uow.outbox._records if r["event_type"] == USER_BLOCK_CHANGED] == [
+        {"user_id": 7, "blocked": True},
+        {"user_id": 7, "blocked": False},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_block_list_loads_snapshot_and_applies_changes():
+    uow = FakeUoW()
+    uow.blocked_users._ids = {1, 2}
+    block_list = InMemoryBlockList(fake_uow_factory(uow), resync_interval=3600)
+
+    await block_list.reload()
+    assert block_list.is_blocked(1) and block_list.is_blocked(2)
+
+    block_list.apply(2, False)
+    block_list.apply(3, True)
+    assert not block_list.is_blocked(2)
+    assert block_list.is_blocked(3)
+
+
+@pytest.mark.asyncio
+async def test_change_during_reload_survives_stale_snapshot():
+    uow = FakeUoW()
+    uow.blocked_users._ids = {1}
+    block_list = InMemoryBlockList(fake_uow_factory(uow), resync_interval=3600)
+
+    list_ids = uow.blocked_users.list_blocked_ids
+
+    async def snapshot_then_event() -> list[int]:
+        ids = await list_ids()
+        # Unblock arrives over Pub/Sub after the snapshot was read.
+        block_list.apply(1, False)
+        return ids
+
+    uow.blocked_users.list_blocked_ids = snapshot_then_event  # type: ignore[method-assign]
+    await block_list.reload()
+
+    assert not block_list.is_blocked(1)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from dataclasses import replace
+
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from chat_service.domain.value_objects.enums import ParticipantKind
 from chat_service.services import conversation_service
+from chat_service.infrastructure.cache.topic_directory import TopicDirectory
+from chat_service.infrastructure.db.repositories.conversation import ConversationWriterRepo
 from tests.conftest import FakeUoW, make_conversation
 
 
@@ -38,6 +43,40 @@ async def test_get_or_create_returns_existing(user_principal):
     assert uow._committed is False
 
 
+@pytest.mark.asyncio
+async def test_get_or_create_topic_is_idempotent():
+    uow = FakeUoW()
+
+    first, created = await conversation_service.get_or_create_topic_conversation(
+        "order", 7, 42, uow,
+    )
+    assert created is True
+    assert uow._committed is True
+    assert [r["event_type"] for r in uow.outbox._records] == ["chat.conversation_created"]
+
+    uow._committed = False
+    second, created = await conversation_service.get_or_create_topic_conversation(
+        "order", 7, 42, uow,
+    )
+    assert created is False
+    assert second.id == first.id
+    assert uow._committed is False
+    assert len(uow.participants._participants) == 1
+    assert len(uow.outbox._records) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_create_topic_fills_directory():
+    uow = FakeUoW()
+    directory = TopicDirectory(max_entries=10)
+
+    conv, _created = await conversation_service.get_or_create_topic_conversation(
+        "order", 9, 42, uow, directory=directory,
+    )
+
+    assert directory.get("order", 9) == conv.id
+
+
 @pytest.mark.asyncio
 async def test_list_user_conversations(user_principal):
     uow = FakeUoW()
@@ -50,3 +89,19 @@ async def test_list_user_conversations(user_principal):
     )
 
     assert len(result) == 2
+
+
+def test_support_slot_also_matches_rows_created_before_owner_user_id():
+    def sql(topic_type: str, topic_id: int | None) -> str:
+        stmt = ConversationWriterRepo._create_open_or_get_stmt(
+            replace(make_conversation(), topic_type=topic_type, topic_id=topic_id), 42,
+        )
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    support = sql("support", None)
+    # The insert is skipped while a legacy open row of the user exists, and
+    # the fallback branch returns that row.
+    assert support.count("conversations.owner_user_id IS NULL") == 2
+    assert support.count("participants.subject_id") == 2
+    assert "WHERE NOT (EXISTS" in support
+    assert "owner_user_id IS NULL" not in sql("order", 7)
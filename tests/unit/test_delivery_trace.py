@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from typing import Any
+
+import pytest
+from prometheus_client import REGISTRY
+
+from chat_service.api.v1.routers import ws as ws_router
+from chat_service.app import _on_pubsub_event
+from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubPublisher, RedisPubSubSubscriber
+from chat_service.infrastructure.bus.serializer import (
+    EventEnvelope,
+    decode_envelope,
+    encode_event,
+    encode_frame_event,
+    get_codec,
+)
+from chat_service.infrastructure.bus.trace import DeliveryTrace
+from chat_service.infrastructure.ws.manager import ConnectionManager
+from chat_service.infrastructure.ws.protocol import render_event_frame
+
+
+class _CapturingRedis:
+    def __init__(self) -> None:
+        self.published: list[bytes] = []
+
+    async def publish(self, channel: str, raw: bytes) -> None:
+        self.published.append(raw)
+
+
+class _FakeSocket:
+    def __init__(self) -> None:
+        self.frames: list[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, raw: str) -> None:
+        self.frames.append(raw)
+
+
+def _stage_count(stage: str) -> float:
+    return REGISTRY.get_sample_value("chat_delivery_stage_seconds_count", {"stage": stage}) or 0
+
+
+def test_lags_follow_pipeline_order_and_clamp_clock_skew():
+    trace = DeliveryTrace({"created": 100.0, "enqueued": 100.002, "fetched": 100.5, "published": 100.49})
+
+    assert dict(trace.lags()) == pytest.approx({"enqueued": 0.002, "fetched": 0.498, "published": 0.0})
+
+    trace.mark("written", 101.0)
+    assert trace.total() == pytest.approx(1.0)
+
+
+def test_stages_marked_in_process_use_the_monotonic_clock():
+    trace = DeliveryTrace()
+    trace.mark("received")
+    trace.stamps["received"] -= 3600  # wall clock stepped back meanwhile
+    trace.mark("dispatched")
+
+    assert 0 <= trace.lag("received", "dispatched") < 1
+
+
+@pytest.mark.parametrize("codec", [None, "json"])
+def test_trace_survives_every_envelope_form(codec: str | None):
+    stamps = {"created": 1.5, "published": 2.5}
+    payload = {"conversation_id": str(uuid.uuid4()), "body": "hi"}
+
+    envelopes = [
+        decode_envelope(encode_event("chat.message_created", payload, get_codec(codec or "legacy"), stamps)),
+        decode_envelope(encode_frame_event(
+            "chat.message_created", payload["conversation_id"],
+            render_event_frame("chat.message_created", payload), stamps,
+        )),
+    ]
+
+    for envelope in envelopes:
+        assert envelope.trace is not None
+        assert envelope.trace.stamps == stamps
+    assert decode_envelope(encode_event("x", payload)).trace is None
+
+
+def test_malformed_trace_is_ignored():
+    raw = b'{"event":"x","data":{},"trace":{"created":"soon","bogus":1,"published":3}}'
+
+    assert decode_envelope(raw).trace.stamps == {"published": 3.0}  # type: ignore[union-attr]
+    assert DeliveryTrace.from_wire([1, 2]) is None
+
+
+@pytest.mark.asyncio
+async def test_node_stamps_and_reports_delivery(monkeypatch: pytest.MonkeyPatch):
+    conversation_id = uuid.uuid4()
+    redis = _CapturingRedis()
+    publisher = RedisPubSubPublisher(redis)  # type: ignore[arg-type]
+    sent_at = time.time() - 0.05
+    await publisher.publish(
+        "chat.fanout",
+        {"event_type": "chat.message_created", "conversation_id": str(conversation_id)},
+        trace={"created": sent_at, "published": sent_at + 0.01},
+    )
+
+    delivered: list[EventEnvelope] = []
+
+    class _Redis:
+        def pubsub(self) -> Any:
+            return _PubSub()
+
+    class _PubSub:
+        async def subscribe(self, channel: str) -> None:
+            pass
+
+        async def listen(self) -> Any:
+            yield {"type": "message", "data": redis.published[0]}
+            await asyncio.Event().wait()
+
+        async def aclose(self) -> None:
+            pass
+
+    async def on_event(envelope: EventEnvelope) -> None:
+        delivered.append(envelope)
+
+    subscriber = RedisPubSubSubscriber(_Redis(), "chat.fanout", on_event)  # type: ignore[arg-type]
+    await subscriber.start()
+    for _ in range(200):
+        if delivered:
+            break
+        await asyncio.sleep(0.005)
+    await subscriber.stop()
+
+    envelope = delivered[0]
+    assert envelope.trace is not None
+    assert {"received", "dispatched"} <= envelope.trace.stamps.keys()
+
+    manager = ConnectionManager()
+    socket = _FakeSocket()
+    await manager.connect(socket, "user:1")  # type: ignore[arg-type]
+    manager.subscribe("user:1", conversation_id)
+    before_total, before_redis = _stage_count("total"), _stage_count("received")
+
+    monkeypatch.setattr(ws_router, "manager", manager)
+    await _on_pubsub_event(envelope)
+
+    assert len(socket.frames) == 1
+    assert "written" in envelope.trace.stamps
+    assert envelope.trace.total() == pytest.approx(time.time() - sent_at, abs=0.05)
+    assert _stage_count("total") == before_total + 1
+    assert _stage_count("received") == before_redis + 1
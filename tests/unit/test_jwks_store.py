@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from chat_service.infrastructure.auth.jwks_store import AsyncJWKSKeyStore
+from chat_service.infrastructure.auth.jwks_verifier import JWKSVerifier
+
+
+class JWKSServer:
+    """Local JWKS endpoint: serves ``keys``, counts requests, can fail or stall."""
+
+    def __init__(self) -> None:
+        self.private_keys: dict[str, Any] = {}
+        self.requests = 0
+        self.fail = False
+        self.delay = 0.0
+        self.max_age: int | None = None
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                server.requests += 1
+                time.sleep(server.delay)
+                if server.fail:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps({"keys": server.public_jwks()}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                if server.max_age is not None:
+                    self.send_header("Cache-Control", f"max-age={server.max_age}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/.well-known/jwks.json"
+
+    def add_key(self, kid: str) -> None:
+        self.private_keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def public_jwks(self) -> list[dict[str, Any]]:
+        keys = []
+        for kid, private in self.private_keys.items():
+            jwk = json.loads(RSAAlgorithm.to_jwk(private.public_key()))
+            keys.append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+        return keys
+
+    def token(self, kid: str, sub: int = 42) -> str:
+        return jwt.encode(
+            {"sub": str(sub), "kind": "user"}, self.private_keys[kid], algorithm="RS256",
+            headers={"kid": kid},
+        )
+
+    def __enter__(self) -> "JWKSServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def jwks_server() -> Iterator[JWKSServer]:
+    with JWKSServer() as server:
+        server.add_key("k1")
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refresh_is_single_flighted(jwks_server: JWKSServer):
+    store = AsyncJWKSKeyStore(jwks_server.url, min_refresh_interval=0)
+    await store.start()
+    verifier = JWKSVerifier(store)
+    assert (await verifier.verify(jwks_server.token("k1"))).subject_id == 42
+    assert jwks_server.requests == 1
+
+    # Key rotation: many requests with the new kid arrive while the fetch is slow.
+    jwks_server.add_key("k2")
+    jwks_server.delay = 0.1
+    token = jwks_server.token("k2", sub=7)
+    principals = await asyncio.gather(*(verifier.verify(token) for _ in range(20)))
+    await store.stop()
+
+    assert {p.subject_id for p in principals} == {7}
+    assert jwks_server.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_keys_are_served_while_endpoint_is_down(jwks_server: JWKSServer):
+    store = AsyncJWKSKeyStore(jwks_server.url, min_refresh_interval=0)
+    await store.start()
+    jwks_server.fail = True
+
+    with pytest.raises(Exception):
+        await store.refresh()
+    key = await store.get_key("k1")
+    with pytest.raises(jwt.PyJWKClientError):
+        await store.get_key("unknown")
+    await store.stop()
+
+    assert key.key_id == "k1"
+    assert store.stats.fetch_failures == 2
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_follows_max_age_and_rate_limits_unknown_kids(jwks_server: JWKSServer):
+    jwks_server.max_age = 1
+    store = AsyncJWKSKeyStore(jwks_server.url, min_refresh_interval=60)
+    await store.start()
+    jwks_server.add_key("k2")
+
+    # Within min_refresh_interval of the last fetch: no extra request.
+    with pytest.raises(jwt.PyJWKClientError):
+        await store.get_key("k2")
+    assert jwks_server.requests == 1
+
+    # The background refresh (at 80% of max-age) picks the new key up.
+    await asyncio.sleep(1.0)
+    assert (await store.get_key("k2")).key_id == "k2"
+    await store.stop()
+    assert jwks_server.requests == 2
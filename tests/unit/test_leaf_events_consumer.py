@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from functools import partial
+
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.services import conversation_service
+from chat_service.workers import leaf_events_consumer as consumer
+
+
+async def test_redelivered_status_change_posts_one_message_without_batch_mode():
+    store = MemoryStore()
+    uow_factory = partial(MemoryUoW, store)
+    async with uow_factory() as uow:
+        conversation, _ = await conversation_service.get_or_create_topic_conversation(
+            "order", 9001, 42, uow,
+        )
+    fields = {"event_type": "order.status_changed", "order_id": "9001", "status": "shipped"}
+
+    # The per-entry path, as the stream consumer calls it on a redelivery.
+    for _ in range(2):
+        await consumer._handle_event(uow_factory, "1700000000000-0", fields["event_type"], fields)
+
+    (message,) = store.messages.values()
+    assert message.conversation_id == conversation.id
+    assert message.client_msg_id == consumer._system_client_msg_id("1700000000000-0")
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import uuid
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from chat_service.application.dto.conversation import ConversationFilterDTO
+from chat_service.application.dto.principal import Principal
+from chat_service.application.dto.read_state import ReadMarkDTO
+from chat_service.domain.value_objects.enums import MessageType, ParticipantKind
+from chat_service.infrastructure.db.repositories._cursor import encode_cursor
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.services import conversation_service, message_service
+from tests.conftest import make_conversation, make_message
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store() -> MemoryStore:
+    return MemoryStore()
+
+
+async def _support(store: MemoryStore, user_id: int = 42):
+    async with MemoryUoW(store) as uow:
+        return await conversation_service.get_or_create_support_conversation(user_id, uow)
+
+
+async def test_create_open_or_get_returns_existing_open_conversation(store):
+    first = await _support(store)
+    second = await _support(store)
+
+    assert second.id == first.id
+    assert len(store.outbox) == 1
+    async with MemoryUoW(store) as uow:
+        assert await uow.participants.is_participant(first.id, ParticipantKind.USER, 42)
+        await uow.conversations_w.close(first.id)
+        await uow.commit()
+
+    assert (await _support(store)).id != first.id
+
+
+async def test_uncommitted_writes_roll_back(store):
+    conversation = await _support(store)
+
+    async with MemoryUoW(store) as uow:
+        msg = make_message(conversation_id=conversation.id)
+        await uow.messages_w.create_if_not_exists(msg)
+        await uow.conversations_w.touch_last_message_at(conversation.id, msg.created_at)
+        await uow.outbox.add("chat.message_created", {"conversation_id": str(conversation.id)})
+
+    assert store.messages == {}
+    assert store.timelines[conversation.id] == []
+    assert store.conversations[conversation.id].last_message_at is None
+    assert len(store.outbox_pending) == 1
+
+
+async def test_send_message_is_idempotent_per_client_msg_id(store):
+    conversation = await _support(store)
+    principal = Principal(kind=ParticipantKind.USER, subject_id=42, roles=[])
+    client_msg_id = uuid.uuid4()
+
+    async with MemoryUoW(store) as uow:
+        first, created = await message_service.send_message(
+            conversation.id, principal, client_msg_id, MessageType.TEXT, "hi", uow,
+        )
+    async with MemoryUoW(store) as uow:
+        again, created_again = await message_service.send_message(
+            conversation.id, principal, client_msg_id, MessageType.TEXT, "hi", uow,
+        )
+
+    assert created and not created_again
+    assert again.id == first.id
+    assert len(store.messages) == 1
+    assert store.conversations[conversation.id].last_message_at == first.created_at
+
+
+async def test_message_cursor_pages_in_timeline_order(store):
+    conversation = await _support(store)
+    messages = [
+        replace(
+            make_message(conversation_id=conversation.id),
+            created_at=T0 + timedelta(seconds=i // 2),
+        )
+        for i in range(7)
+    ]
+    async with MemoryUoW(store) as uow:
+        await uow.messages_w.create_many(messages)
+        await uow.commit()
+
+        seen = []
+        cursor = None
+        while page := await uow.messages.list_messages(conversation.id, cursor=cursor, limit=3):
+            seen += page
+            cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    expected = sorted(messages, key=lambda m: (m.created_at, m.id))
+    assert [m.id for m in seen] == [m.id for m in expected]
+
+
+async def test_admin_listing_orders_by_activity_and_pages_by_cursor(store):
+    conversations = [make_conversation() for _ in range(5)]
+    async with MemoryUoW(store) as uow:
+        for i, conversation in enumerate(conversations):
+            await uow.conversations_w.create(conversation)
+            if i < 4:
+                await uow.conversations_w.touch_last_message_at(
+                    conversation.id, T0 + timedelta(minutes=i % 2),
+                )
+        await uow.commit()
+
+        first = await uow.conversations.list_for_admin(ConversationFilterDTO(limit=3))
+        rest = await uow.conversations.list_for_admin(ConversationFilterDTO(
+            limit=3,
+            cursor=encode_cursor(first[-1].last_message_at, first[-1].id, descending=True),
+        ))
+
+    latest = sorted((c.id for c in conversations[1:4:2]))
+    earlier = sorted((c.id for c in conversations[0:4:2]))
+    assert [c.id for c in first] == latest + earlier[:1]
+    # As in SQL, a cursor never reaches conversations without messages.
+    assert [c.id for c in rest] == earlier[1:]
+    assert conversations[4].id not in {c.id for c in first + rest}
+
+
+async def test_read_state_only_moves_forward(store):
+    conversation = await _support(store)
+    older = replace(make_message(conversation_id=conversation.id), created_at=T0)
+    newer = replace(
+        make_message(conversation_id=conversation.id), created_at=T0 + timedelta(seconds=1),
+    )
+    stranger = ReadMarkDTO(conversation.id, ParticipantKind.USER, 7, newer.id)
+    async with MemoryUoW(store) as uow:
+        await uow.messages_w.create_many([older, newer])
+        mark = ReadMarkDTO(conversation.id, ParticipantKind.USER, 42, newer.id)
+        assert await uow.read_state_w.upsert_last_read_many([mark, stranger]) == 1
+        backwards = replace(mark, last_message_id=older.id)
+        assert await uow.read_state_w.upsert_last_read_many([backwards]) == 0
+        await uow.commit()
+
+    state = store.read_state[(conversation.id, ParticipantKind.USER, 42)]
+    assert state.last_read_message_id == newer.id
+
+
+async def test_outbox_fetch_claims_and_retries(store):
+    async with MemoryUoW(store) as uow:
+        await uow.outbox.add_many("e", [{"n": 1}, {"n": 2}])
+        await uow.commit()
+
+    async with MemoryUoW(store) as uow:
+        batch = await uow.outbox.fetch_pending(10)
+        await uow.outbox.mark_sent([batch[0].id])
+        await uow.outbox.mark_failed(batch[1].id, datetime.now(timezone.utc) + timedelta(minutes=1))
+        await uow.commit()
+
+    async with MemoryUoW(store) as uow:
+        assert await uow.outbox.count_pending() == 1
+        assert await uow.outbox.fetch_pending(10) == []
+    assert list(store.outbox) == [batch[1].id]
@@ -4,10 +4,12 @@ import uuid
 
 import pytest
 
+from chat_service.application.dto.message import SendMessageDTO
+from chat_service.application.exceptions import ForbiddenError, RateLimitedError
 from chat_service.domain.entities.participant import Participant
 from chat_service.domain.value_objects.enums import MessageType, ParticipantKind
 from chat_service.services import message_service
-from tests.conftest import FakeUoW, make_conversation
+from tests.conftest import FakeIdempotencyCache, FakeUoW, make_conversation
 
 
 @pytest.fixture
@@ -78,7 +80,7 @@ async def test_send_message_writes_outbox(user_principal, uow_with_conversation)
 async def test_send_message_forbidden_for_non_participant():
     """A regular user who is NOT a participant must be rejected."""
     from chat_service.application.dto.principal import Principal
-    from chat_service.application.exceptions import ForbiddenError
+    from chat_service.application.exceptions import ForbiddenError, RateLimitedError
 
     stranger = Principal(kind=ParticipantKind.USER, subject_id=999, roles=[])
     uow = FakeUoW()
@@ -89,3 +91,211 @@ async def test_send_message_forbidden_for_non_participant():
         await message_service.send_message(
             conv.id, stranger, uuid.uuid4(), MessageType.TEXT, "hi", uow,
         )
+
+
+@pytest.mark.asyncio
+async def test_send_message_populates_idempotency_cache(user_principal, uow_with_conversation):
+    uow, conv = uow_with_conversation
+    cache = FakeIdempotencyCache()
+    client_msg_id = uuid.uuid4()
+
+    msg, created = await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hello", uow,
+        idempotency=cache,
+    )
+
+    assert created is True
+    cached = await cache.get(conv.id, user_principal.kind.value, user_principal.subject_id, client_msg_id)
+    assert cached == msg
+
+
+@pytest.mark.asyncio
+async def test_send_message_duplicate_served_from_cache(user_principal, uow_with_conversation):
+    uow, conv = uow_with_conversation
+    cache = FakeIdempotencyCache()
+    client_msg_id = uuid.uuid4()
+
+    msg1, _ = await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hello", uow,
+        idempotency=cache,
+    )
+
+    async def _boom(msg):
+        raise AssertionError("retry reached the message insert")
+
+    uow.messages_w.create_if_not_exists = _boom  # type: ignore[method-assign]
+    msg2, created2 = await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hello", uow,
+        idempotency=cache,
+    )
+
+    assert created2 is False
+    assert msg2.id == msg1.id
+
+
+@pytest.mark.asyncio
+async def test_cached_retry_still_requires_access(user_principal, uow_with_conversation):
+    uow, conv = uow_with_conversation
+    cache = FakeIdempotencyCache()
+    client_msg_id = uuid.uuid4()
+    await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hello", uow,
+        idempotency=cache,
+    )
+
+    uow.participants._participants.clear()
+    with pytest.raises(ForbiddenError):
+        await message_service.send_message(
+            conv.id, user_principal, client_msg_id, MessageType.TEXT, "hello", uow,
+            idempotency=cache,
+        )
+
+
+@pytest.mark.asyncio
+async def test_send_system_messages_batches_and_skips_duplicates(admin_principal):
+    uow = FakeUoW()
+    conv = make_conversation()
+    uow.conversations._store[conv.id] = conv
+    items = [
+        SendMessageDTO(conversation_id=conv.id, client_msg_id=uuid.uuid4(), type=MessageType.SYSTEM, body=f"s{i}")
+        for i in range(3)
+    ]
+
+    created = await message_service.send_system_messages(items, admin_principal, uow)
+    assert [m.body for m in created] == ["s0", "s1", "s2"]
+    assert created[0].created_at < created[1].created_at < created[2].created_at
+    assert len(uow.outbox._records) == 3
+    assert uow._committed is True
+
+    uow._committed = False
+    assert await message_service.send_system_messages(items, admin_principal, uow) == []
+    assert uow._committed is False
+
+
+class _Blocked:
+    def __init__(self, *ids: int) -> None:
+        self._ids = set(ids)
+
+    def is_blocked(self, user_id: int) -> bool:
+        return user_id in self._ids
+
+
+@pytest.mark.asyncio
+async def test_send_message_rejects_blocked_user_without_io(user_principal):
+    uow = FakeUoW()
+
+    with pytest.raises(ForbiddenError):
+        await message_service.send_message(
+            uuid.uuid4(), user_principal, uuid.uuid4(), MessageType.TEXT, "hi", uow,
+            block_list=_Blocked(user_principal.subject_id),
+        )
+    assert uow.messages._messages == []
+
+
+@pytest.mark.asyncio
+async def test_block_list_does_not_apply_to_admins(admin_principal):
+    uow = FakeUoW()
+    conv = make_conversation()
+    uow.conversations._store[conv.id] = conv
+
+    _msg, created = await message_service.send_message(
+        conv.id, admin_principal, uuid.uuid4(), MessageType.TEXT, "hi", uow,
+        block_list=_Blocked(admin_principal.subject_id),
+    )
+    assert created is True
+
+
+class _Exhausted:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def acquire(self, principal_key: str, conversation_id: uuid.UUID) -> float | None:
+        self.calls.append(principal_key)
+        return 2.5
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_send_writes_nothing(user_principal, uow_with_conversation):
+    uow, conv = uow_with_conversation
+    limiter = _Exhausted()
+
+    with pytest.raises(RateLimitedError) as exc_info:
+        await message_service.send_message(
+            conv.id, user_principal, uuid.uuid4(), MessageType.TEXT, "hi", uow,
+            rate_limiter=limiter,
+        )
+    assert exc_info.value.retry_after == 2.5
+    assert limiter.calls == [user_principal.principal_key]
+    assert uow.messages._messages == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_skips_admins_and_cached_retries(
+    user_principal, admin_principal, uow_with_conversation,
+):
+    uow, conv = uow_with_conversation
+    cache = FakeIdempotencyCache()
+    limiter = _Exhausted()
+    client_msg_id = uuid.uuid4()
+
+    msg, _created = await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hi", uow, idempotency=cache,
+    )
+    cached, created = await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hi", uow,
+        idempotency=cache, rate_limiter=limiter,
+    )
+    assert (cached.id, created) == (msg.id, False)
+
+    _msg, created = await message_service.send_message(
+        conv.id, admin_principal, uuid.uuid4(), MessageType.TEXT, "hi", uow,
+        rate_limiter=limiter,
+    )
+    assert created is True
+    assert limiter.calls == []
+
+
+@pytest.mark.asyncio
+async def test_send_system_message_skips_lookup_and_access_check(admin_principal):
+    uow = FakeUoW()
+    conversation_id = uuid.uuid4()  # not in the reader: no lookup happens
+    client_msg_id = uuid.uuid4()
+
+    msg, created = await message_service.send_system_message(
+        conversation_id, "Заказ отправлен", admin_principal, uow, client_msg_id=client_msg_id,
+    )
+    assert created is True
+    assert msg.type == MessageType.SYSTEM
+    assert uow.outbox._records[0]["event_type"] == "chat.message_created"
+
+    _again, created = await message_service.send_system_message(
+        conversation_id, "Заказ отправлен", admin_principal, uow, client_msg_id=client_msg_id,
+    )
+    assert created is False
+
+
+class RecordingPhases:
+    def __init__(self) -> None:
+        self.phases: list[str] = []
+
+    def observe(self, phase: str, seconds: float) -> None:
+        assert seconds >= 0
+        self.phases.append(phase)
+
+
+@pytest.mark.asyncio
+async def test_send_message_reports_db_phases(user_principal, uow_with_conversation):
+    uow, conv = uow_with_conversation
+    phases = RecordingPhases()
+    client_msg_id = uuid.uuid4()
+
+    await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hi", uow, phases=phases,
+    )
+    assert phases.phases == ["access", "insert", "touch", "outbox", "commit", "total"]
+
+    phases.phases.clear()
+    await message_service.send_message(
+        conv.id, user_principal, client_msg_id, MessageType.TEXT, "hi", uow, phases=phases,
+    )
+    assert phases.phases == ["access", "insert", "total"]
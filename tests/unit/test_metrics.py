@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from prometheus_client import REGISTRY
+
+from chat_service.infrastructure.bus.redis_streams import StreamConsumerStats
+from chat_service.infrastructure.cache.topic_directory import TopicDirectory
+from chat_service.infrastructure.metrics import (
+    render_latest,
+    send_message_phases,
+    track_stream_consumer,
+    track_topic_directory,
+)
+
+
+class _Consumer:
+    def __init__(self) -> None:
+        self.stats = StreamConsumerStats()
+
+
+def test_phase_timer_feeds_labelled_histogram():
+    before = REGISTRY.get_sample_value("chat_send_message_seconds_count", {"phase": "commit"}) or 0
+
+    send_message_phases.observe("commit", 0.002)
+
+    assert REGISTRY.get_sample_value("chat_send_message_seconds_count", {"phase": "commit"}) == before + 1
+
+
+def test_stats_objects_are_read_at_scrape_time():
+    consumer = _Consumer()
+    directory = TopicDirectory(10)
+    track_stream_consumer(consumer, "leaf.events.test")  # type: ignore[arg-type]
+    track_topic_directory(directory)
+
+    consumer.stats.processed = 7
+    consumer.stats.group_lag = 3
+    directory.get("order", 1)
+
+    labels = {"stream": "leaf.events.test"}
+    assert REGISTRY.get_sample_value("chat_stream_processed_total", labels) == 7
+    assert REGISTRY.get_sample_value("chat_stream_group_lag", labels) == 3
+    assert REGISTRY.get_sample_value("chat_topic_directory_misses_total") == 1
+    assert b"chat_stream_in_flight" in render_latest()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.testclient import TestClient
+
+from chat_service.api.middleware.correlation_id import HEADER, CorrelationIdMiddleware, correlation_id_ctx
+from chat_service.api.middleware.metrics import RequestTimingMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestTimingMiddleware)
+    app.add_middleware(CorrelationIdMiddleware)
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"rid": correlation_id_ctx.get()}
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for i in range(3):
+                yield f"{i}\n".encode()
+
+        return StreamingResponse(chunks())
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket) -> None:
+        await websocket.accept()
+        await websocket.send_json(
+            {"ctx": correlation_id_ctx.get(), "state": websocket.state.correlation_id}
+        )
+        await websocket.close(code=1000)
+
+    return app
+
+
+def test_http_request_id_is_propagated_and_generated(caplog: pytest.LogCaptureFixture):
+    client = TestClient(_app())
+    caplog.set_level(logging.INFO, logger="chat_service.api.middleware.metrics")
+
+    response = client.get("/ping", headers={HEADER: "abc-123"})
+    generated = client.get("/ping")
+
+    assert response.headers[HEADER] == "abc-123"
+    assert response.json() == {"rid": "abc-123"}
+    assert generated.headers[HEADER] == generated.json()["rid"] != ""
+    assert any("GET /ping 200" in r.getMessage() and "rid=abc-123" in r.getMessage() for r in caplog.records)
+
+
+def test_streaming_responses_pass_through():
+    response = TestClient(_app()).get("/stream", headers={HEADER: "s-1"})
+
+    assert response.text == "0\n1\n2\n"
+    assert response.headers[HEADER] == "s-1"
+
+
+def test_websocket_session_gets_correlation_id(caplog: pytest.LogCaptureFixture):
+    caplog.set_level(logging.INFO, logger="chat_service.api.middleware.metrics")
+    client = TestClient(_app())
+
+    with client.websocket_connect("/ws", headers={HEADER: "ws-7"}) as ws:
+        assert ws.receive_json() == {"ctx": "ws-7", "state": "ws-7"}
+
+    assert any("WS /ws session" in r.getMessage() and "rid=ws-7" in r.getMessage() for r in caplog.records)
+
+
+def test_invalid_request_id_is_replaced():
+    response = TestClient(_app()).get("/ping", headers={HEADER: "x" * 500})
+
+    assert response.headers[HEADER] != "x" * 500
+    assert len(response.json()["rid"]) == 32
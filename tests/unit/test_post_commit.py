@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import timedelta
+from functools import partial
+from types import SimpleNamespace
+
+from chat_service.api.v1.routers import ws as ws_router
+from chat_service.app import _on_pubsub_event
+from chat_service.infrastructure.bus.dedup import RecentIds
+from chat_service.infrastructure.bus.post_commit import PostCommitPublisher
+from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubPublisher
+from chat_service.infrastructure.bus.serializer import (
+    decode_envelope,
+    encode_event,
+    encode_frame_event,
+    get_codec,
+)
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.infrastructure.ws.manager import ConnectionManager
+from chat_service.infrastructure.ws.protocol import render_event_frame
+from chat_service.services import conversation_service
+
+
+class _Redis:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.published: list[bytes] = []
+
+    async def publish(self, channel: str, raw: bytes) -> None:
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.published.append(raw)
+
+
+class _FakeSocket:
+    def __init__(self, app: object | None = None) -> None:
+        self.app = app
+        self.frames: list[str] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        self.frames.append(text)
+
+
+def _post_commit(store: MemoryStore, redis: _Redis) -> PostCommitPublisher:
+    publisher = RedisPubSubPublisher(redis, get_codec("json"))  # type: ignore[arg-type]
+    return PostCommitPublisher(
+        publisher, "chat.fanout", lambda: MemoryUoW(store), flush_interval=60,
+    )
+
+
+def test_event_id_round_trips_in_every_form():
+    frame = render_event_frame("e", {"n": 1})
+    for raw in (
+        encode_event("e", {"n": 1}, None, event_id=7),
+        encode_event("e", {"n": 1}, get_codec("json"), event_id=7),
+        encode_frame_event("e", None, frame, event_id=7),
+    ):
+        assert decode_envelope(raw).event_id == 7
+    assert decode_envelope(encode_event("e", {"n": 1}, get_codec("json"))).event_id is None
+
+
+async def test_commit_publishes_added_records_and_acks_them():
+    store, redis = MemoryStore(), _Redis()
+    post_commit = _post_commit(store, redis)
+
+    async with MemoryUoW(store, post_commit=post_commit) as uow:
+        first = await uow.outbox.add("e", {"n": 1})
+        await uow.outbox.add_many("e", [{"n": 2}])
+        assert redis.published == []
+        await uow.commit()
+
+    envelopes = [decode_envelope(raw) for raw in redis.published]
+    assert [e.event_id for e in envelopes] == [first, first + 1]
+    assert envelopes[0].data == {"event_type": "e", "n": 1}
+    assert post_commit.pending_acks == 2
+    assert len(store.outbox_pending) == 2
+
+    assert await post_commit.flush() == 2
+    assert store.outbox_pending == []
+    assert post_commit.stats.acked == 2
+
+
+async def test_rolled_back_and_failed_records_are_left_to_the_worker():
+    store, redis = MemoryStore(), _Redis(fail=True)
+    post_commit = _post_commit(store, redis)
+
+    async with MemoryUoW(store, post_commit=post_commit) as uow:
+        await uow.outbox.add("e", {"n": 1})
+    async with MemoryUoW(store, post_commit=post_commit) as uow:
+        record_id = await uow.outbox.add("e", {"n": 2})
+        await uow.commit()
+
+    assert post_commit.stats.failed == 1
+    assert post_commit.pending_acks == 0
+    assert store.outbox_pending == [record_id]
+
+    # The worker skips it until the grace period has passed.
+    async with MemoryUoW(store) as uow:
+        assert await uow.outbox.fetch_pending(10, min_age=5.0) == []
+    store.outbox[record_id].created_at -= timedelta(seconds=6)
+    async with MemoryUoW(store) as uow:
+        assert [r.id for r in await uow.outbox.fetch_pending(10, min_age=5.0)] == [record_id]
+
+
+async def test_new_conversation_event_is_published_on_commit():
+    store, redis = MemoryStore(), _Redis()
+    post_commit = _post_commit(store, redis)
+
+    async with MemoryUoW(store, post_commit=post_commit, outbox_frames=True) as uow:
+        conversation, _ = await conversation_service.get_or_create_topic_conversation(
+            "order", 7, 42, uow,
+        )
+
+    (envelope,) = [decode_envelope(raw) for raw in redis.published]
+    assert envelope.event_type == conversation_service.CONVERSATION_CREATED
+    assert envelope.data["conversation_id"] == str(conversation.id)
+    assert envelope.frame is not None
+    assert post_commit.pending_acks == 1
+
+
+async def test_nodes_deliver_each_event_id_once(monkeypatch):
+    conversation_id = uuid.uuid4()
+    manager = ConnectionManager()
+    socket = _FakeSocket()
+    await manager.connect(socket, "user:1")  # type: ignore[arg-type]
+    manager.subscribe("user:1", conversation_id)
+    monkeypatch.setattr(ws_router, "manager", manager)
+    seen = RecentIds(2)
+    payload = {"conversation_id": str(conversation_id)}
+
+    for event_id in (1, 1, 2, 3, 1):
+        raw = encode_event("e", payload, get_codec("json"), event_id=event_id)
+        await _on_pubsub_event(decode_envelope(raw), seen=seen)
+    await _on_pubsub_event(decode_envelope(encode_event("e", payload)), seen=seen)
+
+    # 1 was evicted by 2 and 3 before its last copy; events without an id always pass.
+    assert len(socket.frames) == 5
+    assert seen.duplicates == 1
+
+
+async def test_ws_sender_gets_its_message_once_via_the_bus_and_retries_are_echoed(
+    monkeypatch, user_principal,
+):
+    store, redis = MemoryStore(), _Redis()
+    uow_factory = partial(MemoryUoW, store, post_commit=_post_commit(store, redis))
+    async with uow_factory() as uow:
+        conversation = await conversation_service.get_or_create_support_conversation(42, uow)
+    redis.published.clear()
+    manager = ConnectionManager()
+    monkeypatch.setattr(ws_router, "manager", manager)
+    sender = _FakeSocket(SimpleNamespace(state=SimpleNamespace(uow_factory=uow_factory)))
+    await manager.connect(sender, "user:42")  # type: ignore[arg-type]
+    manager.subscribe("user:42", conversation.id)
+    client_msg_id = str(uuid.uuid4())
+    send = {"conversation_id": str(conversation.id), "client_msg_id": client_msg_id, "body": "hi"}
+
+    await ws_router._handle_send(sender, user_principal, send)  # type: ignore[arg-type]
+    assert sender.frames == []
+    (raw,) = redis.published
+    await _on_pubsub_event(decode_envelope(raw))
+    (echo,) = [json.loads(frame) for frame in sender.frames]
+    assert echo["type"] == "chat.message_created"
+    assert echo["data"]["client_msg_id"] == client_msg_id
+
+    # A retry stores and publishes nothing, but the sender still gets its message.
+    await ws_router._handle_send(sender, user_principal, send)  # type: ignore[arg-type]
+    assert len(redis.published) == 1
+    retry_echo = json.loads(sender.frames[-1])
+    assert retry_echo["type"] == "chat.message_created"
+    assert retry_echo["data"]["message_id"] == echo["data"]["message_id"]
+    assert retry_echo["data"]["client_msg_id"] == client_msg_id
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import uuid
+
+from chat_service.application.policies.rate_limit import RateLimit, TokenBuckets
+from chat_service.infrastructure.cache.rate_limiter import TieredRateLimiter
+
+CONVERSATION = uuid.uuid4()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FakeWindow:
+    """Fixed per-key allowance standing in for the Redis sliding window."""
+
+    def __init__(self, allowance: int, retry_after: float = 4.0) -> None:
+        self.allowance = allowance
+        self.retry_after = retry_after
+        self.calls: list[list[str]] = []
+        self.granted: dict[str, int] = {}
+        self.fail = False
+
+    async def acquire(self, requests):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.calls.append([key for key, _, _ in requests])
+        out = []
+        for key, _limit, wanted in requests:
+            granted = min(wanted, self.allowance - self.granted.get(key, 0))
+            self.granted[key] = self.granted.get(key, 0) + granted
+            out.append((granted, 0.0 if granted else self.retry_after))
+        return out
+
+
+def _limiter(window: _FakeWindow | None, clock: _Clock, **overrides) -> TieredRateLimiter:
+    options = {
+        "per_principal": RateLimit(100, 10.0),
+        "per_conversation": RateLimit(0, 10.0),
+        "burst": 100,
+        "lease": 5,
+    }
+    options.update(overrides)
+    return TieredRateLimiter(window, clock=clock, **options)
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    buckets = TokenBuckets(rate=2.0, capacity=3)
+    for _ in range(3):
+        assert buckets.wait_time("k", 0.0) == 0.0
+        buckets.take("k", 0.0)
+
+    assert buckets.wait_time("k", 0.0) == 0.5
+    assert buckets.wait_time("k", 0.5) == 0.0
+    assert buckets.wait_time("other", 0.0) == 0.0
+
+
+def test_token_buckets_drop_least_recently_used_keys():
+    buckets = TokenBuckets(rate=1.0, capacity=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        buckets.take(key, 0.0)
+
+    assert len(buckets) == 2
+    assert buckets.wait_time("a", 0.0) == 0.0
+
+
+async def test_local_tier_rejects_bursts_without_io():
+    clock, window = _Clock(), _FakeWindow(allowance=100)
+    limiter = _limiter(window, clock, per_principal=RateLimit(10, 10.0), burst=3, lease=3)
+
+    assert [await limiter.acquire("user:1", CONVERSATION) for _ in range(3)] == [None] * 3
+    assert await limiter.acquire("user:1", CONVERSATION) == 1.0
+    assert len(window.calls) == 1
+    assert limiter.stats.local_rejections == 1
+
+    clock.now += 1.0
+    assert await limiter.acquire("user:1", CONVERSATION) is None
+
+
+async def test_cluster_permits_are_leased_in_batches():
+    clock, window = _Clock(), _FakeWindow(allowance=12)
+    limiter = _limiter(window, clock, per_conversation=RateLimit(100, 10.0))
+
+    results = [await limiter.acquire("user:1", CONVERSATION) for _ in range(13)]
+
+    assert results[:12] == [None] * 12
+    assert results[12] == 4.0
+    # Two keys per call, one call per five sends; the last two carry the short lease.
+    assert len(window.calls) == 4
+    assert window.calls[0] == ["p:user:1", f"c:{CONVERSATION}"]
+    assert limiter.stats.cluster_rejections == 1
+
+
+async def test_unused_leases_lapse_after_the_window():
+    clock, window = _Clock(), _FakeWindow(allowance=100)
+    limiter = _limiter(window, clock)
+
+    await limiter.acquire("user:1", CONVERSATION)
+    clock.now += 10.0
+    await limiter.acquire("user:1", CONVERSATION)
+
+    assert len(window.calls) == 2
+
+
+async def test_redis_outage_falls_back_to_the_local_tier():
+    clock, window = _Clock(), _FakeWindow(allowance=0)
+    window.fail = True
+    limiter = _limiter(window, clock, per_principal=RateLimit(10, 10.0), burst=2)
+
+    assert await limiter.acquire("user:1", CONVERSATION) is None
+    assert await limiter.acquire("user:1", CONVERSATION) is None
+    assert await limiter.acquire("user:1", CONVERSATION) is not None
+    assert limiter.stats.window_errors == 2
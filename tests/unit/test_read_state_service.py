@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+import pytest
+
+from chat_service.domain.value_objects.enums import ParticipantKind
+from chat_service.infrastructure.memory.store import MemoryStore
+from chat_service.infrastructure.memory.uow import MemoryUoW
+from chat_service.services import conversation_service, read_state_service
+from chat_service.services.read_state_service import ReadStateBuffer
+from tests.conftest import FakeUoW, make_message
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _factory(uow: FakeUoW):
+    @asynccontextmanager
+    async def _open():
+        yield uow
+
+    return _open
+
+
+@pytest.mark.asyncio
+async def test_mark_read_requires_participant(user_principal):
+    from chat_service.application.exceptions import NotFoundError
+
+    with pytest.raises(NotFoundError):
+        await read_state_service.mark_read(uuid.uuid4(), user_principal, uuid.uuid4(), FakeUoW())
+
+
+@pytest.mark.asyncio
+async def test_buffer_hands_each_distinct_mark_over_once(user_principal, admin_principal):
+    uow = FakeUoW()
+    buffer = ReadStateBuffer(_factory(uow), flush_interval=60)
+    conv_id = uuid.uuid4()
+    first, latest = uuid.uuid4(), uuid.uuid4()
+
+    buffer.add(conv_id, user_principal, first)
+    buffer.add(conv_id, user_principal, latest)
+    buffer.add(conv_id, user_principal, first)
+    buffer.add(conv_id, admin_principal, first)
+    assert buffer.pending == 2
+
+    await buffer.flush()
+
+    assert sorted(uow.read_state_w._states) == sorted([
+        (conv_id, "user", 42, first),
+        (conv_id, "user", 42, latest),
+        (conv_id, "admin", admin_principal.subject_id, first),
+    ])
+    assert uow._committed is True
+    assert buffer.pending == 0
+
+
+async def test_buffer_keeps_the_newest_mark_when_a_stale_one_arrives_last(user_principal):
+    store = MemoryStore()
+    async with MemoryUoW(store) as uow:
+        conversation = await conversation_service.get_or_create_support_conversation(42, uow)
+    older = replace(make_message(conversation_id=conversation.id), created_at=T0)
+    newer = replace(
+        make_message(conversation_id=conversation.id), created_at=T0 + timedelta(seconds=1),
+    )
+    async with MemoryUoW(store) as uow:
+        await uow.messages_w.create_many([older, newer])
+        await uow.commit()
+    buffer = ReadStateBuffer(partial(MemoryUoW, store), flush_interval=60)
+
+    buffer.add(conversation.id, user_principal, newer.id)
+    buffer.add(conversation.id, user_principal, older.id)
+
+    assert await buffer.flush() == 1
+    state = store.read_state[(conversation.id, ParticipantKind.USER, 42)]
+    assert state.last_read_message_id == newer.id
+
+
+@pytest.mark.asyncio
+async def test_buffer_requeues_failed_flush(user_principal):
+    uow = FakeUoW()
+
+    async def _boom(marks):
+        raise RuntimeError("db down")
+
+    uow.read_state_w.upsert_last_read_many = _boom  # type: ignore[method-assign]
+    buffer = ReadStateBuffer(_factory(uow), flush_interval=60)
+    conv_id = uuid.uuid4()
+    buffer.add(conv_id, user_principal, uuid.uuid4())
+
+    assert await buffer.flush() == 0
+    assert buffer.pending == 1
+
+
+@pytest.mark.asyncio
+async def test_buffer_drains_on_stop(user_principal):
+    uow = FakeUoW()
+    buffer = ReadStateBuffer(_factory(uow), flush_interval=60)
+    await buffer.start()
+    buffer.add(uuid.uuid4(), user_principal, uuid.uuid4())
+
+    await buffer.stop()
+
+    assert len(uow.read_state_w._states) == 1
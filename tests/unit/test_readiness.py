@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from chat_service.api.v1.routers import health
+from chat_service.infrastructure.readiness import EVENT_LOOP, ReadinessProber, pubsub_probe
+
+
+class _CountingProbe:
+    def __init__(self, error: Exception | None = None, delay: float = 0.0) -> None:
+        self.calls = 0
+        self._error = error
+        self._delay = delay
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+
+
+async def test_round_reports_each_dependency():
+    prober = ReadinessProber(
+        {
+            "redis": _CountingProbe(),
+            "postgres": _CountingProbe(ConnectionError("refused")),
+            "slow": _CountingProbe(delay=1.0),
+        },
+        timeout=0.05,
+    )
+
+    await prober.probe()
+
+    body = prober.snapshot()
+    assert not prober.ready
+    assert body["status"] == "unavailable"
+    assert body["checks"]["redis"]["ok"] is True
+    assert body["checks"]["postgres"] == {
+        "ok": False, "latency_ms": body["checks"]["postgres"]["latency_ms"], "error": "refused",
+    }
+    assert body["checks"]["slow"]["error"] == "timed out"
+    assert body["checks"][EVENT_LOOP]["ok"] is True
+
+
+async def test_loop_lag_and_stale_results_make_the_node_unready():
+    prober = ReadinessProber({"redis": _CountingProbe()}, max_loop_lag=0.1, stale_after=60)
+    await prober.probe()
+    assert prober.ready
+
+    prober.loop_lag = 0.25
+    await prober.probe()
+    assert not prober.ready
+    assert prober.snapshot()["checks"][EVENT_LOOP]["latency_ms"] == 250.0
+
+    prober.loop_lag = 0.0
+    await prober.probe()
+    assert prober.checked_at is not None
+    prober.checked_at -= 61
+    assert not prober.ready
+    assert prober.snapshot()["error"] == "readiness status is stale"
+
+
+async def test_pubsub_probe_requires_live_subscription():
+    subscriber = SimpleNamespace(running=True, subscribed=False)
+    probe = pubsub_probe(subscriber)  # type: ignore[arg-type]
+
+    with pytest.raises(RuntimeError, match="not subscribed"):
+        await probe()
+    subscriber.subscribed = True
+    await probe()
+    subscriber.running = False
+    with pytest.raises(RuntimeError, match="exited"):
+        await probe()
+
+
+def test_readyz_serves_the_cached_status_without_probing():
+    probe = _CountingProbe()
+    prober = ReadinessProber({"redis": probe})
+    asyncio.run(prober.probe())
+    app = FastAPI()
+    app.include_router(health.router)
+    app.state.readiness = prober
+
+    with TestClient(app) as client:
+        responses = [client.get("/readyz") for _ in range(5)]
+
+    assert probe.calls == 1
+    assert all(r.status_code == 200 for r in responses)
+    assert responses[0].json()["status"] == "ready"
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from chat_service.infrastructure.bus.redis_pubsub import RedisPubSubSubscriber, conversation_key
+from chat_service.infrastructure.bus.serializer import EventEnvelope, serialize_event
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakePubSubRedis") -> None:
+        self._redis = redis
+
+    async def subscribe(self, channel: str) -> None:
+        self._redis.subscribes += 1
+        if self._redis.fail_subscribes:
+            self._redis.fail_subscribes -= 1
+            raise ConnectionError("connection refused")
+
+    async def listen(self) -> Any:
+        while True:
+            item = await self._redis.messages.get()
+            if isinstance(item, Exception):
+                raise item
+            yield {"type": "message", "data": item}
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakePubSubRedis:
+    def __init__(self) -> None:
+        self.messages: asyncio.Queue[Any] = asyncio.Queue()
+        self.subscribes = 0
+        self.fail_subscribes = 0
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    def publish(self, event_type: str, payload: dict[str, Any]) -> None:
+        self.messages.put_nowait(serialize_event(event_type, payload))
+
+
+async def _wait_for(predicate: Any, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_slow_callback_does_not_block_listener_and_overflow_is_dropped():
+    redis = FakePubSubRedis()
+    release = asyncio.Event()
+    entered = asyncio.Event()
+    seen: list[str] = []
+
+    async def callback(envelope: EventEnvelope) -> None:
+        entered.set()
+        await release.wait()
+        seen.append(envelope.data["n"])
+
+    subscriber = RedisPubSubSubscriber(redis, "ch", callback, queue_size=2)
+    await subscriber.start()
+    redis.publish("chat.message_created", {"n": "0"})
+    await asyncio.wait_for(entered.wait(), 1)
+    for n in range(1, 5):
+        redis.publish("chat.message_created", {"n": str(n)})
+
+    # The listener keeps draining the socket while the callback is stuck.
+    await _wait_for(lambda: subscriber.stats.received == 5)
+    # One event is held by the dispatcher, two wait in the queue.
+    assert subscriber.stats.dropped == 2
+
+    release.set()
+    await _wait_for(lambda: subscriber.stats.dispatched == 3)
+    await subscriber.stop()
+    assert seen == ["0", "1", "2"]
+    assert subscriber.stats.max_queue_lag_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_dispatchers_keep_per_conversation_order():
+    redis = FakePubSubRedis()
+    seen: dict[str, list[int]] = {}
+
+    async def callback(envelope: EventEnvelope) -> None:
+        data = envelope.data
+        await asyncio.sleep(0.001 * (data["n"] % 3))
+        seen.setdefault(data["conversation_id"], []).append(data["n"])
+
+    subscriber = RedisPubSubSubscriber(
+        redis, "ch", callback, dispatchers=4, partition_key=conversation_key,
+    )
+    await subscriber.start()
+    for n in range(30):
+        redis.publish("chat.message_created", {"conversation_id": f"c{n % 3}", "n": n})
+    await _wait_for(lambda: subscriber.stats.dispatched == 30)
+    await subscriber.stop()
+
+    for conv, numbers in seen.items():
+        assert numbers == sorted(numbers), conv
+
+
+@pytest.mark.asyncio
+async def test_resubscribes_with_backoff_after_connection_loss():
+    redis = FakePubSubRedis()
+    redis.fail_subscribes = 1
+    seen: list[str] = []
+
+    async def callback(envelope: EventEnvelope) -> None:
+        seen.append(envelope.event_type)
+
+    subscriber = RedisPubSubSubscriber(
+        redis, "ch", callback, reconnect_min_delay=0.01, reconnect_max_delay=0.02,
+    )
+    await subscriber.start()
+    await _wait_for(lambda: redis.subscribes == 2)
+
+    redis.messages.put_nowait(ConnectionError("reset by peer"))
+    await _wait_for(lambda: redis.subscribes == 3)
+    redis.publish("chat.message_created", {})
+    await _wait_for(lambda: seen == ["chat.message_created"])
+    await subscriber.stop()
+
+    assert subscriber.stats.resubscribes == 2
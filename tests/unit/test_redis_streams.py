@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from chat_service.infrastructure.bus.redis_streams import AdaptiveReadTuner, RedisStreamConsumer
+
+
+class FakeStreamRedis:
+    """Serves queued XREADGROUP batches, then behaves like an empty blocking read."""
+
+    def __init__(self, batches: list[list[tuple[str, dict[str, Any]]]]) -> None:
+        self._batches = batches
+        self.acked: list[str] = []
+        self.xack_calls = 0
+        self.idle_pending: list[tuple[str, dict[str, Any]]] = []
+        self.deliveries: dict[str, int] = {}
+        self.added: dict[str, list[dict[str, Any]]] = {}
+        self.xautoclaim_hook: Any = None
+
+    async def xgroup_create(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    async def xreadgroup(self, *, streams: dict[str, str], count: int, block: int, **kwargs: Any) -> Any:
+        if self._batches:
+            (stream,) = streams
+            return [(stream, self._batches.pop(0))]
+        await asyncio.sleep(block / 1000)
+        return []
+
+    async def xack(self, stream: str, group: str, *ids: str) -> int:
+        self.xack_calls += 1
+        self.acked.extend(ids)
+        return len(ids)
+
+    async def xautoclaim(self, stream: str, group: str, consumer: str, *, min_idle_time: int, start_id: str, count: int) -> Any:
+        claimed, self.idle_pending = self.idle_pending[:count], self.idle_pending[count:]
+        for msg_id, _ in claimed:
+            self.deliveries[msg_id] = self.deliveries.get(msg_id, 1) + 1
+        if self.xautoclaim_hook is not None:
+            self.xautoclaim_hook()
+        return ["0-0", claimed, []]
+
+    async def xpending_range(self, stream: str, group: str, *, min: str, max: str, count: int, consumername: str) -> Any:
+        in_range = sorted(
+            (msg_id for msg_id in self.deliveries if _id(min) <= _id(msg_id) <= _id(max)), key=_id,
+        )
+        return [
+            {"message_id": msg_id, "consumer": consumername, "time_since_delivered": 0, "times_delivered": self.deliveries[msg_id]}
+            for msg_id in in_range[:count]
+        ]
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+    async def xadd(self, stream: str, fields: dict[str, Any], **kwargs: Any) -> str:
+        self.added.setdefault(stream, []).append(fields)
+        return f"{len(self.added[stream])}-0"
+
+    async def xinfo_groups(self, stream: str) -> list[dict[str, Any]]:
+        return [{"name": "g", "lag": 0, "pending": 0}]
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeStreamRedis) -> None:
+        self._redis = redis
+        self._calls: list[Any] = []
+
+    async def __aenter__(self) -> _FakePipeline:
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+    def xpending_range(self, *args: Any, **kwargs: Any) -> _FakePipeline:
+        self._calls.append(self._redis.xpending_range(*args, **kwargs))
+        return self
+
+    async def execute(self) -> list[Any]:
+        return [await call for call in self._calls]
+
+
+def _id(msg_id: str) -> tuple[int, int]:
+    ms, _, seq = msg_id.partition("-")
+    return int(ms), int(seq)
+
+
+def _entry(seq: int, order_id: int) -> tuple[str, dict[str, Any]]:
+    return f"{int(time.time() * 1000)}-{seq}", {"event_type": "order.status_changed", "order_id": str(order_id)}
+
+
+async def _wait_for(predicate: Any, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_lanes_keep_per_key_order_and_run_keys_in_parallel():
+    entries = [_entry(i, order_id) for i, order_id in enumerate([1, 2, 1, 2, 1, 2])]
+    redis = FakeStreamRedis([entries])
+    seen: dict[str, list[str]] = {}
+    running = 0
+    peak = 0
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        seen.setdefault(fields["order_id"], []).append(fields["_id"])
+        running -= 1
+
+    for msg_id, fields in entries:
+        fields["_id"] = msg_id
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, concurrency=4,
+        partition_key=lambda f: f["order_id"],
+    )
+    await consumer.start()
+    await _wait_for(lambda: len(redis.acked) == len(entries))
+    await consumer.stop()
+
+    assert seen["1"] == [e[0] for e in entries if e[1]["order_id"] == "1"]
+    assert seen["2"] == [e[0] for e in entries if e[1]["order_id"] == "2"]
+    assert peak == 2
+    assert consumer.stats.processed == len(entries)
+    assert consumer.stats.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight_bounds_unacked_entries():
+    entries = [_entry(i, i) for i in range(5)]
+    redis = FakeStreamRedis([entries])
+    release = asyncio.Event()
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        await release.wait()
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, concurrency=8, max_in_flight=2,
+        partition_key=lambda f: f["order_id"],
+    )
+    await consumer.start()
+    await _wait_for(lambda: consumer.stats.in_flight == 2)
+    await asyncio.sleep(0.02)
+    assert consumer.stats.in_flight == 2
+
+    release.set()
+    await _wait_for(lambda: len(redis.acked) == len(entries))
+    await consumer.stop()
+
+
+@pytest.mark.asyncio
+async def test_reclaim_and_full_read_dispatch_concurrently_without_deadlock():
+    held = [_entry(i, i) for i in range(4)]
+    read = [_entry(i, i) for i in range(4, 8)]
+    stranded = [_entry(i, i) for i in range(8, 12)]
+    redis = FakeStreamRedis([held, read])
+    redis.idle_pending = stranded
+    redis.deliveries = {msg_id: 1 for msg_id, _ in stranded}
+    gate = asyncio.Event()
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        await gate.wait()
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        batch_size=4, block_ms=10, concurrency=2, max_in_flight=4, claim_interval=3600,
+        partition_key=lambda f: f["order_id"],
+    )
+    await consumer.start()
+    # The first read holds every permit; the second read and a reclaim both wait.
+    await _wait_for(lambda: consumer.stats.in_flight == 4)
+    reclaim = asyncio.create_task(consumer.reclaim())
+    await asyncio.sleep(0.05)
+
+    gate.set()
+    await _wait_for(lambda: len(redis.acked) == 12)
+    assert await reclaim == 4
+    await consumer.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_entry_is_not_acked():
+    entries = [_entry(0, 1), _entry(1, 2)]
+    redis = FakeStreamRedis([entries])
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        if fields["order_id"] == "1":
+            raise RuntimeError("boom")
+
+    consumer = RedisStreamConsumer(redis, "s", "g", "c", callback, block_ms=10)
+    await consumer.start()
+    await _wait_for(lambda: consumer.stats.processed + consumer.stats.failed == 2)
+    await consumer.stop()
+
+    assert redis.acked == [entries[1][0]]
+    assert consumer.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_reclaim_retries_idle_entries_and_dead_letters_exhausted_ones():
+    retry, poison = _entry(0, 1), _entry(1, 2)
+    redis = FakeStreamRedis([])
+    redis.idle_pending = [retry, poison]
+    redis.deliveries = {retry[0]: 1, poison[0]: 3}
+    handled: list[str] = []
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        handled.append(fields["order_id"])
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, claim_interval=3600, max_deliveries=3, dead_letter_stream="s.dlq",
+    )
+    await consumer.start()
+    assert await consumer.reclaim() == 2
+    await _wait_for(lambda: len(redis.acked) == 2)
+    await consumer.stop()
+
+    assert handled == ["1"]
+    (dead,) = redis.added["s.dlq"]
+    assert dead["order_id"] == "2"
+    assert dead["dlq_source_id"] == poison[0]
+    assert dead["dlq_deliveries"] == "4"
+    assert consumer.stats.reclaimed == 1
+    assert consumer.stats.dead_lettered == 1
+
+
+@pytest.mark.asyncio
+async def test_reclaim_counts_deliveries_per_id_past_own_pending_entries():
+    first, *held, last = [_entry(i, i) for i in range(5)]
+    redis = FakeStreamRedis([])
+    redis.idle_pending = [first, last]
+    # Entries this consumer already holds sort between the two claimed ones.
+    redis.deliveries = {first[0]: 1, last[0]: 1, **{msg_id: 1 for msg_id, _ in held}}
+    handled: list[str] = []
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        handled.append(fields["order_id"])
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, claim_interval=3600, max_deliveries=3, dead_letter_stream="s.dlq",
+    )
+    await consumer.start()
+    assert await consumer.reclaim() == 2
+    await _wait_for(lambda: len(redis.acked) == 2)
+    await consumer.stop()
+
+    assert sorted(handled) == ["0", "4"]
+    assert "s.dlq" not in redis.added
+    assert consumer.stats.dead_lettered == 0
+
+
+@pytest.mark.asyncio
+async def test_reclaim_leaves_entries_without_a_delivery_count_for_the_next_cycle():
+    entry = _entry(0, 1)
+    redis = FakeStreamRedis([])
+    redis.idle_pending = [entry]
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        raise AssertionError("not retried without a delivery count")
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, claim_interval=3600, max_deliveries=3, dead_letter_stream="s.dlq",
+    )
+    await consumer.start()
+    # Acked elsewhere between XAUTOCLAIM and XPENDING: no count comes back.
+    redis.xautoclaim_hook = lambda: redis.deliveries.clear()
+    assert await consumer.reclaim() == 1
+    await consumer.stop()
+
+    assert redis.acked == []
+    assert "s.dlq" not in redis.added
+    assert consumer.stats.reclaimed == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_on_last_delivery_goes_to_dead_letter_stream():
+    entry = _entry(0, 1)
+    redis = FakeStreamRedis([])
+    redis.idle_pending = [entry]
+    redis.deliveries = {entry[0]: 1}
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        raise ValueError("bad payload")
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, claim_interval=3600, max_deliveries=2, dead_letter_stream="s.dlq",
+    )
+    await consumer.start()
+    await consumer.reclaim()
+    await _wait_for(lambda: consumer.stats.dead_lettered == 1)
+    await consumer.stop()
+
+    assert redis.acked == [entry[0]]
+    assert "bad payload" in redis.added["s.dlq"][0]["dlq_reason"]
+
+
+@pytest.mark.asyncio
+async def test_batch_callback_gets_lane_batch_and_acks_applied_ids_once():
+    entries = [_entry(i, 1) for i in range(4)]
+    redis = FakeStreamRedis([entries])
+    batches: list[list[str]] = []
+
+    async def batch_callback(batch: list[tuple[str, dict[str, Any]]]) -> set[str]:
+        batches.append([msg_id for msg_id, _ in batch])
+        return {msg_id for msg_id, _ in batch[:3]}
+
+    async def callback(msg_id: str, event_type: str, fields: dict[str, Any]) -> None:
+        raise AssertionError("per-entry callback must not run in batch mode")
+
+    consumer = RedisStreamConsumer(
+        redis, "s", "g", "c", callback,
+        block_ms=10, concurrency=4, partition_key=lambda f: f["order_id"],
+        batch_callback=batch_callback,
+    )
+    await consumer.start()
+    await _wait_for(lambda: consumer.stats.processed + consumer.stats.failed == 4)
+    await consumer.stop()
+
+    assert batches == [[e[0] for e in entries]]
+    assert redis.xack_calls == 1
+    assert sorted(redis.acked) == sorted(e[0] for e in entries[:3])
+    assert consumer.stats.failed == 1
+
+
+def test_adaptive_tuner_grows_on_backlog_and_relaxes_when_idle():
+    tuner = AdaptiveReadTuner(min_batch=10, max_batch=40, min_block_ms=100, max_block_ms=800)
+
+    tuner.observe(10)
+    tuner.observe(20)
+    tuner.observe(40)
+    assert tuner.batch_size == 40
+    assert tuner.block_ms == 100
+
+    tuner.observe(5)
+    assert tuner.batch_size == 20
+
+    for _ in range(5):
+        tuner.observe(0)
+    assert tuner.batch_size == 10
+    assert tuner.block_ms == 800
+
+    tuner.observe(3, lag=500)
+    assert tuner.batch_size == 20
+    assert tuner.block_ms == 100
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from chat_service.infrastructure.bus import serializer
+from chat_service.infrastructure.bus.serializer import (
+    ENVELOPE_JSON,
+    decode_envelope,
+    deserialize_event,
+    encode_event,
+    encode_frame_event,
+    get_codec,
+    serialize_event,
+)
+from chat_service.infrastructure.ws.protocol import render_event_frame, render_outbound
+
+CONV_ID = uuid.uuid4()
+SENT_AT = datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+PAYLOAD = {"conversation_id": CONV_ID, "created_at": SENT_AT, "body": "привет"}
+EXPECTED = {"conversation_id": str(CONV_ID), "created_at": SENT_AT.isoformat(), "body": "привет"}
+
+
+def test_legacy_envelope_is_plain_json_readable_by_old_nodes():
+    raw = serialize_event("chat.message_created", PAYLOAD)
+
+    assert json.loads(raw) == {"event": "chat.message_created", "data": EXPECTED}
+    assert deserialize_event(raw) == ("chat.message_created", EXPECTED)
+    assert deserialize_event(raw.encode()) == ("chat.message_created", EXPECTED)
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_versioned_envelopes_round_trip(name: str):
+    if name == "msgpack" and serializer.msgpack is None:
+        pytest.skip("msgpack not installed")
+    codec = get_codec(name)
+
+    raw = encode_event("chat.message_created", PAYLOAD, codec)
+
+    assert raw[0] == codec.version
+    assert deserialize_event(raw) == ("chat.message_created", EXPECTED)
+
+
+def test_json_codec_falls_back_to_stdlib(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(serializer, "orjson", None)
+
+    raw = encode_event("chat.message_created", PAYLOAD, get_codec("json"))
+
+    assert raw[0] == ENVELOPE_JSON
+    assert deserialize_event(raw) == ("chat.message_created", EXPECTED)
+
+
+def test_unknown_envelope_version_is_rejected():
+    with pytest.raises(ValueError):
+        deserialize_event(b"\x7f{}")
+    with pytest.raises(ValueError):
+        get_codec("yaml")
+    assert get_codec("legacy") is None
+
+
+def test_frame_envelope_carries_the_same_frame_a_node_would_render():
+    payload = {"conversation_id": str(CONV_ID), "body": "привет"}
+    frame = render_event_frame("chat.message_created", payload)
+
+    envelope = decode_envelope(encode_frame_event("chat.message_created", str(CONV_ID), frame))
+
+    assert envelope.event_type == "chat.message_created"
+    assert envelope.conversation_id == str(CONV_ID)
+    assert envelope.frame == frame
+    # What a node renders from the decoded (non-frame) event published by the worker.
+    worker_payload = {"event_type": "chat.message_created", **payload}
+    assert frame.decode() == render_outbound("chat.message_created", worker_payload)
+    assert envelope.data == worker_payload
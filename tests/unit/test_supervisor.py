@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import time
+
+from chat_service.supervisor import Supervisor, bind_reuseport
+
+
+def _idle_worker(index: int, ready) -> None:
+    ready.set()
+    time.sleep(60)
+
+
+def _supervisor(**kwargs) -> Supervisor:
+    return Supervisor(_idle_worker, 2, ready_timeout=30, stop_timeout=5, **kwargs)
+
+
+def test_rolling_restart_replaces_every_worker():
+    supervisor = _supervisor()
+    supervisor.start()
+    try:
+        before = supervisor.pids
+        assert len(set(before)) == 2
+
+        assert supervisor.rolling_restart() is True
+
+        after = supervisor.pids
+        assert not set(before) & set(after)
+        assert supervisor.restarts == 2
+        for pid in before:
+            assert not _alive(pid)
+    finally:
+        supervisor.stop()
+    assert not any(_alive(pid) for pid in after)
+
+
+def test_dead_worker_is_restarted_after_a_delay():
+    supervisor = _supervisor(restart_delay=0.05)
+    supervisor.start()
+    try:
+        crashed, survivor = supervisor.pids
+        os.kill(crashed, signal.SIGKILL)
+        _wait_for(lambda: not _alive(crashed))
+
+        supervisor.check_workers()
+        assert supervisor.restarts == 0
+        time.sleep(0.1)
+        supervisor.check_workers()
+
+        replacement, same = supervisor.pids
+        assert replacement != crashed
+        assert same == survivor
+        assert supervisor.restarts == 1
+    finally:
+        supervisor.stop()
+
+
+def test_workers_can_share_the_port():
+    first = bind_reuseport("127.0.0.1", 0)
+    port = first.getsockname()[1]
+    second = bind_reuseport("127.0.0.1", port)
+    try:
+        for sock in (first, second):
+            sock.listen()
+        with socket.create_connection(("127.0.0.1", port), timeout=1):
+            pass
+    finally:
+        first.close()
+        second.close()
+
+
+def _alive(pid: int | None) -> bool:
+    assert pid is not None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers signal 0 until it is reaped.
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
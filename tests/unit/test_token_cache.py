@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+
+import jwt
+import pytest
+
+from chat_service.application.dto.principal import Principal
+from chat_service.domain.value_objects.enums import ParticipantKind
+from chat_service.infrastructure.auth.caching_verifier import CachingTokenVerifier
+from chat_service.infrastructure.auth.hs256_verifier import HS256Verifier
+
+SECRET = "test-secret-that-is-long-enough-for-hs256"
+
+
+class CountingVerifier:
+    def __init__(self) -> None:
+        self._inner = HS256Verifier(SECRET)
+        self.calls = 0
+
+    async def verify(self, token: str) -> Principal:
+        self.calls += 1
+        return await self._inner.verify(token)
+
+
+class Clock:
+    """Starts at the real time because PyJWT checks ``exp`` against it."""
+
+    def __init__(self) -> None:
+        self.now = float(int(time.time()))
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _token(sub: int, **claims: object) -> str:
+    return jwt.encode({"sub": str(sub), "kind": "user", **claims}, SECRET)
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache_until_shortly_before_exp():
+    inner, clock = CountingVerifier(), Clock()
+    verifier = CachingTokenVerifier(inner, expiry_margin=5, max_ttl=300, clock=clock)
+    token = _token(42, exp=int(clock.now) + 3600)
+
+    first = await verifier.verify(token)
+    assert await verifier.verify(token) == first
+    assert first.kind == ParticipantKind.USER and first.subject_id == 42
+    assert inner.calls == 1
+    assert verifier.stats.hits == 1 and verifier.stats.hit_rate == 0.5
+
+    clock.now += 301  # max_ttl caps the entry well before exp
+    await verifier.verify(token)
+    assert inner.calls == 2
+    assert verifier.stats.expired == 1
+
+
+@pytest.mark.asyncio
+async def test_entry_expires_at_exp_minus_margin():
+    inner, clock = CountingVerifier(), Clock()
+    verifier = CachingTokenVerifier(inner, expiry_margin=5, max_ttl=300, clock=clock)
+    token = _token(1, exp=int(clock.now) + 30)
+
+    await verifier.verify(token)
+    clock.now += 24
+    await verifier.verify(token)
+    assert inner.calls == 1
+    clock.now += 2  # 26s > 30s - 5s margin
+    await verifier.verify(token)
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_are_not_cached_and_lru_is_bounded():
+    inner = CountingVerifier()
+    verifier = CachingTokenVerifier(inner, max_entries=2)
+
+    bad = jwt.encode({"sub": "1"}, "other-secret")
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidSignatureError):
+            await verifier.verify(bad)
+    assert inner.calls == 2 and len(verifier) == 0
+
+    tokens = [_token(i) for i in range(3)]
+    for token in tokens:
+        await verifier.verify(token)
+    assert len(verifier) == 2
+    assert verifier.stats.evictions == 1
+    await verifier.verify(tokens[0])
+    assert inner.calls == 6
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import uuid
+
+from chat_service.infrastructure.cache.topic_directory import TopicDirectory
+
+
+def test_lru_evicts_least_recently_used_topic():
+    directory = TopicDirectory(max_entries=2)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    directory.put("order", 1, a)
+    directory.put("order", 2, b)
+    assert directory.get("order", 1) == a
+    directory.put("order", 3, c)
+
+    assert directory.get("order", 2) is None
+    assert directory.get("order", 1) == a
+    assert directory.get("order", 3) == c
+    assert len(directory) == 2
+
+
+def test_invalidate_by_conversation_id():
+    directory = TopicDirectory(max_entries=10)
+    old, new = uuid.uuid4(), uuid.uuid4()
+
+    directory.put("order", 1, old)
+    directory.put("order", 1, new)
+    directory.invalidate_conversation(old)
+    assert directory.get("order", 1) == new
+
+    directory.invalidate_conversation(new)
+    assert directory.get("order", 1) is None
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+
+from chat_service.infrastructure.db.last_activity import LastActivityAggregator
+from chat_service.infrastructure.db.uow import SqlAlchemyUoW
+from tests.conftest import FakeUoW, fake_uow_factory
+
+
+class _FakeSession:
+    def __init__(self) -> None:
+        self.committed = False
+        self.closed = False
+
+    async def commit(self) -> None:
+        self.committed = True
+
+    async def rollback(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _CountingFactory:
+    def __init__(self) -> None:
+        self.sessions: list[_FakeSession] = []
+
+    def __call__(self) -> _FakeSession:
+        session = _FakeSession()
+        self.sessions.append(session)
+        return session
+
+
+@pytest.mark.asyncio
+async def test_unused_uow_never_opens_session():
+    factory = _CountingFactory()
+
+    async with SqlAlchemyUoW(session_factory=factory) as uow:  # type: ignore[arg-type]
+        await uow.commit()
+
+    assert factory.sessions == []
+
+
+@pytest.mark.asyncio
+async def test_session_opened_once_on_first_repository_use():
+    factory = _CountingFactory()
+
+    async with SqlAlchemyUoW(session_factory=factory) as uow:  # type: ignore[arg-type]
+        assert uow.conversations is uow.conversations
+        _ = uow.messages_w
+        await uow.commit()
+
+    assert len(factory.sessions) == 1
+    assert factory.sessions[0].committed is True
+    assert factory.sessions[0].closed is True
+
+
+@pytest.mark.asyncio
+async def test_caller_owned_session_is_not_closed():
+    session = _FakeSession()
+
+    async with SqlAlchemyUoW(session) as uow:  # type: ignore[arg-type]
+        _ = uow.outbox
+
+    assert session.closed is False
+
+
+@pytest.mark.asyncio
+async def test_deferred_touch_reaches_aggregator_only_after_commit():
+    target = FakeUoW()
+    aggregator = LastActivityAggregator(fake_uow_factory(target), flush_interval=60)
+    conv_id = uuid4()
+    now = datetime.now(timezone.utc)
+
+    async with SqlAlchemyUoW(session_factory=_CountingFactory(), last_activity=aggregator) as uow:  # type: ignore[arg-type]
+        await uow.conversations_w.touch_last_message_at(conv_id, now)
+        await uow.conversations_w.touch_last_message_at(conv_id, now - timedelta(seconds=1))
+        assert aggregator.pending == 0
+        await uow.commit()
+
+    async with SqlAlchemyUoW(session_factory=_CountingFactory(), last_activity=aggregator) as uow:  # type: ignore[arg-type]
+        await uow.conversations_w.touch_last_message_at(uuid4(), now)
+        await uow.rollback()
+
+    assert await aggregator.flush() == 1
+    assert target.conversations_w.touched == {conv_id: now}